@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Archive Store - Content-adressierter, deduplizierender Speicher für Session-Outputs
+Jede Datei wird per SHA-256 als komprimierter Blob einmalig abgelegt; pro Todo
+führt ein kleines JSONL-Manifest die Historie seiner Archivierungen.
+Mit archive.store_zero_copy landen Blobs unkomprimiert über session_archive
+(copy_file_range/Reflink bzw. rename) im Store - ohne Userspace-Kopie
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+from session_archive import archive_file
+
+# Blockgröße für Hashing und Kompression (Speicher bleibt konstant)
+CHUNK_SIZE = 1024 * 1024
+
+# Endung unkomprimierter Blobs (zero-copy abgelegt)
+RAW_SUFFIX = '.raw'
+
+
+class ArchiveStore:
+    def __init__(self, config):
+        archive_config = config.get('archive', {})
+        self.root = Path(archive_config.get('store_path') or Path(config['paths']['archive']) / 'store')
+        self.level = archive_config.get('store_compress_level', 6)
+        self.zero_copy = archive_config.get('store_zero_copy', False)
+        self.blob_dir = self.root / 'blobs'
+        self.manifest_dir = self.root / 'manifests'
+
+    def _blob_path(self, digest, raw=False):
+        return self.blob_dir / digest[:2] / (digest[2:] + (RAW_SUFFIX if raw else ''))
+
+    def _find_blob(self, digest):
+        """Vorhandener Blob zu digest (komprimiert oder roh) oder None"""
+        for raw in (False, True):
+            path = self._blob_path(digest, raw)
+            if path.exists():
+                return path
+        return None
+
+    def _manifest_path(self, todo_id):
+        return self.manifest_dir / f"todo_{int(todo_id)}.jsonl"
+
+    def put_file(self, path, mode='copy'):
+        """
+        Legt eine Datei als Blob ab. Gibt (digest, size, neu_gespeichert) zurück;
+        existiert der Inhalt bereits, wird der Temp-Blob verworfen.
+        Ein Lesedurchgang: hashen und komprimieren zugleich, danach atomar an
+        den Hash-Pfad verschieben - die Quelle kann sich dazwischen nicht ändern.
+        mode='move' entfernt die Quelle danach (zero-copy: per rename).
+        """
+        path = Path(path)
+        if self.zero_copy:
+            return self._put_file_zero_copy(path, mode)
+        hasher = hashlib.sha256()
+        size = 0
+
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.blob_dir, prefix='.tmp-')
+        try:
+            compressor = zlib.compressobj(self.level)
+            with os.fdopen(fd, 'wb') as out, open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    size += len(chunk)
+                    out.write(compressor.compress(chunk))
+                out.write(compressor.flush())
+            digest = hasher.hexdigest()
+
+            blob_path = self._blob_path(digest)
+            if self._find_blob(digest):
+                Path(tmp_name).unlink()
+                stored = False
+            else:
+                blob_path.parent.mkdir(exist_ok=True)
+                os.replace(tmp_name, blob_path)
+                stored = True
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        if mode == 'move':
+            path.unlink()
+        return digest, size, stored
+
+    def _put_file_zero_copy(self, path, mode):
+        """
+        Wie put_file, aber unkomprimiert: die Quelle geht per session_archive
+        (rename bzw. copy_file_range) in einen Temp-Blob, gehasht wird dieser
+        private Snapshot. Hardlinks scheiden aus - ein späterer Write auf die
+        Quelle würde den Blob unter seinem Hash verändern.
+        """
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.blob_dir, prefix='.tmp-')
+        os.close(fd)
+        tmp_path = Path(tmp_name)
+        try:
+            archive_file(path, tmp_path, 'move' if mode == 'move' else 'copy')
+            hasher = hashlib.sha256()
+            size = 0
+            with open(tmp_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    hasher.update(chunk)
+                    size += len(chunk)
+            digest = hasher.hexdigest()
+
+            if self._find_blob(digest):
+                tmp_path.unlink()
+                return digest, size, False
+            blob_path = self._blob_path(digest, raw=True)
+            blob_path.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, blob_path)
+        except BaseException:
+            if mode == 'move' and tmp_path.exists() and not path.exists():
+                os.replace(tmp_path, path)  # Quelle nicht verlieren
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return digest, size, True
+
+    def read_blob(self, digest, out):
+        """Entpackt einen Blob gestreamt in das Datei-Objekt out"""
+        path = self._find_blob(digest) or self._blob_path(digest)
+        if path.name.endswith(RAW_SUFFIX):
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                    out.write(chunk)
+            return
+        decompressor = zlib.decompressobj()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                out.write(decompressor.decompress(chunk))
+        out.write(decompressor.flush())
+
+    def history(self, todo_id):
+        """Alle Archivierungen eines Todos (älteste zuerst)"""
+        manifest = self._manifest_path(todo_id)
+        if not manifest.exists():
+            return []
+        entries = []
+        for line in manifest.read_text().splitlines():
+            if line.strip():
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # Halb geschriebene Zeile nach Absturz
+        return entries
+
+    def archive_session(self, todo_id, session_dir, kind='completion', mode='copy'):
+        """
+        Archiviert alle Dateien eines Session-Verzeichnisses.
+        mode='move' entfernt die Quelldateien (Emergency-Cleanup).
+        Gibt den Manifest-Eintrag plus Statistik zurück.
+        """
+        start = time.perf_counter()
+        files = {}
+        stats = {'files': 0, 'bytes': 0, 'new_blobs': 0, 'deduplicated': 0}
+
+        for file in sorted(Path(session_dir).iterdir()):
+            if not file.is_file():
+                continue
+            digest, size, stored = self.put_file(file, mode)
+            files[file.name] = {'sha256': digest, 'size': size}
+            stats['files'] += 1
+            stats['bytes'] += size
+            stats['new_blobs' if stored else 'deduplicated'] += 1
+
+        entry = {'ts': int(time.time()), 'kind': kind, 'files': files}
+
+        # Wiederholte Completion mit identischem Inhalt: kein neuer Eintrag
+        previous = self.history(todo_id)
+        if not previous or previous[-1]['files'] != files:
+            self.manifest_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._manifest_path(todo_id), 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+            stats['manifest'] = 'appended'
+        else:
+            stats['manifest'] = 'unchanged'
+
+        stats['ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return entry, stats
+
+    def restore(self, todo_id, dest_dir, index=-1):
+        """Stellt eine Archivierung (Standard: letzte) in dest_dir wieder her"""
+        entries = self.history(todo_id)
+        if not entries:
+            return None
+        entry = entries[index]
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        for name, info in entry['files'].items():
+            with open(dest_dir / name, 'wb') as out:
+                self.read_blob(info['sha256'], out)
+        return entry
+
+    def get_stats(self):
+        """Belegter Speicher der Blobs und Anzahl Manifeste"""
+        blobs = [path for path in self.blob_dir.glob('*/*') if not path.name.startswith('.tmp-')]
+        return {
+            'blobs': len(blobs),
+            'stored_bytes': sum(path.stat().st_size for path in blobs),
+            'manifests': len(list(self.manifest_dir.glob('todo_*.jsonl'))),
+        }
+
+
+# Global Store Instance
+_archive_store = None
+
+
+def get_archive_store(config):
+    """Singleton Pattern für Archive Store"""
+    global _archive_store
+    if _archive_store is None:
+        _archive_store = ArchiveStore(config)
+    return _archive_store
+
+
+if __name__ == "__main__":
+    import sys
+
+    with open(Path(__file__).parent / "config.json") as f:
+        config = json.load(f)
+
+    store = get_archive_store(config)
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if command == "stats":
+        print(json.dumps(store.get_stats(), indent=2))
+    elif command == "history" and len(sys.argv) > 2:
+        for entry in store.history(sys.argv[2]):
+            files = ', '.join(f"{name} ({info['size']} B)" for name, info in entry['files'].items())
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['ts']))}\t{entry['kind']}\t{files}")
+    elif command == "restore" and len(sys.argv) > 3:
+        entry = store.restore(sys.argv[2], sys.argv[3])
+        print(f"Restored {len(entry['files'])} files" if entry else "No archive for this todo")
+    else:
+        print("Usage: archive_store.py [stats|history TODO_ID|restore TODO_ID DEST_DIR]")
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Change Feed - Inkrementelle Änderungen aus project_todos per Watermark
+Ein Delta-Query auf (updated_at, id) statt eines Full-Scans pro Poller;
+geänderte Zeilen gehen an alle In-Process Subscriber
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from pathlib import Path
+
+from db_pool import get_pool, disable_pool
+from ssh_transport import get_transport
+from todo_cache import get_todo_cache
+from todo_record import HEADER_FIELDS, TodoRecord, decode_rows
+
+# Kompakte Sicht pro Todo (reicht für Status-/Konsistenz-Checks)
+SNAPSHOT_FIELDS = ('id', 'title', 'status', 'bearbeiten', 'updated_at')
+
+# Watermark-Werte werden in wp-cli Queries eingebettet - nur MySQL DATETIME erlaubt
+_TIMESTAMP_RE = re.compile(r'^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}$')
+_EPOCH = '1970-01-01 00:00:00'
+
+
+class ChangeFeed:
+    def __init__(self, config):
+        self.config = config
+        feed_config = config.get('change_feed', {})
+        self.batch_size = max(1, int(feed_config.get('batch_size', 500)))
+        # Gelöschte Zeilen / Änderungen ohne updated_at sieht das Delta nicht:
+        # in diesem Abstand gleicht ein kompakter Full-Scan den Snapshot ab
+        self.reconcile_interval = float(feed_config.get('reconcile_seconds', 600))
+        self.state_path = Path(config.get('paths', {}).get('change_feed', '/tmp/claude_change_feed.json'))
+        self.table = f"{config['database']['table_prefix']}project_todos"
+
+        self.watermark = (_EPOCH, 0)
+        self.snapshot = {}
+        self.reconciled_at = 0.0
+        self._subscribers = []
+        self._load_state()
+
+    def _load_state(self):
+        """Watermark + Snapshot aus dem letzten Lauf (auch anderer Prozesse)"""
+        try:
+            state = json.loads(self.state_path.read_text())
+            updated_at, todo_id = state['watermark']
+            if _TIMESTAMP_RE.match(updated_at):
+                self.watermark = (updated_at, int(todo_id))
+                self.snapshot = state.get('snapshot', {})
+                self.reconciled_at = float(state.get('reconciled_at', 0))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_state(self):
+        """Atomar schreiben, damit parallele Poller nie eine halbe Datei lesen"""
+        tmp_path = self.state_path.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            tmp_path.write_text(json.dumps({
+                'watermark': list(self.watermark), 'snapshot': self.snapshot, 'reconciled_at': self.reconciled_at
+            }))
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logging.warning(f"⚠️ Could not persist change feed state: {e}")
+
+    def subscribe(self, callback):
+        """callback(records) - erhält pro Poll die Liste geänderter TodoRecords"""
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _fetch_page(self, updated_at, todo_id):
+        """Eine Seite Änderungen strikt nach (updated_at, id)"""
+        columns = ', '.join(HEADER_FIELDS)
+        where = "updated_at > {ts} OR (updated_at = {ts} AND id > {id})"
+        order = f"ORDER BY updated_at ASC, id ASC LIMIT {self.batch_size}"
+
+        pool = get_pool(self.config)
+        if pool:
+            try:
+                rows = pool.fetch_all(
+                    f"SELECT {columns} FROM {self.table} WHERE {where.format(ts='%s', id='%s')} {order}",
+                    (updated_at, updated_at, todo_id)
+                )
+                return [TodoRecord.from_mapping(row) for row in rows]
+            except Exception as e:
+                logging.warning(f"⚠️ MySQL pool change query failed, falling back to wp-cli: {e}")
+                disable_pool()
+
+        query = f"SELECT {columns} FROM {self.table} WHERE {where.format(ts=repr(updated_at), id=int(todo_id))} {order}"
+        result = get_transport(self.config).run(f'wp db query "{query}"', timeout=30)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+        return list(decode_rows(result.stdout))
+
+    def _fetch_snapshot(self):
+        """Kompakter Full-Scan (nur SNAPSHOT_FIELDS) für den Abgleich"""
+        columns = ', '.join(SNAPSHOT_FIELDS)
+        query = f"SELECT {columns} FROM {self.table}"
+
+        pool = get_pool(self.config)
+        if pool:
+            try:
+                return [TodoRecord.from_mapping(row) for row in pool.fetch_all(query)]
+            except Exception as e:
+                logging.warning(f"⚠️ MySQL pool snapshot query failed, falling back to wp-cli: {e}")
+                disable_pool()
+
+        result = get_transport(self.config).run(f'wp db query "{query}"', timeout=60)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip() or f"exit code {result.returncode}")
+        return list(decode_rows(result.stdout))
+
+    def reconcile(self):
+        """
+        Ersetzt den Snapshot durch den aktuellen Tabellenstand: gelöschte Zeilen
+        fallen heraus, Status-Wechsel ohne neues updated_at werden übernommen.
+        Gibt die Anzahl entfernter/korrigierter Zeilen zurück, None bei Fehler.
+        """
+        try:
+            records = self._fetch_snapshot()
+        except Exception as e:
+            logging.error(f"❌ Change feed reconciliation failed: {e}")
+            return None
+
+        snapshot = {str(record['id']): {field: record[field] for field in SNAPSHOT_FIELDS} for record in records}
+        stale = [todo_id for todo_id, row in self.snapshot.items() if snapshot.get(todo_id, {}) != row]
+        cache = get_todo_cache(self.config)
+        for todo_id in stale:
+            cache.invalidate(todo_id)
+
+        self.snapshot = snapshot
+        self.reconciled_at = time.time()
+        if stale:
+            logging.info(f"🔄 Change feed reconciliation: {len(stale)} stale todos dropped/corrected")
+        return len(stale)
+
+    def poll(self):
+        """
+        Holt alle Zeilen seit dem Watermark. Die Sekunde des Watermarks wird
+        erneut gelesen (updated_at=NOW() hat nur Sekundenauflösung), bereits
+        bekannte Stände werden über den Snapshot ausgefiltert.
+        Gibt die geänderten Records zurück, None bei Fehler.
+        """
+        cursor = (self.watermark[0], 0)
+        cursor_start = cursor[0]
+        changed = []
+
+        try:
+            while True:
+                page = self._fetch_page(*cursor)
+                for record in page:
+                    # Ganze Projektion vergleichen: zwei Writes in derselben
+                    # Sekunde tragen dasselbe updated_at
+                    known = self.snapshot.get(str(record['id']))
+                    if known != {field: record[field] for field in SNAPSHOT_FIELDS}:
+                        changed.append(record)
+                    cursor = (record['updated_at'], int(record['id']))
+                if len(page) < self.batch_size:
+                    break
+        except Exception as e:
+            logging.error(f"❌ Change feed poll failed: {e}")
+            return None
+
+        if not _TIMESTAMP_RE.match(cursor[0]):
+            cursor = self.watermark
+        self.watermark = max(self.watermark, cursor)
+
+        cache = get_todo_cache(self.config)
+        for record in changed:
+            self.snapshot[str(record['id'])] = {field: record[field] for field in SNAPSHOT_FIELDS}
+            cache.put(record['id'], {field: record[field] for field in HEADER_FIELDS})
+        if cursor_start == _EPOCH:
+            self.reconciled_at = time.time()  # Full-Scan ist bereits ein Abgleich
+        elif time.time() - self.reconciled_at >= self.reconcile_interval:
+            self.reconcile()
+        self._save_state()
+
+        if changed:
+            logging.info(f"🔄 Change feed: {len(changed)} changed todos (watermark {self.watermark[0]})")
+            self._publish(changed)
+        return changed
+
+    def _publish(self, records):
+        for callback in list(self._subscribers):
+            try:
+                callback(records)
+            except Exception as e:
+                logging.error(f"❌ Change feed subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def rows(self, **filters):
+        """Snapshot-Zeilen, optional gefiltert (z.B. status='in_progress')"""
+        return [
+            row for row in self.snapshot.values()
+            if all(row.get(key) == value for key, value in filters.items())
+        ]
+
+    def reset(self):
+        """Watermark zurücksetzen - nächster Poll ist wieder ein Full-Scan"""
+        self.watermark = (_EPOCH, 0)
+        self.snapshot = {}
+        self.reconciled_at = 0.0
+        self._save_state()
+
+
+# Global Feed Instance
+_change_feed = None
+
+
+def get_change_feed(config):
+    """Singleton Pattern für Change Feed"""
+    global _change_feed
+    if _change_feed is None:
+        _change_feed = ChangeFeed(config)
+    return _change_feed
+
+
+if __name__ == "__main__":
+    import sys
+
+    with open(Path(__file__).parent / "config.json") as f:
+        config = json.load(f)
+
+    feed = get_change_feed(config)
+    command = sys.argv[1] if len(sys.argv) > 1 else "poll"
+
+    if command == "poll":
+        changed = feed.poll()
+        for record in changed or []:
+            print(f"#{record['id']}\t{record['status']}\t{record['updated_at']}\t{record['title']}")
+        sys.exit(0 if changed is not None else 1)
+    elif command == "watch":
+        interval = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+        feed.subscribe(lambda records: [
+            print(f"#{record['id']}\t{record['status']}\t{record['updated_at']}\t{record['title']}", flush=True)
+            for record in records
+        ])
+        while True:
+            feed.poll()
+            time.sleep(interval)
+    elif command == "reconcile":
+        stale = feed.reconcile()
+        feed._save_state()
+        print(f"Change feed reconciled: {stale} stale todos" if stale is not None else "Reconciliation failed")
+        sys.exit(0 if stale is not None else 1)
+    elif command == "reset":
+        feed.reset()
+        print("Change feed watermark reset")
+    else:
+        print("Usage: change_feed.py [poll|watch SECONDS|reconcile|reset]")
@@ -3,7 +3,12 @@
 # TASK_COMPLETED Handler für das neue System
 # Wird aufgerufen wenn TASK_COMPLETED geschrieben wird
 
-TASK_FILE="/tmp/TASK_COMPLETED"
+# Session-Slot (parallele Sessions): Marker unter /tmp/claude_slots/<slot>
+if [ -n "$TODO_SLOT" ]; then
+    TASK_FILE="/tmp/claude_slots/$TODO_SLOT/TASK_COMPLETED"
+else
+    TASK_FILE="/tmp/TASK_COMPLETED"
+fi
 MANAGER="/home/rodemkay/www/react/plugin-todo/hooks/todo_manager.py"
 LOG_FILE="/home/rodemkay/www/react/plugin-todo/hooks/logs/completion.log"
 
@@ -9,8 +9,11 @@ import time
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-import subprocess
 import logging
+from ssh_transport import get_transport
+from todo_cache import invalidate_todo
+from change_feed import get_change_feed
+from session_slots import active_todo_ids
 
 # Logging Setup
 logging.basicConfig(
@@ -132,44 +135,36 @@ class CompletionMonitor:
         
         try:
             # Prüfe auf Todos mit status='in_progress' aber ohne aktuelle Session
-            query = f"SELECT id, title, updated_at FROM {self.config['database']['table_prefix']}project_todos WHERE status='in_progress' AND bearbeiten=1"
-            cmd = f"wp db query '{query}'"
+            # Change Feed: nur Delta seit letztem Poll, Snapshot enthält alle Todos
+            feed = get_change_feed(self.config)
+            if feed.poll() is None:
+                raise RuntimeError("change feed poll failed")
             
-            result = subprocess.run([
-                "ssh", f"rodemkay@{self.config['database']['host']}", 
-                f"cd {self.config['database']['remote_path']} && {cmd}"
-            ], capture_output=True, text=True, timeout=30)
+            # Aktiv = von der globalen Session oder einem Slot geclaimt
+            active_ids = active_todo_ids(self.config)
             
-            if result.returncode == 0 and result.stdout:
-                lines = result.stdout.strip().split('\n')
-                current_todo_path = Path(self.config["paths"]["current_todo"])
+            for row in feed.rows(status='in_progress', bearbeiten='1'):
+                todo_id = row['id']
+                
+                # Prüfe ob aktuell aktiv
+                is_active = str(todo_id) in active_ids
                 
-                for line in lines[1:]:  # Skip header
-                    if line.strip():
-                        parts = line.split('\t')
-                        if len(parts) >= 3:
-                            todo_id = parts[0]
-                            
-                            # Prüfe ob aktuell aktiv
-                            is_active = (current_todo_path.exists() and 
-                                       current_todo_path.read_text().strip() == todo_id)
-                            
-                            if not is_active:
-                                # Prüfe Alter der letzten Aktualisierung
-                                try:
-                                    updated_at = datetime.strptime(parts[2], '%Y-%m-%d %H:%M:%S')
-                                    age = datetime.now() - updated_at
-                                    
-                                    if age > timedelta(minutes=30):
-                                        issues.append({
-                                            'type': 'stale_in_progress',
-                                            'todo_id': todo_id,
-                                            'title': parts[1],
-                                            'age_minutes': int(age.total_seconds() / 60)
-                                        })
-                                        logging.warning(f"⚠️ Stale in_progress todo: #{todo_id}")
-                                except ValueError:
-                                    pass  # Ignore date parsing errors
+                if not is_active:
+                    # Prüfe Alter der letzten Aktualisierung
+                    try:
+                        updated_at = datetime.strptime(row['updated_at'], '%Y-%m-%d %H:%M:%S')
+                        age = datetime.now() - updated_at
+                        
+                        if age > timedelta(minutes=30):
+                            issues.append({
+                                'type': 'stale_in_progress',
+                                'todo_id': todo_id,
+                                'title': row['title'],
+                                'age_minutes': int(age.total_seconds() / 60)
+                            })
+                            logging.warning(f"⚠️ Stale in_progress todo: #{todo_id}")
+                    except ValueError:
+                        pass  # Ignore date parsing errors
         
         except Exception as e:
             logging.error(f"❌ Database consistency check failed: {e}")
@@ -204,7 +199,14 @@ class CompletionMonitor:
         """Führt automatische Reparaturen durch"""
         recovered = 0
         
-        for issue in issues:
+        # Stale in_progress Todos gesammelt in einer Transaktion zurücksetzen
+        stale_issues = [issue for issue in issues if issue['type'] == 'stale_in_progress']
+        pending = issues
+        if len(stale_issues) > 1:
+            recovered += self._recover_stale_todos(stale_issues)
+            pending = [issue for issue in issues if issue['type'] != 'stale_in_progress']
+        
+        for issue in pending:
             try:
                 if issue['type'] == 'hanging_session':
                     if self._recover_hanging_session(issue):
@@ -295,6 +297,23 @@ class CompletionMonitor:
             logging.error(f"❌ Failed to reset stale todo: {e}")
             return False
     
+    def _recover_stale_todos(self, stale_issues):
+        """Setzt mehrere stale Todos per Batch-Write in einem Round-Trip zurück"""
+        try:
+            from todo_manager import batch_update_todos
+            results = batch_update_todos([
+                {'id': issue['todo_id'], 'status': 'offen'} for issue in stale_issues
+            ])
+            for todo_id, success in results.items():
+                if success:
+                    logging.info(f"✅ Reset stale Todo #{todo_id} to 'offen'")
+                else:
+                    logging.error(f"❌ Failed to reset stale Todo #{todo_id}")
+            return sum(results.values())
+        except Exception as e:
+            logging.error(f"❌ Failed to reset stale todos: {e}")
+            return 0
+    
     def _recover_oversized_log(self, issue):
         """Rotiert übergroße Log-Dateien"""
         try:
@@ -317,10 +336,8 @@ class CompletionMonitor:
             query = f"UPDATE {self.config['database']['table_prefix']}project_todos SET status='{status}', updated_at=NOW() WHERE id={todo_id}"
             cmd = f"wp db query '{query}'"
             
-            result = subprocess.run([
-                "ssh", f"rodemkay@{self.config['database']['host']}", 
-                f"cd {self.config['database']['remote_path']} && {cmd}"
-            ], capture_output=True, text=True, timeout=30)
+            result = get_transport(self.config).run(cmd, timeout=30)
+            invalidate_todo(self.config, todo_id)
             
             return result.returncode == 0
         except Exception:
@@ -332,10 +349,7 @@ class CompletionMonitor:
             query = f"SELECT status FROM {self.config['database']['table_prefix']}project_todos WHERE id={todo_id}"
             cmd = f"wp db query '{query}'"
             
-            result = subprocess.run([
-                "ssh", f"rodemkay@{self.config['database']['host']}", 
-                f"cd {self.config['database']['remote_path']} && {cmd}"
-            ], capture_output=True, text=True, timeout=15)
+            result = get_transport(self.config).run(cmd, timeout=15)
             
             return "completed" in result.stdout
         except Exception:
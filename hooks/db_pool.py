@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+DB Pool - Native MySQL Verbindungen für die Hooks
+Ersetzt wp-cli Shell-Outs über SSH durch einen begrenzten Connection-Pool,
+wahlweise direkt per TCP oder über einen lokalen SSH-Tunnel
+"""
+
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from ssh_transport import get_transport
+
+try:
+    import mysql.connector
+    from mysql.connector import pooling
+    from mysql.connector.constants import ClientFlag
+except ImportError:
+    mysql = None
+    pooling = None
+    ClientFlag = None
+
+
+class DBPool:
+    def __init__(self, config):
+        self.config = config
+        self.pool_config = config.get('db_pool', {})
+        self.mode = self.pool_config.get('mode', 'tunnel')
+        self.pool_size = max(1, min(int(self.pool_config.get('size', 3)), 32))
+        self.table = f"{config['database']['table_prefix']}project_todos"
+        self._pool = None
+        self._lock = threading.Lock()
+        # Ältere Connector-Versionen kennen keinen prepared+dictionary Cursor
+        self._prepared = True
+
+    def _load_credentials(self):
+        """Lädt DB-Credentials aus der .env (gleiches Format wie cron_daemon)"""
+        env_file = Path(self.pool_config.get('credentials_file', '/home/rodemkay/www/react/.env'))
+        credentials = {}
+
+        if env_file.exists():
+            for line in env_file.read_text().split('\n'):
+                if '=' in line and not line.startswith('#'):
+                    key, value = line.split('=', 1)
+                    credentials[key.strip()] = value.strip().strip('"\'')
+
+        return {
+            'host': credentials.get('HETZNER_HOST', self.pool_config.get('mysql_host', '127.0.0.1')),
+            'user': credentials.get('HETZNER_DB_USER', ''),
+            'password': credentials.get('HETZNER_DB_PASS', ''),
+        }
+
+    def _open_tunnel(self):
+        """Lokalen Port-Forward auf dem geteilten SSH-Master einrichten"""
+        local_port = self.pool_config.get('local_port', 13306)
+        remote_host = self.pool_config.get('mysql_host', '127.0.0.1')
+        remote_port = self.pool_config.get('mysql_port', 3306)
+
+        transport = get_transport(self.config)
+        if not transport.forward(local_port, remote_host, remote_port):
+            raise ConnectionError(f"SSH tunnel to {remote_host}:{remote_port} failed")
+
+        return '127.0.0.1', local_port
+
+    def _connection_params(self):
+        credentials = self._load_credentials()
+
+        if self.mode == 'tunnel':
+            host, port = self._open_tunnel()
+        else:
+            host, port = credentials['host'], self.pool_config.get('mysql_port', 3306)
+
+        return {
+            'host': host,
+            'port': port,
+            'user': credentials['user'],
+            'password': credentials['password'],
+            'database': self.config['database']['db_name'],
+            'charset': 'utf8mb4',
+            'autocommit': True,
+            'connection_timeout': self.pool_config.get('connect_timeout', 10),
+            # Protokoll-Kompression für große Output-Parameter
+            'compress': self.pool_config.get('compress', True),
+            # rowcount = geänderte Zeilen wie ROW_COUNT() im wp-cli Pfad
+            # (mysql.connector setzt FOUND_ROWS sonst per Default)
+            'client_flags': [-ClientFlag.FOUND_ROWS],
+        }
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name=f"todo_hooks_{self.mode}",
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **self._connection_params()
+                )
+                logging.info(f"✅ MySQL pool ready ({self.mode}, size {self.pool_size})")
+            return self._pool
+
+    @contextmanager
+    def connection(self):
+        """Leiht eine Verbindung aus dem Pool aus und gibt sie danach zurück"""
+        conn = self._get_pool().get_connection()
+        try:
+            conn.ping(reconnect=True, attempts=2, delay=0)
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """Verbindung mit expliziter Transaktion (Commit bei Erfolg, sonst Rollback)"""
+        with self.connection() as conn:
+            conn.start_transaction()
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def cursor(self, conn, dictionary=False):
+        """Prepared Cursor, sonst (nicht unterstützte Kombination) ein normaler"""
+        if self._prepared:
+            try:
+                return conn.cursor(prepared=True, dictionary=dictionary)
+            except (TypeError, ValueError) as e:
+                logging.info(f"Prepared cursor unavailable, using client-side parameters: {e}")
+                self._prepared = False
+        return conn.cursor(dictionary=dictionary)
+
+    def fetch_all(self, query, params=()):
+        """Prepared SELECT - gibt typisierte Rows als Dicts zurück"""
+        with self.connection() as conn:
+            cursor = self.cursor(conn, dictionary=True)
+            try:
+                cursor.execute(query, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def fetch_one(self, query, params=()):
+        rows = self.fetch_all(query, params)
+        return rows[0] if rows else None
+
+    def execute(self, query, params=()):
+        """Prepared UPDATE/INSERT - gibt Anzahl geänderter Zeilen zurück"""
+        with self.connection() as conn:
+            cursor = self.cursor(conn)
+            try:
+                cursor.execute(query, params)
+                return cursor.rowcount
+            finally:
+                cursor.close()
+
+    def execute_ack(self, query, params, ack_query, ack_params=()):
+        """UPDATE plus Bestätigungs-SELECT auf derselben Verbindung"""
+        with self.connection() as conn:
+            cursor = self.cursor(conn, dictionary=True)
+            try:
+                cursor.execute(query, params)
+                affected = cursor.rowcount
+                cursor.execute(ack_query, ack_params)
+                row = cursor.fetchone() or {}
+                return dict(row, affected=affected)
+            finally:
+                cursor.close()
+
+
+# Global Pool Instance (None wenn deaktiviert oder nicht verfügbar)
+_db_pool = None
+_db_pool_failed = False
+_db_pool_lock = threading.Lock()
+
+
+def get_pool(config):
+    """
+    Singleton Pattern für DB Pool - None wenn wp-cli Fallback genutzt werden soll.
+    Opt-in: nur mit db_pool.enabled = true in der config.
+    """
+    global _db_pool, _db_pool_failed
+
+    if _db_pool is not None:
+        return _db_pool
+    if _db_pool_failed or not config.get('db_pool', {}).get('enabled', False):
+        return None
+
+    with _db_pool_lock:
+        # Parallele Threads (Completion-Stages) bauen nur einen Pool/Tunnel auf
+        if _db_pool is not None or _db_pool_failed:
+            return _db_pool
+
+        if mysql is None:
+            logging.warning("⚠️ mysql.connector not installed, using wp-cli fallback")
+            _db_pool_failed = True
+            return None
+
+        try:
+            pool = DBPool(config)
+            pool._get_pool()
+            _db_pool = pool
+        except Exception as e:
+            logging.warning(f"⚠️ MySQL pool unavailable, using wp-cli fallback: {e}")
+            _db_pool_failed = True
+
+    return _db_pool
+
+
+def disable_pool():
+    """Schaltet den Pool für den Rest des Prozesses ab (nach Laufzeitfehlern)"""
+    global _db_pool, _db_pool_failed
+    _db_pool = None
+    _db_pool_failed = True
+
+
+if __name__ == "__main__":
+    with open(Path(__file__).parent / "config.json") as f:
+        config = json.load(f)
+
+    pool = get_pool(config)
+    if pool:
+        print(pool.fetch_one("SELECT 1 AS ok"))
+    else:
+        print("MySQL pool disabled or unavailable - wp-cli fallback active")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+DB Query - Parametrisierte Queries ohne Shell-Escaping
+Parameter gehen entweder als gebundene Werte über den nativen Pool oder
+als SQL-Skript per stdin an `wp db query` - der Query-Text landet nie
+in einer Shell-Kommandozeile
+"""
+
+import base64
+import json
+import logging
+import re
+import struct
+import subprocess
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from db_pool import get_pool, disable_pool
+from ssh_transport import get_transport
+from todo_record import iter_lines, unescape
+
+# Platzhalter wie bei mysql.connector (paramstyle 'format')
+_PLACEHOLDER_RE = re.compile(r'%s')
+
+# Nur Zeichen ersetzen, die tatsächlich vorkommen (C-schnelle replace-Läufe)
+_LITERAL_ESCAPES = (
+    ('\\', '\\\\'),
+    ("'", "\\'"),
+    ('\0', '\\0'),
+    ('\x1a', '\\Z'),
+)
+
+
+# Defaults, überschreibbar per config['db_query']
+DEFAULT_COMPRESS_THRESHOLD = 16384
+DEFAULT_COMPRESS_LEVEL = 6
+
+_stats_lock = threading.Lock()
+_stats = {
+    'scripts': 0,
+    'script_bytes': 0,
+    'script_ms': 0.0,
+    'compressed_params': 0,
+    'raw_bytes': 0,
+    'sent_bytes': 0,
+    'compress_ms': 0.0,
+}
+
+
+def _count(**values):
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def get_stats():
+    """Zähler für Kompression (Bytes gespart) und Skript-Latenz"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['saved_bytes'] = stats['raw_bytes'] - stats['sent_bytes']
+    stats['avg_script_ms'] = round(stats['script_ms'] / stats['scripts'], 2) if stats['scripts'] else 0.0
+    return stats
+
+
+def _compression_settings(config):
+    query_config = config.get('db_query', {})
+    threshold = query_config.get('compress_threshold', DEFAULT_COMPRESS_THRESHOLD)
+    return (threshold if threshold and threshold > 0 else None), query_config.get('compress_level', DEFAULT_COMPRESS_LEVEL)
+
+
+def _escape(value):
+    for char, escaped in _LITERAL_ESCAPES:
+        if char in value:
+            value = value.replace(char, escaped)
+    return value
+
+
+def compressed_literal(data, level=DEFAULT_COMPRESS_LEVEL):
+    """
+    Literal im MySQL COMPRESS()-Format (4 Byte Länge LE + zlib), das der Server
+    per UNCOMPRESS() selbst entpackt. zlib statt zstd, weil MySQL nur das
+    nativ dekomprimieren kann.
+    """
+    start = time.perf_counter()
+    payload = struct.pack('<I', len(data)) + zlib.compress(data, level)
+    encoded = base64.b64encode(payload).decode('ascii')
+    _count(compressed_params=1, raw_bytes=len(data), sent_bytes=len(encoded),
+           compress_ms=(time.perf_counter() - start) * 1000)
+    return f"UNCOMPRESS(FROM_BASE64('{encoded}'))"
+
+
+def literal(value, compress_threshold=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    """SQL-Literal für einen Parameter (nur für das stdin-Skript)"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Binärdaten unverändert übertragen
+        return f"FROM_BASE64('{base64.b64encode(bytes(value)).decode('ascii')}')"
+
+    value = str(value)
+    if compress_threshold and len(value) >= compress_threshold:
+        data = value.encode('utf-8')
+        return f"CONVERT({compressed_literal(data, compress_level)} USING utf8mb4)"
+    return f"_utf8mb4'{_escape(value)}'"
+
+
+def render(sql, params=(), compress_threshold=None, compress_level=DEFAULT_COMPRESS_LEVEL):
+    """Setzt Parameter als Literale in %s-Platzhalter ein (große Strings komprimiert)"""
+    params = iter(params)
+    try:
+        return _PLACEHOLDER_RE.sub(
+            lambda match: literal(next(params), compress_threshold, compress_level), sql
+        )
+    except StopIteration:
+        raise ValueError(f"Not enough parameters for query: {sql[:80]}")
+
+
+def render_for(config, sql, params=()):
+    """render() mit den Kompressions-Einstellungen aus der Config"""
+    threshold, level = _compression_settings(config)
+    return render(sql, params, threshold, level)
+
+
+def _text(value):
+    """Pool-Werte (datetime, Decimal, bytearray) als Strings wie im wp-cli Output"""
+    if value is None:
+        return None
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+def parse_rows(output):
+    """wp db query Batch-Output -> Liste von Dicts (Header + tab-getrennte Zeilen)"""
+    rows = []
+    columns = None
+    for line in iter_lines(output):
+        if not line:
+            continue
+        parts = line.split('\t')
+        if columns is None or parts == columns:
+            # Mehrere SELECTs in einem Skript liefern je eine Header-Zeile
+            columns = parts
+            continue
+        rows.append({
+            column: None if raw == 'NULL' else unescape(raw)
+            for column, raw in zip(columns, parts)
+        })
+    return rows
+
+
+def run_script(config, script, timeout=60):
+    """Führt ein SQL-Skript per stdin aus - gibt (stdout, returncode, stderr) zurück"""
+    start = time.perf_counter()
+    try:
+        result = get_transport(config).run("wp db query", input=script, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return "", 1, f"wp db query timed out after {timeout}s"
+    finally:
+        _count(scripts=1, script_bytes=len(script), script_ms=(time.perf_counter() - start) * 1000)
+    return result.stdout, result.returncode, result.stderr.strip()
+
+
+def execute(config, sql, params=(), timeout=60):
+    """
+    Prepared UPDATE/INSERT/DELETE. Gibt Anzahl betroffener Zeilen zurück,
+    None wenn die Query fehlgeschlagen ist. Pool und wp-cli zählen gleich:
+    geänderte Zeilen (ROW_COUNT() ohne CLIENT_FOUND_ROWS) - ein UPDATE, das
+    eine Zeile trifft, aber keinen Wert ändert, liefert 0.
+    """
+    pool = get_pool(config)
+    if pool:
+        try:
+            return pool.execute(sql, params)
+        except Exception as e:
+            logging.warning(f"⚠️ MySQL pool query failed, falling back to wp-cli: {e}")
+            disable_pool()
+
+    script = f"{render_for(config, sql, params)};\nSELECT ROW_COUNT() AS affected;"
+    output, code, error = run_script(config, script, timeout)
+    if code != 0:
+        logging.error(f"❌ Query failed: {error}")
+        return None
+
+    rows = parse_rows(output)
+    return int(rows[-1]['affected']) if rows else 0
+
+
+def execute_ack(config, sql, params, ack_sql, ack_params=(), timeout=60):
+    """
+    Write mit Bestätigung im selben Round-Trip: führt das UPDATE aus und liest
+    direkt danach ack_sql (z.B. status, updated_at der Zeile).
+    Gibt {'affected': n, **ack_row} zurück, None wenn die Query fehlgeschlagen ist.
+    affected zählt wie execute() geänderte Zeilen - ob die Zeile den Zielstand
+    hat, zeigt verlässlich erst ack_row.
+    """
+    pool = get_pool(config)
+    if pool:
+        try:
+            row = pool.execute_ack(sql, params, ack_sql, ack_params)
+            return {key: value if key == 'affected' else _text(value) for key, value in row.items()}
+        except Exception as e:
+            logging.warning(f"⚠️ MySQL pool query failed, falling back to wp-cli: {e}")
+            disable_pool()
+
+    ack_select = render_for(config, ack_sql, ack_params)
+    if not ack_select.lstrip().upper().startswith('SELECT '):
+        raise ValueError(f"Acknowledgement query must be a SELECT: {ack_sql[:80]}")
+    script = (
+        f"{render_for(config, sql, params)};\n"
+        f"SET @affected = ROW_COUNT();\n"
+        f"SELECT @affected AS affected, {ack_select.lstrip()[7:]};"
+    )
+    output, code, error = run_script(config, script, timeout)
+    if code != 0:
+        logging.error(f"❌ Query failed: {error}")
+        return None
+
+    rows = parse_rows(output)
+    if not rows:
+        return {'affected': 0}
+    row = rows[-1]
+    row['affected'] = int(row['affected'])
+    return row
+
+
+def fetch_all(config, sql, params=(), timeout=60):
+    """Prepared SELECT - Liste von Dicts (Werte als Strings), None bei Fehler"""
+    pool = get_pool(config)
+    if pool:
+        try:
+            return [
+                {key: _text(value) for key, value in row.items()}
+                for row in pool.fetch_all(sql, params)
+            ]
+        except Exception as e:
+            logging.warning(f"⚠️ MySQL pool query failed, falling back to wp-cli: {e}")
+            disable_pool()
+
+    output, code, error = run_script(config, render_for(config, sql, params) + ";", timeout)
+    if code != 0:
+        logging.error(f"❌ Query failed: {error}")
+        return None
+    return parse_rows(output)
+
+
+def fetch_one(config, sql, params=(), timeout=60):
+    rows = fetch_all(config, sql, params, timeout)
+    return rows[0] if rows else None
+
+
+def _legacy_escape(value):
+    """Bisheriger Weg: SQL-Escaping per replace() plus Shell-Quoting (nur für bench)"""
+    value = value.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
+    query = f"UPDATE t SET claude_html_output='{value}' WHERE id=1"
+    return f"wp db query '{query.replace(chr(39), chr(39) + chr(92) + chr(39) + chr(39))}'"
+
+
+if __name__ == "__main__":
+    import sys
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "bench"
+
+    if command == "bench":
+        size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+        chunk = '<div class="result"><p>Todo \'done\' - path C:\\tmp\\out</p></div>\n'
+        payload = chunk * (size_kb * 1024 // len(chunk))
+        rounds = 20
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            legacy = _legacy_escape(payload)
+        legacy_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            rendered = render("UPDATE t SET claude_html_output=%s WHERE id=%s", (payload, 1))
+        render_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            compressed = render("UPDATE t SET claude_html_output=%s WHERE id=%s", (payload, 1), DEFAULT_COMPRESS_THRESHOLD)
+        compressed_ms = (time.perf_counter() - start) * 1000 / rounds
+
+        print(json.dumps({
+            'payload_bytes': len(payload.encode()),
+            'legacy': {'ms': round(legacy_ms, 2), 'bytes': len(legacy.encode())},
+            'parameterised': {'ms': round(render_ms, 2), 'bytes': len(rendered.encode())},
+            'compressed': {'ms': round(compressed_ms, 2), 'bytes': len(compressed.encode())},
+        }, indent=2))
+    elif command == "query":
+        with open(Path(__file__).parent / "config.json") as f:
+            config = json.load(f)
+        print(json.dumps(fetch_all(config, sys.argv[2]), indent=2, ensure_ascii=False))
+    else:
+        print("Usage: db_query.py [bench [SIZE_KB]|query SQL]")
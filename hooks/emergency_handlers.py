@@ -13,6 +13,10 @@ from pathlib import Path
 import subprocess
 import logging
 import threading
+from todo_cache import invalidate_todo
+from session_archive import archive_session, archive_options
+from archive_store import get_archive_store
+from session_slots import find_todo_state
 
 # Logging Setup
 logging.basicConfig(
@@ -60,15 +64,9 @@ class EmergencyHandler:
         logging.warning(f"⚠️ Completion timeout reached for Todo #{todo_id}")
         
         try:
-            # Prüfe ob Todo noch aktiv ist
-            current_todo_path = Path(self.config["paths"]["current_todo"])
-            if not current_todo_path.exists():
-                logging.info(f"Todo #{todo_id} already completed normally")
-                return
-            
-            active_id = current_todo_path.read_text().strip()
-            if active_id != str(todo_id):
-                logging.info(f"Different todo active ({active_id}), timeout not relevant")
+            # Prüfe ob Todo noch aktiv ist (globale Session oder ein Slot)
+            if find_todo_state(self.config, todo_id) is None:
+                logging.info(f"Todo #{todo_id} no longer held by any session, timeout not relevant")
                 return
             
             # Emergency Completion
@@ -184,6 +182,7 @@ WHERE id={todo_id}"""
                 "ssh", f"rodemkay@{self.config['database']['host']}", 
                 f"cd {self.config['database']['remote_path']} && {cmd}"
             ], capture_output=True, text=True, timeout=60)
+            invalidate_todo(self.config, todo_id)
             
             if result.returncode == 0:
                 logging.info(f"✅ Emergency database update successful for Todo #{todo_id}")
@@ -199,35 +198,44 @@ WHERE id={todo_id}"""
     def _emergency_cleanup(self, todo_id):
         """Emergency Cleanup"""
         try:
-            # Remove current todo file
-            current_todo_path = Path(self.config["paths"]["current_todo"])
-            if current_todo_path.exists():
-                current_todo_path.unlink()
-                logging.info("✅ Current todo file removed")
-            
-            # Remove completion marker
-            task_completed_path = Path(self.config["paths"]["task_completed"])
-            if task_completed_path.exists():
-                task_completed_path.unlink()
-                logging.info("✅ Task completed marker removed")
+            # Nur die State-Dateien der Session, die dieses Todo hält
+            state = find_todo_state(self.config, todo_id)
+            if state:
+                # Remove current todo file
+                current_todo_path = Path(state["current_todo"])
+                if current_todo_path.exists():
+                    current_todo_path.unlink()
+                    logging.info(f"✅ Current todo file removed ({current_todo_path})")
+                
+                # Remove completion marker
+                task_completed_path = Path(state["task_completed"])
+                if task_completed_path.exists():
+                    task_completed_path.unlink()
+                    logging.info("✅ Task completed marker removed")
             
             # Archive session if exists
             session_dir = Path(f"/tmp/claude_session_{todo_id}")
             if session_dir.exists():
                 archive_dir = Path(self.config["paths"]["archive"]) / f"emergency_todo_{todo_id}_{int(time.time())}"
-                archive_dir.mkdir(parents=True, exist_ok=True)
-                
-                for file in session_dir.iterdir():
-                    if file.is_file():
-                        try:
-                            (archive_dir / file.name).write_bytes(file.read_bytes())
-                        except:
-                            pass  # Ignore individual file errors in emergency
+                options = dict(archive_options(self.config), mode='move')
                 
-                # Remove original session dir
-                import shutil
-                shutil.rmtree(session_dir, ignore_errors=True)
-                logging.info(f"✅ Session archived to {archive_dir}")
+                try:
+                    if self.config.get('archive', {}).get('backend', 'store') == 'store':
+                        # Content-adressiert, Historie im Manifest des Todos; zero-copy per rename
+                        get_archive_store(self.config).archive_session(todo_id, session_dir, kind='emergency', mode='move')
+                        archive_dir = f"archive store (todo #{todo_id})"
+                    else:
+                        # Quelle wird ohnehin gelöscht: verschieben statt kopieren
+                        stats = archive_session(session_dir, archive_dir, **options)
+                        archive_dir = stats['path']
+                except Exception as e:
+                    # Session-Verzeichnis bleibt für manuelle Sicherung liegen
+                    logging.warning(f"⚠️ Emergency archiving failed, keeping {session_dir}: {e}")
+                else:
+                    # Remove original session dir (erst nach erfolgreicher Archivierung)
+                    import shutil
+                    shutil.rmtree(session_dir, ignore_errors=True)
+                    logging.info(f"✅ Session archived to {archive_dir}")
             
         except Exception as e:
             logging.warning(f"⚠️ Emergency cleanup partial failure: {e}")
@@ -242,6 +250,7 @@ WHERE id={todo_id}"""
                 "ssh", f"rodemkay@{self.config['database']['host']}", 
                 f"cd {self.config['database']['remote_path']} && {cmd}"
             ], capture_output=True, text=True, timeout=30)
+            invalidate_todo(self.config, todo_id)
             
             if result.returncode == 0:
                 # Emergency cleanup
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Event Extractor - Klassifiziert Terminal-Output in einem Durchlauf
+Alle Erkenner werden zu EINEM vorkompilierten Pattern kombiniert; jede Zeile
+wird genau einmal betrachtet statt mehrerer Substring-Checks plus re.search
+"""
+
+import re
+import time
+from collections import namedtuple
+
+# kind = Event-Typ, triggers = Literale, von denen mindestens eines in der Zeile
+# vorkommen muss ('\n' am Anfang = Zeilenanfang), pattern = Zeilen-Regex mit
+# genau einer benannten Gruppe 'value'
+Recogniser = namedtuple('Recogniser', 'kind triggers pattern')
+
+# Reihenfolge = Priorität (erster passender Erkenner einer Zeile gewinnt)
+DEFAULT_RECOGNISERS = (
+    Recogniser('file_created', ('File created successfully',), r'.*?File created successfully.*?at: (?P<value>.+)'),
+    Recogniser('file_updated', ('has been updated',), r'.*?file (?P<value>.+?) has been updated'),
+    Recogniser('test_result', (' passed', ' failed'), r'.*?(?P<value>\b\d+ (?:passed|failed)\b(?:,? \d+ (?:passed|failed|skipped|errors?|warnings?)\b)*)'),
+    Recogniser('error', ('Traceback (', 'Error: ', 'Exception: ', '❌'), r'.*?(?P<value>Traceback \(most recent call last\).*|\b\w*(?:Error|Exception)\b: .*|❌.*)'),
+    Recogniser('command', ('\n$', '\n#'), r'[$#]\s*(?P<value>.*)'),
+)
+
+
+class EventExtractor:
+    def __init__(self, recognisers=DEFAULT_RECOGNISERS):
+        self.recognisers = list(recognisers)
+        self._compile()
+
+    def _compile(self):
+        """
+        Alle Trigger-Literale als EIN kombiniertes Pattern für den Scan über den
+        gesamten Text (Literal-Alternation: schnelle Suche im C-Code von re);
+        nur Zeilen mit Treffer werden danach klassifiziert
+        """
+        triggers = sorted({trigger for r in self.recognisers for trigger in r.triggers}, key=len, reverse=True)
+        self._scanner = re.compile('|'.join(re.escape(trigger) for trigger in triggers))
+        self._line_patterns = [(r.kind, re.compile(r.pattern)) for r in self.recognisers]
+        self._line_start_chars = ''.join(
+            trigger[1] for r in self.recognisers for trigger in r.triggers if trigger.startswith('\n')
+        )
+
+    def register(self, kind, triggers, pattern, before=None):
+        """Neuen Erkenner hinzufügen (optional vor einem bestehenden kind)"""
+        recogniser = Recogniser(kind, tuple(triggers), pattern)
+        kinds = [existing.kind for existing in self.recognisers]
+        if before in kinds:
+            self.recognisers.insert(kinds.index(before), recogniser)
+        else:
+            self.recognisers.append(recogniser)
+        self._compile()
+
+    def classify(self, line):
+        """(kind, value) für eine einzelne Zeile oder None"""
+        for kind, pattern in self._line_patterns:
+            match = pattern.match(line)
+            if match:
+                return kind, match.group('value').strip()
+        return None
+
+    def extract(self, text):
+        """Generator über (kind, value) in Reihenfolge des Auftretens, max. ein Event pro Zeile"""
+        search = self._scanner.search
+        find = text.find
+        rfind = text.rfind
+        pos = 0
+
+        # Zeilenanfang-Trigger ('\n$') greifen für die allererste Zeile nicht
+        if text[:1] and text[0] in self._line_start_chars:
+            hit_line_start = 0
+        else:
+            hit_line_start = None
+
+        while True:
+            if hit_line_start is None:
+                hit = search(text, pos)
+                if hit is None:
+                    return
+                start = hit.start()
+                if text[start] == '\n':
+                    hit_line_start = start + 1
+                else:
+                    hit_line_start = rfind('\n', 0, start) + 1
+            line_end = find('\n', hit_line_start)
+            if line_end == -1:
+                line_end = len(text)
+            event = self.classify(text[hit_line_start:line_end])
+            if event:
+                yield event
+            # Zeilenende als Position: ein '\n$'-Trigger der nächsten Zeile bleibt auffindbar
+            pos = line_end
+            hit_line_start = None
+
+
+# Geteilte Instanz - Pattern wird nur einmal pro Prozess kompiliert
+_extractor = None
+
+
+def get_extractor():
+    """Singleton Pattern für Event Extractor"""
+    global _extractor
+    if _extractor is None:
+        _extractor = EventExtractor()
+    return _extractor
+
+
+def _legacy_extract(text):
+    """Bisherige Zeilen-Schleife aus collect_outputs_for_todo (nur für bench)"""
+    events = []
+    for line in text.split('\n'):
+        if 'File created successfully' in line:
+            match = re.search(r'at: (.+)', line)
+            if match:
+                events.append(('file_created', match.group(1)))
+        elif 'has been updated' in line:
+            match = re.search(r'file (.+) has been updated', line)
+            if match:
+                events.append(('file_updated', match.group(1)))
+        elif line.startswith('$') or line.startswith('#'):
+            events.append(('command', line[1:].strip()))
+    return events
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        size_mb = float(sys.argv[2]) if len(sys.argv) > 2 else 4
+        block = "\n".join([
+            "● Write(/tmp/example.py)",
+            "  ⎿  File created successfully at: /tmp/example.py",
+            "  ⎿  The file /tmp/other.py has been updated. Here's the result:",
+            "$ pytest -q",
+            "12 passed, 1 skipped in 0.42s",
+            "ValueError: invalid literal for int()",
+            "      some ordinary output line with text that matches nothing at all",
+            "      another ordinary line of terminal output from a long session run",
+        ] + [
+            # Typische Session: Großteil der Zeilen ist Code-/Diff-Ausgabe ohne Event
+            f"  {n:>4} |     result = compute_value(items[{n}], options)  # plain output" for n in range(60)
+        ]) + "\n"
+        text = block * int(size_mb * 1024 * 1024 / len(block))
+
+        start = time.perf_counter()
+        legacy = _legacy_extract(text)
+        legacy_ms = (time.perf_counter() - start) * 1000
+
+        extractor = get_extractor()
+        start = time.perf_counter()
+        per_line = [event for event in map(extractor.classify, text.split('\n')) if event]
+        per_line_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        events = list(extractor.extract(text))
+        single_pass_ms = (time.perf_counter() - start) * 1000
+
+        print(json.dumps({
+            'capture_bytes': len(text.encode()),
+            'legacy': {'ms': round(legacy_ms, 1), 'events': len(legacy)},
+            'per_line_all_recognisers': {'ms': round(per_line_ms, 1), 'events': len(per_line)},
+            'single_pass': {'ms': round(single_pass_ms, 1), 'events': len(events)},
+        }, indent=2))
+    elif len(sys.argv) > 1:
+        with open(sys.argv[1], encoding='utf-8', errors='replace') as f:
+            for kind, value in get_extractor().extract(f.read()):
+                print(f"{kind}\t{value}")
+    else:
+        print("Usage: event_extractor.py [bench [SIZE_MB]|FILE]")
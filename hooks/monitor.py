@@ -10,6 +10,7 @@ import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 import sys
+from ssh_transport import get_transport
 
 # Konfiguration laden
 CONFIG_PATH = Path(__file__).parent / "config.json"
@@ -34,10 +35,10 @@ class HookSystemMonitor:
                 todo_id = f.read().strip()
                 
             # Prüfe ob Todo in DB existiert
-            cmd = f"ssh {CONFIG['database']['user']}@{CONFIG['database']['host']} \"cd {CONFIG['database']['remote_path']} && wp db query 'SELECT id, status FROM {CONFIG['database']['table_prefix']}project_todos WHERE id={todo_id}'\""
+            cmd = f"wp db query 'SELECT id, status FROM {CONFIG['database']['table_prefix']}project_todos WHERE id={todo_id}'"
             
             try:
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
+                result = get_transport(CONFIG).run(cmd, timeout=10)
                 if result.returncode == 0 and todo_id in result.stdout:
                     self.status['checks'].append(f"✅ Todo #{todo_id} exists in database")
                 else:
@@ -82,12 +83,15 @@ class HookSystemMonitor:
                         
     def check_db_connection(self):
         """Prüft Datenbankverbindung"""
-        cmd = f"ssh {CONFIG['database']['user']}@{CONFIG['database']['host']} \"cd {CONFIG['database']['remote_path']} && wp db query 'SELECT 1'\""
+        transport = get_transport(CONFIG)
         
         try:
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=5)
+            # Health Check des geteilten Kanals (startet Master falls nötig)
+            transport.health_check(force=True)
+            result = transport.run("wp db query 'SELECT 1'", timeout=5)
             if result.returncode == 0:
-                self.status['checks'].append("✅ Database connection OK")
+                stats = transport.get_stats()
+                self.status['checks'].append(f"✅ Database connection OK ({stats['last_ms']:.0f}ms)")
             else:
                 self.status['errors'].append("❌ Database connection failed!")
                 self.status['healthy'] = False
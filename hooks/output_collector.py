@@ -7,47 +7,238 @@ Sammelt und verarbeitet Claude's Outputs während der Session
 import json
 import os
 import re
-import html
 from datetime import datetime
 from pathlib import Path
 import subprocess
+from collections import deque
+
+from event_extractor import get_extractor
+from report_renderer import REPORT_FORMATS, render_reports, summarize
+
+# tmux Pane, in dem Claude arbeitet (Default ohne Slot/Config-Eintrag)
+TMUX_TARGET = "plugin-todo:0.0"
+
+# ANSI Escape-Sequenzen (CSI/OSC) und Carriage Returns aus dem pipe-pane Stream
+ANSI_RE = re.compile(r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]|\r')
+
+# Einträge pro Kategorie, die zusätzlich zum Event-Log im Speicher bleiben
+TAIL_SIZE = 50
+
+# kind im Event-Log -> Kategorie in OutputCollector.outputs
+EVENT_CATEGORIES = {
+    'file_created': 'files_created',
+    'file_modified': 'files_modified',
+    'command': 'commands_executed',
+    'error': 'errors_encountered',
+    'action': 'key_actions',
+}
+
+def _session_dir(todo_id):
+    return Path(f"/tmp/claude_session_{todo_id}")
+
+def _pane_position(target):
+    """(history_size, absolute Cursor-Zeile) des Panes oder None"""
+    try:
+        result = subprocess.run(
+            ["tmux", "display-message", "-p", "-t", target, "#{history_size} #{cursor_y}"],
+            capture_output=True, text=True, timeout=5
+        )
+        if result.returncode == 0:
+            history_size, cursor_y = (int(value) for value in result.stdout.split())
+            return history_size, history_size + cursor_y
+    except (OSError, subprocess.SubprocessError, ValueError):
+        pass
+    return None
+
+def _read_pane_state(session_dir):
+    """tmux-Target und Startzeile, die beim Laden des Todos gemerkt wurden"""
+    try:
+        return json.loads((session_dir / "terminal.pane").read_text())
+    except (OSError, ValueError):
+        return {}
+
+def _write_pane_state(session_dir, state):
+    (session_dir / "terminal.pane").write_text(json.dumps(state))
+
+def session_tmux_target(todo_id):
+    """Pane, an den das Todo beim Laden gebunden wurde"""
+    return _read_pane_state(_session_dir(todo_id)).get('target', TMUX_TARGET)
+
+def start_terminal_stream(todo_id, target=TMUX_TARGET):
+    """
+    Hängt den Pane-Output per `tmux pipe-pane` laufend an terminal.log der
+    Session an - nichts geht verloren, wenn Zeilen aus dem Screen scrollen.
+    Target und aktuelle Pane-Zeile werden in terminal.pane gemerkt, damit
+    Completion denselben Pane stoppt und der capture-pane Fallback erst ab
+    dem Laden des Todos liest.
+    """
+    session_dir = _session_dir(todo_id)
+    session_dir.mkdir(exist_ok=True)
+    log_file = session_dir / "terminal.log"
+    
+    position = _pane_position(target)
+    _write_pane_state(session_dir, {'target': target, 'line': position[1] if position else None})
+    try:
+        # Evtl. laufende Pipe (vorheriges Todo) schließen, dann neu öffnen
+        subprocess.run(["tmux", "pipe-pane", "-t", target], capture_output=True, timeout=5)
+        result = subprocess.run(
+            ["tmux", "pipe-pane", "-t", target, f"cat >> '{log_file}'"],
+            capture_output=True, text=True, timeout=5
+        )
+        return result.returncode == 0
+    except Exception:
+        return False
+
+def stop_terminal_stream(target=TMUX_TARGET):
+    """Schließt die pipe-pane Verbindung (ohne Befehl = aus)"""
+    try:
+        subprocess.run(["tmux", "pipe-pane", "-t", target], capture_output=True, timeout=5)
+    except Exception:
+        pass
 
 class OutputCollector:
     def __init__(self, todo_id):
         self.todo_id = todo_id
         self.session_start = datetime.now()
-        self.outputs = {
-            'files_created': [],
-            'files_modified': [],
-            'commands_executed': [],
-            'errors_encountered': [],
-            'key_actions': [],
-            'raw_text': []
-        }
+        
+        # Nur ein begrenzter Tail im Speicher - vollständig ist das Event-Log
+        self.outputs = {category: deque(maxlen=TAIL_SIZE) for category in EVENT_CATEGORIES.values()}
+        self.outputs['raw_text'] = deque(maxlen=3)
+        self.counts = dict.fromkeys(EVENT_CATEGORIES.values(), 0)
         
         # Pfade für Session-Tracking
-        self.session_dir = Path(f"/tmp/claude_session_{todo_id}")
+        self.session_dir = _session_dir(todo_id)
         self.session_dir.mkdir(exist_ok=True)
         
+        # Streaming-Capture: Log + Lese-Offset (Bytes bereits verarbeitet)
+        self.terminal_log = self.session_dir / "terminal.log"
+        self.offset_file = self.session_dir / "terminal.offset"
+        
+        # Pane des Todos (vom Slot/Config beim Laden festgelegt)
+        self.pane_state = _read_pane_state(self.session_dir)
+        self.tmux_target = self.pane_state.get('target', TMUX_TARGET)
+        
+        # Strukturiertes Event-Log (JSONL, eine Zeile pro Event)
+        self.event_log = self.session_dir / "events.jsonl"
+        self._event_file = None
+        
         # Output-Dateien
         self.html_file = self.session_dir / "output.html"
         self.text_file = self.session_dir / "output.txt"
         self.summary_file = self.session_dir / "summary.txt"
         
+        # Events einer früheren (evtl. abgestürzten) Instanz übernehmen
+        self._replay_event_log()
+        
+    def _replay_event_log(self):
+        """Baut Zähler und Tail aus einem bestehenden Event-Log auf"""
+        for event in self.iter_events():
+            category = EVENT_CATEGORIES.get(event.pop('kind', None))
+            if category:
+                self.outputs[category].append(event)
+                self.counts[category] += 1
+    
+    def _record(self, kind, entry):
+        """Hängt ein Event an das Log an (zeilengepuffert = sofort auf Platte)"""
+        if self._event_file is None:
+            self._event_file = open(self.event_log, 'a', encoding='utf-8', buffering=1)
+            if self._event_file.tell():
+                with open(self.event_log, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._event_file.write("\n")  # Halbe Zeile eines Absturzes abschließen
+        self._event_file.write(json.dumps({'kind': kind, **entry}, ensure_ascii=False, separators=(',', ':')) + "\n")
+        
+        category = EVENT_CATEGORIES[kind]
+        self.outputs[category].append(entry)
+        self.counts[category] += 1
+    
+    def iter_events(self, kind=None):
+        """Generator über alle Events des Logs (optional nur ein kind)"""
+        if not self.event_log.exists():
+            return
+        with open(self.event_log, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue  # Halb geschriebene Zeile nach Absturz
+                if kind is None or event.get('kind') == kind:
+                    yield event
+    
+    def reset_event_log(self):
+        """Verwirft alle Events (z.B. vor erneutem Parsen der kompletten History)"""
+        self.close()
+        self.event_log.unlink(missing_ok=True)
+        for category in EVENT_CATEGORIES.values():
+            self.outputs[category].clear()
+            self.counts[category] = 0
+    
+    def close(self):
+        if self._event_file is not None:
+            self._event_file.close()
+            self._event_file = None
+        
     def collect_from_terminal(self):
-        """Sammelt Output aus dem Terminal/tmux Session"""
+        """
+        Sammelt Output aus dem Terminal/tmux Session. Mit laufendem Stream
+        (terminal.log) werden nur die seit dem letzten Aufruf neuen Bytes gelesen,
+        sonst per capture-pane die Pane-Zeilen seit dem Laden des Todos
+        """
+        if self.terminal_log.exists():
+            new_text = self._read_stream_increment()
+            self.outputs['raw_text'].append(new_text)
+            return new_text
+        
+        new_text = self._capture_pane_increment()
+        if new_text:
+            self.outputs['raw_text'].append(new_text)
+        return new_text
+    
+    def _capture_pane_increment(self):
+        """
+        capture-pane ab der gemerkten Zeile statt der kompletten History -
+        Output früherer Todos im selben Pane bleibt draußen. Danach wird die
+        Zeile weitergeschoben, ein zweiter Aufruf liest nichts doppelt.
+        Ohne gemerkte Zeile nur der sichtbare Screen.
+        """
+        position = _pane_position(self.tmux_target)
+        start_line = self.pane_state.get('line')
+        command = ["tmux", "capture-pane", "-t", self.tmux_target, "-p", "-J"]
+        if position and start_line is not None:
+            history_size = position[0]
+            # Absolute Zeile -> relativ zum Screen (negativ = History)
+            start = start_line - history_size
+            command += ["-S", str(start) if start >= -history_size else "-"]
+        
         try:
-            # Versuche tmux pane content zu lesen
-            result = subprocess.run(
-                ["tmux", "capture-pane", "-t", "plugin-todo:0.0", "-p"],
-                capture_output=True, text=True
-            )
-            if result.returncode == 0:
-                self.outputs['raw_text'].append(result.stdout)
-                return result.stdout
-        except:
-            pass
-        return ""
+            result = subprocess.run(command, capture_output=True, text=True, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            return ""
+        if result.returncode != 0:
+            return ""
+        
+        if position:
+            self.pane_state = dict(self.pane_state, target=self.tmux_target, line=position[1])
+            _write_pane_state(self.session_dir, self.pane_state)
+        return result.stdout
+    
+    def _read_stream_increment(self):
+        """Liest terminal.log ab dem gespeicherten Offset - O(neue Bytes)"""
+        try:
+            offset = int(self.offset_file.read_text().strip() or 0)
+        except (OSError, ValueError):
+            offset = 0
+        
+        with open(self.terminal_log, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < offset:
+                offset = 0  # Log wurde neu angelegt
+            f.seek(offset)
+            data = f.read()
+        
+        self.offset_file.write_text(str(offset + len(data)))
+        return ANSI_RE.sub('', data.decode('utf-8', errors='replace'))
     
     def track_file_operation(self, operation, file_path):
         """Trackt Datei-Operationen"""
@@ -55,14 +246,14 @@ class OutputCollector:
         entry = {"time": timestamp, "path": file_path}
         
         if operation == "created":
-            self.outputs['files_created'].append(entry)
+            self._record('file_created', entry)
         elif operation == "modified":
-            self.outputs['files_modified'].append(entry)
+            self._record('file_modified', entry)
             
     def track_command(self, command, output="", success=True):
         """Trackt ausgeführte Befehle"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.outputs['commands_executed'].append({
+        self._record('command', {
             "time": timestamp,
             "command": command,
             "success": success,
@@ -72,7 +263,7 @@ class OutputCollector:
     def track_error(self, error_msg):
         """Trackt aufgetretene Fehler"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.outputs['errors_encountered'].append({
+        self._record('error', {
             "time": timestamp,
             "error": error_msg
         })
@@ -80,309 +271,111 @@ class OutputCollector:
     def add_key_action(self, action):
         """Fügt eine wichtige Aktion hinzu"""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        self.outputs['key_actions'].append({
+        self._record('action', {
             "time": timestamp,
             "action": action
         })
     
+    def render_reports(self, formats=REPORT_FORMATS):
+        """
+        Rendert Markdown, HTML, Text und Summary in EINEM Durchlauf über das
+        Event-Log und speichert sie im Session-Verzeichnis
+        """
+        reports = render_reports(
+            self.iter_events(), self.todo_id, self.session_start,
+            raw_text=''.join(self.outputs['raw_text']), formats=formats
+        )
+        files = {
+            'markdown': self.session_dir / "output.md",
+            'html': self.session_dir / "output.html",
+            'text': self.text_file,
+            'summary': self.summary_file,
+        }
+        for fmt in (*formats, 'summary'):
+            with open(files[fmt], 'w', encoding='utf-8') as f:
+                f.write(reports[fmt])
+        
+        if 'markdown' in formats:
+            # Update file references für Markdown
+            self.html_file = files['markdown']  # Überschreibe html_file mit md_file für Kompatibilität
+            self.markdown_file = files['markdown']  # Explizite Markdown-Referenz
+        return reports
+    
     def generate_markdown_output(self):
         """Generiert Markdown-Zusammenfassung der Session für bessere Lesbarkeit"""
-        markdown_content = f"""# 📋 Todo #{self.todo_id} - Session Report
-
-## 📊 Session Information
-- **Session Start:** {self.session_start.strftime("%Y-%m-%d %H:%M:%S")}
-- **Session Duration:** {(datetime.now() - self.session_start).total_seconds():.0f} Sekunden
-
-"""
-        
-        # Key Actions
-        if self.outputs['key_actions']:
-            markdown_content += "## 🎯 Hauptaktionen\n\n"
-            for action in self.outputs['key_actions']:
-                markdown_content += f"- `[{action['time']}]` {action['action']}\n"
-            markdown_content += "\n"
-        
-        # Files Created
-        if self.outputs['files_created']:
-            markdown_content += f"## 📁 Erstellte Dateien ({len(self.outputs['files_created'])})\n\n"
-            for file in self.outputs['files_created']:
-                markdown_content += f"- `{file['path']}` [{file['time']}]\n"
-            markdown_content += "\n"
-        
-        # Files Modified
-        if self.outputs['files_modified']:
-            markdown_content += f"## ✏️ Geänderte Dateien ({len(self.outputs['files_modified'])})\n\n"
-            for file in self.outputs['files_modified']:
-                markdown_content += f"- `{file['path']}` [{file['time']}]\n"
-            markdown_content += "\n"
-        
-        # Commands Executed
-        if self.outputs['commands_executed']:
-            markdown_content += f"## 💻 Ausgeführte Befehle ({len(self.outputs['commands_executed'])})\n\n"
-            markdown_content += "Die letzten 10 Befehle:\n\n"
-            for cmd in self.outputs['commands_executed'][-10:]:  # Letzte 10 Befehle
-                status = "✅" if cmd['success'] else "❌"
-                markdown_content += f"{status} `{cmd['command']}` [{cmd['time']}]\n"
-                if cmd.get('output'):
-                    markdown_content += f"   ```\n   {cmd['output'][:200]}\n   ```\n"
-            markdown_content += "\n"
-        
-        # Errors
-        if self.outputs['errors_encountered']:
-            markdown_content += f"## ⚠️ Aufgetretene Fehler ({len(self.outputs['errors_encountered'])})\n\n"
-            for error in self.outputs['errors_encountered']:
-                markdown_content += f"- `[{error['time']}]` {error['error']}\n"
-            markdown_content += "\n"
-        
-        # Raw Output (falls vorhanden)
-        if self.outputs.get('raw_text') and self.outputs['raw_text']:
-            last_output = ''.join(self.outputs['raw_text'][-3:])  # Letzte 3 Captures
-            if last_output:
-                markdown_content += "## 📝 Terminal Output (Auszug)\n\n```\n"
-                markdown_content += last_output[-3000:]  # Letzte 3000 Zeichen
-                markdown_content += "\n```\n"
-        
-        # Speichern als .md Datei
-        md_file = self.session_dir / "output.md"
-        with open(md_file, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-        
-        # Update file references für Markdown
-        self.html_file = md_file  # Überschreibe html_file mit md_file für Kompatibilität
-        self.markdown_file = md_file  # Explizite Markdown-Referenz
-            
-        return markdown_content
+        return self.render_reports(('markdown',))['markdown']
     
     def generate_html_output(self):
         """Generiert HTML-Zusammenfassung der Session"""
-        html_content = f"""<!DOCTYPE html>
-<html lang="de">
-<head>
-    <meta charset="UTF-8">
-    <title>Todo #{self.todo_id} - Session Report</title>
-    <style>
-        body {{ font-family: system-ui, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
-        h1 {{ color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px; }}
-        h2 {{ color: #34495e; margin-top: 30px; }}
-        .section {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-        .success {{ color: #28a745; }}
-        .error {{ color: #dc3545; }}
-        .file {{ background: #e9ecef; padding: 5px 10px; border-radius: 3px; margin: 5px 0; font-family: monospace; }}
-        .command {{ background: #2c3e50; color: #ecf0f1; padding: 10px; border-radius: 5px; margin: 10px 0; }}
-        .timestamp {{ color: #6c757d; font-size: 0.9em; }}
-        ul {{ list-style-type: none; padding-left: 0; }}
-        li {{ margin: 10px 0; }}
-    </style>
-</head>
-<body>
-    <h1>📋 Todo #{self.todo_id} - Session Report</h1>
-    <div class="section">
-        <p><strong>Session Start:</strong> {self.session_start.strftime("%Y-%m-%d %H:%M:%S")}</p>
-        <p><strong>Session Duration:</strong> {(datetime.now() - self.session_start).total_seconds():.0f} Sekunden</p>
-    </div>
-"""
-        
-        # Key Actions
-        if self.outputs['key_actions']:
-            html_content += """
-    <h2>🎯 Hauptaktionen</h2>
-    <div class="section">
-        <ul>"""
-            for action in self.outputs['key_actions']:
-                html_content += f"""
-            <li><span class="timestamp">[{action['time']}]</span> {html.escape(action['action'])}</li>"""
-            html_content += """
-        </ul>
-    </div>"""
-        
-        # Files Created
-        if self.outputs['files_created']:
-            html_content += f"""
-    <h2>📁 Erstellte Dateien ({len(self.outputs['files_created'])})</h2>
-    <div class="section">
-        <ul>"""
-            for file in self.outputs['files_created']:
-                html_content += f"""
-            <li><span class="file">{html.escape(file['path'])}</span> <span class="timestamp">[{file['time']}]</span></li>"""
-            html_content += """
-        </ul>
-    </div>"""
-        
-        # Files Modified
-        if self.outputs['files_modified']:
-            html_content += f"""
-    <h2>✏️ Geänderte Dateien ({len(self.outputs['files_modified'])})</h2>
-    <div class="section">
-        <ul>"""
-            for file in self.outputs['files_modified']:
-                html_content += f"""
-            <li><span class="file">{html.escape(file['path'])}</span> <span class="timestamp">[{file['time']}]</span></li>"""
-            html_content += """
-        </ul>
-    </div>"""
-        
-        # Commands Executed
-        if self.outputs['commands_executed']:
-            html_content += f"""
-    <h2>💻 Ausgeführte Befehle ({len(self.outputs['commands_executed'])})</h2>
-    <div class="section">"""
-            for cmd in self.outputs['commands_executed'][-10:]:  # Letzte 10 Befehle
-                status = "✅" if cmd['success'] else "❌"
-                html_content += f"""
-        <div class="command">
-            <span>{status}</span> <code>{html.escape(cmd['command'])}</code>
-            <span class="timestamp">[{cmd['time']}]</span>
-        </div>"""
-            html_content += """
-    </div>"""
-        
-        # Errors
-        if self.outputs['errors_encountered']:
-            html_content += f"""
-    <h2>⚠️ Aufgetretene Fehler ({len(self.outputs['errors_encountered'])})</h2>
-    <div class="section">
-        <ul>"""
-            for error in self.outputs['errors_encountered']:
-                html_content += f"""
-            <li class="error"><span class="timestamp">[{error['time']}]</span> {html.escape(error['error'])}</li>"""
-            html_content += """
-        </ul>
-    </div>"""
-        
-        html_content += """
-</body>
-</html>"""
-        
-        # Speichern
-        with open(self.html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        return html_content
+        return self.render_reports(('html',))['html']
     
     def generate_text_output(self):
         """Generiert Plain-Text Zusammenfassung"""
-        text_lines = [
-            f"Todo #{self.todo_id} - Session Report",
-            "=" * 50,
-            f"Session Start: {self.session_start.strftime('%Y-%m-%d %H:%M:%S')}",
-            f"Duration: {(datetime.now() - self.session_start).total_seconds():.0f} Sekunden",
-            "",
-        ]
-        
-        if self.outputs['key_actions']:
-            text_lines.append("HAUPTAKTIONEN:")
-            for action in self.outputs['key_actions']:
-                text_lines.append(f"  [{action['time']}] {action['action']}")
-            text_lines.append("")
-        
-        if self.outputs['files_created']:
-            text_lines.append(f"ERSTELLTE DATEIEN ({len(self.outputs['files_created'])}):")
-            for file in self.outputs['files_created']:
-                text_lines.append(f"  - {file['path']} [{file['time']}]")
-            text_lines.append("")
-        
-        if self.outputs['files_modified']:
-            text_lines.append(f"GEÄNDERTE DATEIEN ({len(self.outputs['files_modified'])}):")
-            for file in self.outputs['files_modified']:
-                text_lines.append(f"  - {file['path']} [{file['time']}]")
-            text_lines.append("")
-        
-        if self.outputs['commands_executed']:
-            text_lines.append(f"BEFEHLE ({len(self.outputs['commands_executed'])}):")
-            for cmd in self.outputs['commands_executed'][-5:]:
-                status = "✓" if cmd['success'] else "✗"
-                text_lines.append(f"  {status} {cmd['command']} [{cmd['time']}]")
-            text_lines.append("")
-        
-        if self.outputs['errors_encountered']:
-            text_lines.append(f"FEHLER ({len(self.outputs['errors_encountered'])}):")
-            for error in self.outputs['errors_encountered']:
-                text_lines.append(f"  [{error['time']}] {error['error']}")
-            text_lines.append("")
-        
-        text_output = "\n".join(text_lines)
-        
-        # Speichern
-        with open(self.text_file, 'w', encoding='utf-8') as f:
-            f.write(text_output)
-            
-        return text_output
+        return self.render_reports(('text',))['text']
     
     def generate_summary(self):
         """Generiert kurze Zusammenfassung (max 150 Zeichen)"""
-        # Zähle Aktionen
-        files_created = len(self.outputs['files_created'])
-        files_modified = len(self.outputs['files_modified'])
-        commands = len(self.outputs['commands_executed'])
-        errors = len(self.outputs['errors_encountered'])
-        
-        # Erstelle Summary
-        parts = []
-        if files_created > 0:
-            parts.append(f"{files_created} Dateien erstellt")
-        if files_modified > 0:
-            parts.append(f"{files_modified} geändert")
-        if commands > 0:
-            parts.append(f"{commands} Befehle")
-        if errors > 0:
-            parts.append(f"{errors} Fehler")
-            
-        if parts:
-            summary = "✅ " + ", ".join(parts)
-        else:
-            summary = "✅ Task abgeschlossen"
-            
-        # Kürzen auf 150 Zeichen
-        if len(summary) > 150:
-            summary = summary[:147] + "..."
-            
-        # Speichern
+        summary = summarize({kind: self.counts[category] for kind, category in EVENT_CATEGORIES.items()})
         with open(self.summary_file, 'w', encoding='utf-8') as f:
             f.write(summary)
-            
         return summary
     
     def cleanup(self):
         """Räumt temporäre Dateien auf"""
-        # Session-Verzeichnis behalten für Debugging
-        # Kann später gelöscht werden nach erfolgreichem DB-Update
-        pass
+        # Session-Verzeichnis (inkl. events.jsonl) behalten für Debugging und
+        # die Fallback-Layer von robust_completion - nur das Log schließen
+        self.close()
 
 # Integration mit todo-manager.py
 def collect_outputs_for_todo(todo_id):
     """Hauptfunktion zum Sammeln aller Outputs für ein Todo"""
     collector = OutputCollector(todo_id)
     
-    # Sammle Terminal-Output
+    # Sammle Terminal-Output (Stream beenden, dann Rest ab Offset lesen;
+    # ohne Stream nur die Pane-Zeilen seit dem Laden - Event-Log bleibt)
+    if collector.terminal_log.exists():
+        stop_terminal_stream(collector.tmux_target)
     terminal_content = collector.collect_from_terminal()
     
-    # Parse Terminal-Content für File-Operationen und Commands
-    # (Vereinfachte Version - kann erweitert werden)
-    for line in terminal_content.split('\n'):
-        if 'File created successfully' in line:
-            # Extract file path
-            match = re.search(r'at: (.+)', line)
-            if match:
-                collector.track_file_operation('created', match.group(1))
-        elif 'has been updated' in line:
-            # Extract file path
-            match = re.search(r'file (.+) has been updated', line)
-            if match:
-                collector.track_file_operation('modified', match.group(1))
-        elif line.startswith('$') or line.startswith('#'):
-            # Command line
-            collector.track_command(line[1:].strip())
+    # Terminal-Content in einem Durchlauf klassifizieren (vorkompilierte Erkenner)
+    for kind, value in get_extractor().extract(terminal_content):
+        if kind == 'file_created':
+            collector.track_file_operation('created', value)
+        elif kind == 'file_updated':
+            collector.track_file_operation('modified', value)
+        elif kind == 'command':
+            collector.track_command(value)
+        elif kind == 'error':
+            collector.track_error(value)
+        elif kind == 'test_result':
+            collector.add_key_action(f"Tests: {value}")
     
-    # Generiere Outputs - JETZT MARKDOWN STATT HTML!
-    markdown = collector.generate_markdown_output()  # NEU: Markdown statt HTML
-    text = collector.generate_text_output()
-    summary = collector.generate_summary()
+    # Generiere Outputs - JETZT MARKDOWN STATT HTML! (alle Formate in einem Durchlauf)
+    reports = collector.render_reports()
+    collector.cleanup()
     
     return {
-        'markdown': markdown,  # Geändert von 'html' zu 'markdown'
-        'html': markdown,      # Behalte 'html' key für Kompatibilität, nutze aber Markdown-Content
-        'text': text,
-        'summary': summary,
+        'markdown': reports['markdown'],  # Geändert von 'html' zu 'markdown'
+        'html': reports['markdown'],      # Behalte 'html' key für Kompatibilität, nutze aber Markdown-Content
+        'text': reports['text'],
+        'summary': reports['summary'],
+        'session_dir': str(collector.session_dir)
+    }
+
+def render_from_event_log(todo_id):
+    """
+    Rendert die Outputs nur aus events.jsonl (ohne Terminal-Zugriff) -
+    z.B. nach einem Absturz der Session
+    """
+    collector = OutputCollector(todo_id)
+    if not collector.event_log.exists():
+        return None
+    reports = collector.render_reports()
+    return {
+        'markdown': reports['markdown'],
+        'html': reports['markdown'],
+        'text': reports['text'],
+        'summary': reports['summary'],
         'session_dir': str(collector.session_dir)
     }
 
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Report Renderer - Session-Reports (Markdown, HTML, Text, Summary) in einem Durchlauf
+Die Events werden genau einmal gelesen und gleichzeitig in alle Formate
+gerendert; statische Template-Teile (HTML-Kopf, Abschnitts-Rahmen) und die
+Zeilen-Templates werden nur einmal pro Prozess gebaut
+"""
+
+import html
+import io
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+REPORT_FORMATS = ('markdown', 'html', 'text')
+
+# Reihenfolge der Abschnitte in allen Formaten
+SECTION_ORDER = ('action', 'file_created', 'file_modified', 'command', 'error')
+
+# kind -> Feld mit dem eigentlichen Wert (Befehle werden separat gerendert)
+ENTRY_FIELDS = {
+    'action': 'action',
+    'file_created': 'path',
+    'file_modified': 'path',
+    'error': 'error',
+}
+
+# Anzahl der zuletzt ausgeführten Befehle pro Format
+COMMAND_LIMITS = {'markdown': 10, 'html': 10, 'text': 5}
+
+# --- Markdown ---------------------------------------------------------------
+
+MD_HEAD = """# 📋 Todo #{todo_id} - Session Report
+
+## 📊 Session Information
+- **Session Start:** {start}
+- **Session Duration:** {duration} Sekunden
+
+""".format
+
+MD_SECTIONS = {
+    'action': ("## 🎯 Hauptaktionen\n\n", "\n"),
+    'file_created': ("## 📁 Erstellte Dateien ({count})\n\n", "\n"),
+    'file_modified': ("## ✏️ Geänderte Dateien ({count})\n\n", "\n"),
+    'command': ("## 💻 Ausgeführte Befehle ({count})\n\nDie letzten 10 Befehle:\n\n", "\n"),
+    'error': ("## ⚠️ Aufgetretene Fehler ({count})\n\n", "\n"),
+}
+
+MD_ENTRIES = {
+    'action': "- `[{time}]` {value}\n".format,
+    'file_created': "- `{value}` [{time}]\n".format,
+    'file_modified': "- `{value}` [{time}]\n".format,
+    'error': "- `[{time}]` {value}\n".format,
+}
+
+MD_COMMAND = "{status} `{command}` [{time}]\n".format
+MD_COMMAND_OUTPUT = "   ```\n   {output}\n   ```\n".format
+MD_RAW_OUTPUT = "## 📝 Terminal Output (Auszug)\n\n```\n{output}\n```\n".format
+
+# --- HTML -------------------------------------------------------------------
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="de">
+<head>
+    <meta charset="UTF-8">
+    <title>Todo #{todo_id} - Session Report</title>
+    <style>
+        body {{ font-family: system-ui, sans-serif; max-width: 1200px; margin: 0 auto; padding: 20px; }}
+        h1 {{ color: #2c3e50; border-bottom: 3px solid #3498db; padding-bottom: 10px; }}
+        h2 {{ color: #34495e; margin-top: 30px; }}
+        .section {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }}
+        .success {{ color: #28a745; }}
+        .error {{ color: #dc3545; }}
+        .file {{ background: #e9ecef; padding: 5px 10px; border-radius: 3px; margin: 5px 0; font-family: monospace; }}
+        .command {{ background: #2c3e50; color: #ecf0f1; padding: 10px; border-radius: 5px; margin: 10px 0; }}
+        .timestamp {{ color: #6c757d; font-size: 0.9em; }}
+        ul {{ list-style-type: none; padding-left: 0; }}
+        li {{ margin: 10px 0; }}
+    </style>
+</head>
+<body>
+    <h1>📋 Todo #{todo_id} - Session Report</h1>
+    <div class="section">
+        <p><strong>Session Start:</strong> {start}</p>
+        <p><strong>Session Duration:</strong> {duration} Sekunden</p>
+    </div>
+""".format
+
+_HTML_LIST_END = """
+        </ul>
+    </div>"""
+
+HTML_SECTIONS = {
+    'action': ("""
+    <h2>🎯 Hauptaktionen</h2>
+    <div class="section">
+        <ul>""", _HTML_LIST_END),
+    'file_created': ("""
+    <h2>📁 Erstellte Dateien ({count})</h2>
+    <div class="section">
+        <ul>""", _HTML_LIST_END),
+    'file_modified': ("""
+    <h2>✏️ Geänderte Dateien ({count})</h2>
+    <div class="section">
+        <ul>""", _HTML_LIST_END),
+    'command': ("""
+    <h2>💻 Ausgeführte Befehle ({count})</h2>
+    <div class="section">""", """
+    </div>"""),
+    'error': ("""
+    <h2>⚠️ Aufgetretene Fehler ({count})</h2>
+    <div class="section">
+        <ul>""", _HTML_LIST_END),
+}
+
+HTML_ENTRIES = {
+    'action': """
+            <li><span class="timestamp">[{time}]</span> {value}</li>""".format,
+    'file_created': """
+            <li><span class="file">{value}</span> <span class="timestamp">[{time}]</span></li>""".format,
+    'file_modified': """
+            <li><span class="file">{value}</span> <span class="timestamp">[{time}]</span></li>""".format,
+    'error': """
+            <li class="error"><span class="timestamp">[{time}]</span> {value}</li>""".format,
+}
+
+HTML_COMMAND = """
+        <div class="command">
+            <span>{status}</span> <code>{command}</code>
+            <span class="timestamp">[{time}]</span>
+        </div>""".format
+
+HTML_TAIL = """
+</body>
+</html>"""
+
+# --- Text -------------------------------------------------------------------
+
+TEXT_HEAD = ("Todo #{todo_id} - Session Report\n" + "=" * 50 + "\n"
+             "Session Start: {start}\nDuration: {duration} Sekunden\n\n").format
+
+TEXT_SECTIONS = {
+    'action': ("HAUPTAKTIONEN:\n", "\n"),
+    'file_created': ("ERSTELLTE DATEIEN ({count}):\n", "\n"),
+    'file_modified': ("GEÄNDERTE DATEIEN ({count}):\n", "\n"),
+    'command': ("BEFEHLE ({count}):\n", "\n"),
+    'error': ("FEHLER ({count}):\n", "\n"),
+}
+
+TEXT_ENTRIES = {
+    'action': "  [{time}] {value}\n".format,
+    'file_created': "  - {value} [{time}]\n".format,
+    'file_modified': "  - {value} [{time}]\n".format,
+    'error': "  [{time}] {value}\n".format,
+}
+
+TEXT_COMMAND = "  {status} {command} [{time}]\n".format
+
+# Format -> (Kopf, Abschnitts-Rahmen) bzw. Zeilen-Templates
+LAYOUTS = {
+    'markdown': (MD_HEAD, MD_SECTIONS),
+    'html': (HTML_HEAD, HTML_SECTIONS),
+    'text': (TEXT_HEAD, TEXT_SECTIONS),
+}
+ENTRY_TEMPLATES = {'markdown': MD_ENTRIES, 'html': HTML_ENTRIES, 'text': TEXT_ENTRIES}
+
+
+def summarize(counts):
+    """Kurze Zusammenfassung (max 150 Zeichen) aus den Event-Zählern"""
+    parts = []
+    if counts.get('file_created'):
+        parts.append(f"{counts['file_created']} Dateien erstellt")
+    if counts.get('file_modified'):
+        parts.append(f"{counts['file_modified']} geändert")
+    if counts.get('command'):
+        parts.append(f"{counts['command']} Befehle")
+    if counts.get('error'):
+        parts.append(f"{counts['error']} Fehler")
+
+    summary = "✅ " + ", ".join(parts) if parts else "✅ Task abgeschlossen"
+
+    # Kürzen auf 150 Zeichen
+    if len(summary) > 150:
+        summary = summary[:147] + "..."
+    return summary
+
+
+def _command_entries(fmt, commands):
+    """Die letzten Befehle im jeweiligen Format"""
+    limit = COMMAND_LIMITS[fmt]
+    for cmd in list(commands)[-limit:]:
+        if fmt == 'markdown':
+            yield MD_COMMAND(status="✅" if cmd['success'] else "❌", command=cmd['command'], time=cmd['time'])
+            if cmd.get('output'):
+                yield MD_COMMAND_OUTPUT(output=cmd['output'][:200])
+        elif fmt == 'html':
+            yield HTML_COMMAND(status="✅" if cmd['success'] else "❌", command=html.escape(cmd['command']), time=cmd['time'])
+        else:
+            yield TEXT_COMMAND(status="✓" if cmd['success'] else "✗", command=cmd['command'], time=cmd['time'])
+
+
+def render_reports(events, todo_id, session_start, raw_text='', formats=REPORT_FORMATS):
+    """
+    Rendert alle angeforderten Formate in EINEM Durchlauf über events.
+    Jede Zeile geht sofort in den StringIO-Writer ihres Formats und Abschnitts
+    (die Abschnitts-Köpfe brauchen die Anzahl, stehen also erst am Ende fest);
+    pro Event bleibt kein Zwischenobjekt liegen.
+    Gibt {format: text, 'summary': ..., 'counts': {kind: n}} zurück.
+    """
+    formats = tuple(fmt for fmt in REPORT_FORMATS if fmt in formats)
+    counts = dict.fromkeys(SECTION_ORDER, 0)
+    commands = deque(maxlen=max(COMMAND_LIMITS.values()))
+
+    # Pro Format und Abschnitt ein Writer für die gerenderten Zeilen
+    writers = {fmt: {kind: io.StringIO() for kind in ENTRY_FIELDS} for fmt in formats}
+    escape = html.escape
+
+    for event in events:
+        kind = event.get('kind')
+        if kind == 'command':
+            commands.append(event)
+            counts['command'] += 1
+            continue
+        field = ENTRY_FIELDS.get(kind)
+        if field is None:
+            continue
+        counts[kind] += 1
+        entry_time, value = event['time'], event[field]
+        for fmt in formats:
+            if fmt == 'html':
+                writers[fmt][kind].write(HTML_ENTRIES[kind](time=entry_time, value=escape(value)))
+            else:
+                writers[fmt][kind].write(ENTRY_TEMPLATES[fmt][kind](time=entry_time, value=value))
+
+    head = {
+        'todo_id': todo_id,
+        'start': session_start.strftime("%Y-%m-%d %H:%M:%S"),
+        'duration': f"{(datetime.now() - session_start).total_seconds():.0f}",
+    }
+
+    results = {}
+    for fmt in formats:
+        head_template, sections = LAYOUTS[fmt]
+        out = io.StringIO()
+        out.write(head_template(**head))
+        for kind in SECTION_ORDER:
+            if not counts[kind]:
+                continue
+            opening, closing = sections[kind]
+            out.write(opening.format(count=counts[kind]))
+            if kind == 'command':
+                out.writelines(_command_entries(fmt, commands))
+            else:
+                out.write(writers[fmt][kind].getvalue())
+                writers[fmt][kind].close()
+            out.write(closing)
+
+        if fmt == 'markdown' and raw_text:
+            out.write(MD_RAW_OUTPUT(output=raw_text[-3000:]))  # Letzte 3000 Zeichen
+        elif fmt == 'html':
+            out.write(HTML_TAIL)
+
+        rendered = out.getvalue()
+        # Text-Report endet wie bisher mit genau einer Leerzeile weniger
+        results[fmt] = rendered[:-1] if fmt == 'text' else rendered
+
+    results['summary'] = summarize(counts)
+    results['counts'] = counts
+    return results
+
+
+def _bench_events(count):
+    """Synthetische Session mit count Events (Mischung wie in echten Sessions)"""
+    kinds = ('command', 'command', 'file_modified', 'command', 'file_created', 'action', 'command', 'error')
+    for n in range(count):
+        kind = kinds[n % len(kinds)]
+        event = {'kind': kind, 'time': f"{10 + n // 3600 % 12:02d}:{n // 60 % 60:02d}:{n % 60:02d}"}
+        if kind == 'command':
+            event.update(command=f"pytest tests/test_module_{n}.py -q", success=n % 7 != 0, output="")
+        elif kind == 'action':
+            event['action'] = f"Tests: {n} passed, 1 failed"
+        elif kind == 'error':
+            event['error'] = f"KeyError: 'item_{n}' <in handler>"
+        else:
+            event['path'] = f"/var/www/project/src/module_{n}/file_{n}.py"
+        yield event
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    count = int(sys.argv[2]) if len(sys.argv) > 2 and sys.argv[1] == "bench" else 5000
+    if len(sys.argv) > 1 and sys.argv[1] != "bench":
+        print("Usage: report_renderer.py [bench [EVENTS]]")
+        sys.exit(1)
+
+    import tempfile
+
+    # Events wie im Session-Verzeichnis als JSONL ablegen
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False, encoding='utf-8') as f:
+        for event in _bench_events(count):
+            f.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + "\n")
+        log_path = f.name
+
+    def read_log():
+        with open(log_path, encoding='utf-8') as log:
+            for line in log:
+                yield json.loads(line)
+
+    start_time = datetime.now()
+    rounds = 10
+
+    # Bisheriges Muster: jedes Format liest und rendert das Log separat
+    start = time.perf_counter()
+    for _ in range(rounds):
+        separate = {fmt: render_reports(read_log(), 'bench', start_time, formats=(fmt,))[fmt] for fmt in REPORT_FORMATS}
+    separate_ms = (time.perf_counter() - start) * 1000 / rounds
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        combined = render_reports(read_log(), 'bench', start_time)
+    combined_ms = (time.perf_counter() - start) * 1000 / rounds
+    Path(log_path).unlink()
+
+    print(json.dumps({
+        'events': count,
+        'separate_passes_ms': round(separate_ms, 2),
+        'single_pass_ms': round(combined_ms, 2),
+        'per_report_ms': round(combined_ms / (len(REPORT_FORMATS) + 1), 2),
+        'bytes': {fmt: len(combined[fmt].encode()) for fmt in REPORT_FORMATS},
+        'summary': combined['summary'],
+    }, indent=2, ensure_ascii=False))
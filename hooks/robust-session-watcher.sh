@@ -7,6 +7,17 @@ LOG_FILE="/home/rodemkay/www/react/plugin-todo/hooks/logs/session-watcher.log"
 CHECK_INTERVAL=30
 ACTIVITY_TIMEOUT=300  # 5 Minuten ohne Aktivität = Problem
 
+# Session-Slot (parallele Sessions): State-Dateien wie todo_manager --slot
+if [ -n "$TODO_SLOT" ]; then
+    STATE_DIR="/tmp/claude_slots/$TODO_SLOT"
+    mkdir -p "$STATE_DIR"
+else
+    STATE_DIR="/tmp"
+fi
+CURRENT_TODO_FILE="$STATE_DIR/CURRENT_TODO_ID"
+TASK_COMPLETED_FILE="$STATE_DIR/TASK_COMPLETED"
+AUTO_EXECUTE_FILE="$STATE_DIR/CLAUDE_AUTO_EXECUTE"
+
 # Farben für bessere Sichtbarkeit
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -25,8 +36,8 @@ check_claude_activity() {
     local todo_id=$1
     
     # Prüfe wann die CURRENT_TODO_ID Datei zuletzt geändert wurde
-    if [ -f "/tmp/CURRENT_TODO_ID" ]; then
-        local file_age=$(( $(date +%s) - $(stat -c %Y /tmp/CURRENT_TODO_ID) ))
+    if [ -f "$CURRENT_TODO_FILE" ]; then
+        local file_age=$(( $(date +%s) - $(stat -c %Y "$CURRENT_TODO_FILE") ))
         
         if [ $file_age -gt $ACTIVITY_TIMEOUT ]; then
             echo -e "${RED}⚠️  Claude hängt! TODO #$todo_id seit ${file_age} Sekunden inaktiv${NC}"
@@ -60,7 +71,7 @@ handle_stuck_todo() {
     ssh rodemkay@159.69.157.54 "cd /var/www/forexsignale/staging && wp db query \"UPDATE stage_project_todos SET status='blocked', bemerkungen=CONCAT(bemerkungen, '\nAutomatisch blockiert: Claude inactive $(date)') WHERE id=$todo_id\"" 2>/dev/null
     
     # Lösche die Lock-Dateien
-    rm -f /tmp/CURRENT_TODO_ID
+    rm -f "$CURRENT_TODO_FILE"
     rm -f /tmp/TODO_SENT_TO_CLAUDE
     
     echo -e "${GREEN}✓ TODO #$todo_id auf 'blocked' gesetzt und Locks gelöscht${NC}"
@@ -76,11 +87,11 @@ complete_current_todo() {
     
     sleep 2
     
-    if [ ! -f "/tmp/CURRENT_TODO_ID" ]; then
+    if [ ! -f "$CURRENT_TODO_FILE" ]; then
         log_message "TODO #$todo_id erfolgreich abgeschlossen"
         echo -e "${GREEN}✅ TODO #$todo_id abgeschlossen${NC}"
         # Lösche auch andere Marker
-        rm -f /tmp/TASK_COMPLETED
+        rm -f "$TASK_COMPLETED_FILE"
         rm -f /tmp/TODO_SENT_TO_CLAUDE
         return 0
     else
@@ -104,27 +115,27 @@ load_and_start_todo() {
     
     # Lösche alte Marker
     rm -f /tmp/TODO_SENT_TO_CLAUDE
-    rm -f /tmp/TASK_COMPLETED
-    rm -f /tmp/CLAUDE_AUTO_EXECUTE
+    rm -f "$TASK_COMPLETED_FILE"
+    rm -f "$AUTO_EXECUTE_FILE"
     
     # Führe TODO aus - NUR ./todo, nicht mit -id!
     echo -e "${YELLOW}[WATCHER] Führe './todo' aus (lädt automatisch nächstes TODO)...${NC}"
     ./todo
     
     # Prüfe ob erfolgreich geladen
-    if [ -f "/tmp/CURRENT_TODO_ID" ]; then
-        local loaded_id=$(cat /tmp/CURRENT_TODO_ID 2>/dev/null)
+    if [ -f "$CURRENT_TODO_FILE" ]; then
+        local loaded_id=$(cat "$CURRENT_TODO_FILE" 2>/dev/null)
         if [ "$loaded_id" == "$todo_id" ]; then
             echo -e "${GREEN}✓ TODO #$todo_id erfolgreich geladen${NC}"
             
             # NEU: Prüfe ob AUTO-EXECUTE Datei existiert und sende den Inhalt an Claude
-            if [ -f "/tmp/CLAUDE_AUTO_EXECUTE" ]; then
+            if [ -f "$AUTO_EXECUTE_FILE" ]; then
                 echo -e "${CYAN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
                 echo -e "${CYAN}🚀 AUTO-EXECUTE MODUS AKTIVIERT!${NC}"
                 echo -e "${CYAN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
                 
                 # Lese den Prompt-Inhalt
-                local prompt_content=$(cat /tmp/CLAUDE_AUTO_EXECUTE)
+                local prompt_content=$(cat "$AUTO_EXECUTE_FILE")
                 
                 # Sende den Prompt direkt an Claude (im linken pane der plugin-todo session)
                 echo -e "${YELLOW}[WATCHER] Sende claude_prompt automatisch an Claude...${NC}"
@@ -133,10 +144,10 @@ load_and_start_todo() {
                 # WICHTIG: Wir sind bereits IN der Session, also einfach den Text ausgeben
                 echo -e "\n${CYAN}📋 AUTO-EXECUTION VON TODO #$todo_id:${NC}"
                 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
-                cat /tmp/CLAUDE_AUTO_EXECUTE
+                cat "$AUTO_EXECUTE_FILE"
                 echo "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━"
                 echo -e "${CYAN}⚠️ WICHTIG: Wenn fertig, führe aus:${NC}"
-                echo -e "${YELLOW}echo 'TASK_COMPLETED' > /tmp/TASK_COMPLETED${NC}"
+                echo -e "${YELLOW}echo 'TASK_COMPLETED' > $TASK_COMPLETED_FILE${NC}"
                 
                 # Markiere dass der Prompt gesendet wurde
                 touch /tmp/TODO_SENT_TO_CLAUDE
@@ -146,7 +157,7 @@ load_and_start_todo() {
                 echo -e "${CYAN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
                 echo -e "${CYAN}🤖 CLAUDE: Bitte bearbeite TODO #$todo_id${NC}"
                 echo -e "${CYAN}   Beschreibung wurde geladen.${NC}"
-                echo -e "${CYAN}   Wenn fertig: echo 'TASK_COMPLETED' > /tmp/TASK_COMPLETED${NC}"
+                echo -e "${CYAN}   Wenn fertig: echo 'TASK_COMPLETED' > $TASK_COMPLETED_FILE${NC}"
                 echo -e "${CYAN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
             fi
             
@@ -171,21 +182,21 @@ while true; do
     current_time=$(date +%s)
     
     # TASK_COMPLETED Check (höchste Priorität)
-    if [ -f "/tmp/TASK_COMPLETED" ]; then
-        current_id=$(cat /tmp/CURRENT_TODO_ID 2>/dev/null)
+    if [ -f "$TASK_COMPLETED_FILE" ]; then
+        current_id=$(cat "$CURRENT_TODO_FILE" 2>/dev/null)
         if [ -n "$current_id" ]; then
             echo -e "${YELLOW}[WATCHER] TASK_COMPLETED erkannt für TODO #$current_id${NC}"
             complete_current_todo "$current_id"
         else
             echo -e "${YELLOW}[WATCHER] TASK_COMPLETED ohne aktives TODO - lösche Marker${NC}"
-            rm -f /tmp/TASK_COMPLETED
+            rm -f "$TASK_COMPLETED_FILE"
         fi
         continue
     fi
     
     # Prüfe ob Claude beschäftigt ist
-    if [ -f "/tmp/CURRENT_TODO_ID" ]; then
-        current_id=$(cat /tmp/CURRENT_TODO_ID 2>/dev/null)
+    if [ -f "$CURRENT_TODO_FILE" ]; then
+        current_id=$(cat "$CURRENT_TODO_FILE" 2>/dev/null)
         
         # DEAKTIVIERT: Automatisches Blockieren von TODOs
         # Der User entscheidet selbst, wann ein TODO blockiert werden soll
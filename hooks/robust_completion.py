@@ -6,6 +6,7 @@ Zuverlässige TASK_COMPLETED Verarbeitung mit Fallbacks
 
 import json
 import os
+import random
 import time
 import html
 from datetime import datetime
@@ -13,6 +14,12 @@ from pathlib import Path
 import subprocess
 import logging
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from ssh_transport import get_transport
+from todo_cache import get_todo_cache, invalidate_todo
+import db_query
+from session_archive import archive_session, archive_options
+from archive_store import get_archive_store
 
 # Logging Setup
 logging.basicConfig(
@@ -24,29 +31,50 @@ logging.basicConfig(
     ]
 )
 
+# Dokumentations-Generator (gleiches Skript wie im Legacy-Completion-Pfad)
+DOC_SCRIPT = "/home/rodemkay/www/react/plugin-todo/scripts/generate_task_documentation.sh"
+
 class RobustCompletion:
     def __init__(self, config):
         self.config = config
         self.retry_count = 0
         self.max_retries = config.get('behavior', {}).get('max_retries', 3)
         self.completion_timestamp = datetime.now()
+        self.post_workers = max(1, config.get('behavior', {}).get('completion_workers', 3))
+        self.stage_timings = {}
+        # 1-in-N Completions zusätzlich per separatem SELECT prüfen (0 = nie)
+        self.deep_verify_every = config.get('behavior', {}).get('deep_verify_every', 0)
+        self.write_ack = None
+        
+    def _timed(self, stage, func, *args):
+        """Führt eine Pipeline-Stage aus und merkt sich ihre Dauer in ms"""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.stage_timings[stage] = round((time.perf_counter() - start) * 1000, 1)
         
     def execute_completion(self, todo_id):
         """Hauptfunktion - Robuste Completion mit mehreren Fallback-Ebenen"""
         logging.info(f"🚀 Starting robust completion for Todo #{todo_id}")
+        start = time.perf_counter()
         
         # Layer 1: Output Collection mit Fallbacks
-        outputs = self._collect_outputs_multi_layer(todo_id)
+        outputs = self._timed('collect', self._collect_outputs_multi_layer, todo_id)
         
         # Layer 2: HTML Generation (auch bei Collector-Versagen)
-        html_output = self._generate_html_with_fallback(todo_id, outputs)
+        html_output = self._timed('generate', self._generate_html_with_fallback, todo_id, outputs)
         
         # Layer 3: Database Update mit Retry-Logic
-        success = self._update_database_with_retry(todo_id, outputs, html_output)
+        success = self._timed('database', self._update_database_with_retry, todo_id, outputs, html_output)
         
-        # Layer 4: Cleanup & Verification
+        # Layer 4: Cleanup & Verification (nach bestätigtem Write parallel)
         self._cleanup_and_verify(todo_id, success)
         
+        self.stage_timings['total'] = round((time.perf_counter() - start) * 1000, 1)
+        logging.info(f"⏱️ Completion stages for Todo #{todo_id}: " +
+                     ", ".join(f"{stage}={ms}ms" for stage, ms in self.stage_timings.items()))
+        
         return success
     
     def _collect_outputs_multi_layer(self, todo_id):
@@ -84,11 +112,16 @@ class RobustCompletion:
                 if md_file.exists():
                     outputs['html'] = md_file.read_text()  # Nutze Markdown für HTML-Feld
                     outputs['markdown'] = md_file.read_text()
+                elif (session_dir / "events.jsonl").exists():
+                    # Session abgestürzt bevor Outputs gerendert wurden: aus dem Event-Log
+                    from output_collector import render_from_event_log
+                    outputs.update(render_from_event_log(todo_id))
+                    text_file = summary_file = None
                 elif html_file.exists():
                     outputs['html'] = html_file.read_text()
-                if text_file.exists():
+                if text_file and text_file.exists():
                     outputs['text'] = text_file.read_text()
-                if summary_file.exists():
+                if summary_file and summary_file.exists():
                     outputs['summary'] = summary_file.read_text()
                     
                 outputs['method_used'] = 'session_directory'
@@ -98,10 +131,11 @@ class RobustCompletion:
             outputs['collection_errors'].append(f"session_directory: {str(e)}")
             logging.warning(f"⚠️ Session Directory fallback failed: {e}")
         
-        # Method 3: tmux Capture Fallback
+        # Method 3: tmux Capture Fallback (Pane, an den das Todo gebunden wurde)
         try:
+            from output_collector import session_tmux_target
             result = subprocess.run(
-                ["tmux", "capture-pane", "-t", "plugin-todo:0.0", "-p"],
+                ["tmux", "capture-pane", "-t", session_tmux_target(todo_id), "-p"],
                 capture_output=True, text=True, timeout=10
             )
             if result.returncode == 0 and result.stdout:
@@ -223,87 +257,133 @@ Task wurde erfolgreich abgeschlossen durch Claude Code CLI.
     
     def _execute_database_update(self, todo_id, outputs, html_output):
         """Führt Database Update aus"""
-        # MySQL-Escaping
-        html_escaped = html_output.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-        text_escaped = outputs.get('text', '').replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-        summary_escaped = outputs.get('summary', '').replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-        
-        # SQL Query
+        # Parametrisierte Query - Outputs gehen ungeescaped an db_query
         query = f"""UPDATE {self.config['database']['table_prefix']}project_todos 
 SET status='completed',
     completed_at=NOW(),
-    claude_html_output='{html_escaped}',
-    claude_text_output='{text_escaped}',
-    claude_summary='{summary_escaped}',
+    claude_html_output=%s,
+    claude_text_output=%s,
+    claude_summary=%s,
     updated_at=NOW()
-WHERE id={todo_id}"""
+WHERE id=%s"""
         
-        # SSH Command ausführen
-        query_escaped = query.replace("'", "'\\''")
-        cmd = f"wp db query '{query_escaped}'"
+        # Affected Rows + neuer Status/updated_at kommen im selben Round-Trip zurück
+        ack = db_query.execute_ack(
+            self.config, query,
+            (html_output, outputs.get('text', ''), outputs.get('summary', ''), int(todo_id)),
+            f"SELECT status, updated_at FROM {self.config['database']['table_prefix']}project_todos WHERE id=%s",
+            (int(todo_id),), timeout=30
+        )
+        invalidate_todo(self.config, todo_id)
         
-        result = subprocess.run([
-            "ssh", f"rodemkay@{self.config['database']['host']}", 
-            f"cd {self.config['database']['remote_path']} && {cmd}"
-        ], capture_output=True, text=True, timeout=30)
+        stats = db_query.get_stats()
+        logging.info(f"📦 Payload stats: {stats['raw_bytes']} raw / {stats['sent_bytes']} sent bytes, "
+                     f"avg script {stats['avg_script_ms']} ms")
         
-        return result.returncode == 0
+        if ack is None:
+            return False
+        self.write_ack = ack
+        if ack.get('status') != 'completed':
+            logging.error(f"❌ Write acknowledged {ack.get('affected')} rows but status is {ack.get('status')!r}")
+            return False
+        return True
     
     def _cleanup_and_verify(self, todo_id, success):
         """Layer 4: Cleanup & Verification"""
         try:
-            # Lösche current todo file
-            current_todo_path = Path(self.config["paths"]["current_todo"])
-            if current_todo_path.exists():
-                current_todo_path.unlink()
-                logging.info("✅ Current todo file cleaned up")
+            self._timed('cleanup', self._cleanup_marker_files)
             
-            # Lösche TASK_COMPLETED marker
-            task_completed_path = Path(self.config["paths"]["task_completed"])
-            if task_completed_path.exists():
-                task_completed_path.unlink()
-                logging.info("✅ TASK_COMPLETED marker cleaned up")
+            if not success:
+                return
             
-            # Archiviere Session-Daten bei Erfolg
-            if success:
-                self._archive_session_data(todo_id)
-            
-            # Status-Verifikation
-            if success:
-                self._verify_completion_status(todo_id)
+            # Archivierung, Dokumentation und Verifikation sind voneinander
+            # unabhängig und laufen nach dem bestätigten DB-Write parallel
+            stages = {
+                'archive': self._archive_session_data,
+                'documentation': self._generate_documentation,
+                'verify': self._verify_completion_status,
+            }
+            with ThreadPoolExecutor(max_workers=self.post_workers, thread_name_prefix='completion') as executor:
+                futures = {
+                    stage: executor.submit(self._timed, stage, func, todo_id)
+                    for stage, func in stages.items()
+                }
+                for stage, future in futures.items():
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error(f"❌ Completion stage {stage} failed: {e}")
                 
         except Exception as e:
             logging.error(f"❌ Cleanup failed: {e}")
     
+    def _cleanup_marker_files(self):
+        """Lösche current todo file und TASK_COMPLETED marker"""
+        current_todo_path = Path(self.config["paths"]["current_todo"])
+        if current_todo_path.exists():
+            current_todo_path.unlink()
+            logging.info("✅ Current todo file cleaned up")
+        
+        task_completed_path = Path(self.config["paths"]["task_completed"])
+        if task_completed_path.exists():
+            task_completed_path.unlink()
+            logging.info("✅ TASK_COMPLETED marker cleaned up")
+    
+    def _generate_documentation(self, todo_id):
+        """Automatische Dokumentations-Generierung (V3.0)"""
+        if not Path(DOC_SCRIPT).exists():
+            return
+        try:
+            result = subprocess.run([DOC_SCRIPT, str(todo_id)], capture_output=True, text=True, timeout=120)
+            if result.returncode == 0:
+                logging.info(f"📄 Documentation generated for Todo #{todo_id}")
+            else:
+                logging.warning(f"⚠️ Documentation generation failed: {result.stderr}")
+        except Exception as e:
+            logging.warning(f"⚠️ Documentation generation failed: {e}")
+    
     def _archive_session_data(self, todo_id):
         """Archiviert Session-Daten"""
         try:
             source_dir = Path(f"/tmp/claude_session_{todo_id}")
             if source_dir.exists():
-                archive_dir = Path(self.config["paths"]["archive"]) / f"todo_{todo_id}_{int(time.time())}"
-                archive_dir.mkdir(parents=True, exist_ok=True)
+                # Content-adressierter Store: wiederholte Completions belegen keinen neuen Platz
+                # (archive.store_zero_copy: Blobs per copy_file_range statt zlib-Stream)
+                if self.config.get('archive', {}).get('backend', 'store') == 'store':
+                    _, stats = get_archive_store(self.config).archive_session(todo_id, source_dir)
+                    logging.info(f"✅ Session data archived to store ({stats['files']} files, "
+                                 f"{stats['new_blobs']} new, {stats['deduplicated']} deduplicated, {stats['ms']} ms)")
+                    return
                 
-                for file in source_dir.iterdir():
-                    if file.is_file():
-                        (archive_dir / file.name).write_bytes(file.read_bytes())
+                archive_dir = Path(self.config["paths"]["archive"]) / f"todo_{todo_id}_{int(time.time())}"
                 
-                logging.info(f"✅ Session data archived to {archive_dir}")
+                # Reflink/copy_file_range statt read_bytes()/write_bytes() - unabhängiger Snapshot, Speicher bleibt flach
+                stats = archive_session(source_dir, archive_dir, **archive_options(self.config))
+                logging.info(f"✅ Session data archived to {stats['path']} "
+                             f"({stats['files']} files, {stats['bytes']} bytes, {stats['methods']}, {stats['ms']} ms)")
         except Exception as e:
             logging.warning(f"⚠️ Archiving failed: {e}")
     
     def _verify_completion_status(self, todo_id):
         """Verifiziert dass Completion in DB angekommen ist"""
+        ack = self.write_ack
+        deep_verify = self.deep_verify_every > 0 and random.randrange(self.deep_verify_every) == 0
+        
+        # Normalfall: die Write-Bestätigung enthält Status und updated_at bereits
+        if ack and ack.get('status') == 'completed' and not deep_verify:
+            logging.info(f"✅ Completion acknowledged by database for Todo #{todo_id} "
+                         f"(affected={ack.get('affected')}, updated_at={ack.get('updated_at')})")
+            return
+        
         try:
-            query = f"SELECT status, completed_at FROM {self.config['database']['table_prefix']}project_todos WHERE id={todo_id}"
-            cmd = f"wp db query '{query}'"
-            
-            result = subprocess.run([
-                "ssh", f"rodemkay@{self.config['database']['host']}", 
-                f"cd {self.config['database']['remote_path']} && {cmd}"
-            ], capture_output=True, text=True, timeout=15)
+            row = db_query.fetch_one(
+                self.config,
+                f"SELECT status, completed_at FROM {self.config['database']['table_prefix']}project_todos WHERE id=%s",
+                (int(todo_id),), timeout=15
+            )
             
-            if result.returncode == 0 and "completed" in result.stdout:
-                logging.info(f"✅ Completion verified in database for Todo #{todo_id}")
+            if row and row.get('status') == 'completed':
+                logging.info(f"✅ Completion verified in database for Todo #{todo_id} (deep verify)")
             else:
                 logging.error(f"❌ Completion verification failed for Todo #{todo_id}")
                 
@@ -312,14 +392,21 @@ WHERE id={todo_id}"""
     
     def _get_todo_data(self, todo_id):
         """Holt Todo-Daten für Fallback-HTML"""
+        # Read-Through: Header wurde beim Laden des Todos bereits lokal gecached
+        cached = get_todo_cache(self.config).get(todo_id) if str(todo_id).isdigit() else None
+        if cached:
+            return {
+                'title': cached.get('title') or 'Unknown',
+                'description': cached.get('description', ''),
+                'working_directory': cached.get('working_directory') or '/home/rodemkay/www/react/plugin-todo/',
+                'scope': cached.get('scope') or 'todo-plugin'
+            }
+        
         try:
             query = f"SELECT title, description, working_directory, scope FROM {self.config['database']['table_prefix']}project_todos WHERE id={todo_id}"
             cmd = f"wp db query '{query}'"
             
-            result = subprocess.run([
-                "ssh", f"rodemkay@{self.config['database']['host']}", 
-                f"cd {self.config['database']['remote_path']} && {cmd}"
-            ], capture_output=True, text=True, timeout=15)
+            result = get_transport(self.config).run(cmd, timeout=15)
             
             if result.returncode == 0 and result.stdout:
                 lines = result.stdout.strip().split('\n')
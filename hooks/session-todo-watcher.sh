@@ -6,6 +6,17 @@
 LOG_FILE="/home/rodemkay/www/react/plugin-todo/hooks/logs/session-watcher.log"
 CHECK_INTERVAL=30
 
+# Session-Slot (parallele Sessions): State-Dateien wie todo_manager --slot
+if [ -n "$TODO_SLOT" ]; then
+    STATE_DIR="/tmp/claude_slots/$TODO_SLOT"
+    mkdir -p "$STATE_DIR"
+else
+    STATE_DIR="/tmp"
+fi
+CURRENT_TODO_FILE="$STATE_DIR/CURRENT_TODO_ID"
+TASK_COMPLETED_FILE="$STATE_DIR/TASK_COMPLETED"
+AUTO_EXECUTE_FILE="$STATE_DIR/CLAUDE_AUTO_EXECUTE"
+
 # Farben für bessere Sichtbarkeit
 RED='\033[0;31m'
 GREEN='\033[0;32m'
@@ -30,7 +41,7 @@ complete_current_todo() {
     sleep 2
     
     # Prüfe ob erfolgreich
-    if [ ! -f "/tmp/CURRENT_TODO_ID" ]; then
+    if [ ! -f "$CURRENT_TODO_FILE" ]; then
         log_message "TODO #$todo_id erfolgreich abgeschlossen"
         echo -e "${GREEN}✅ TODO #$todo_id abgeschlossen${NC}"
         return 0
@@ -48,18 +59,18 @@ log_message "Session TODO Watcher gestartet"
 
 while true; do
     # Prüfe ob TASK_COMPLETED gesetzt wurde
-    if [ -f "/tmp/TASK_COMPLETED" ]; then
-        current_id=$(cat /tmp/CURRENT_TODO_ID 2>/dev/null)
+    if [ -f "$TASK_COMPLETED_FILE" ]; then
+        current_id=$(cat "$CURRENT_TODO_FILE" 2>/dev/null)
         if [ -n "$current_id" ]; then
             echo -e "${YELLOW}[WATCHER] TASK_COMPLETED erkannt für TODO #$current_id${NC}"
             complete_current_todo "$current_id"
-            rm -f /tmp/TASK_COMPLETED
+            rm -f "$TASK_COMPLETED_FILE"
         fi
     fi
     
     # Prüfe ob Claude beschäftigt ist
-    if [ -f "/tmp/CURRENT_TODO_ID" ]; then
-        current_id=$(cat /tmp/CURRENT_TODO_ID 2>/dev/null)
+    if [ -f "$CURRENT_TODO_FILE" ]; then
+        current_id=$(cat "$CURRENT_TODO_FILE" 2>/dev/null)
         echo -e "${BLUE}[WATCHER] Claude arbeitet an TODO #$current_id${NC}"
         log_message "Claude arbeitet an TODO #$current_id"
     else
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Session Archive - Archivierung von /tmp/claude_session_<id> ohne Kopien im Speicher
+Gleiches Dateisystem: rename/hardlink bzw. copy_file_range (Reflink im Kernel),
+sonst gestreamte Kopie in festen Blöcken; optional als ein komprimiertes Tarball
+"""
+
+import errno
+import json
+import logging
+import os
+import shutil
+import tarfile
+import time
+from pathlib import Path
+
+# Blockgröße für die gestreamte Fallback-Kopie
+CHUNK_SIZE = 1024 * 1024
+
+ARCHIVE_MODES = ('link', 'copy', 'move')
+
+# Fehler, bei denen die nächst langsamere Methode versucht wird
+_FALLBACK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL, errno.EMLINK}
+
+
+def _copy_file_range(src, dst):
+    """Kernel-seitige Kopie (auf btrfs/xfs als Reflink) - kein Userspace-Puffer"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), min(remaining, 1 << 30))
+            if copied == 0:
+                break
+            remaining -= copied
+        if remaining > 0:
+            raise OSError(errno.EINVAL, "copy_file_range stopped early")
+
+
+def _chunked_copy(src, dst):
+    """Gestreamte Kopie mit konstantem Speicherbedarf"""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, CHUNK_SIZE)
+    shutil.copystat(src, dst)
+
+
+def archive_file(src, dst, mode='copy'):
+    """
+    Legt src unter dst ab und gibt die verwendete Methode zurück.
+    mode='copy' erzeugt einen unabhängigen Snapshot (Reflink wo möglich),
+    'move' verschiebt (Quelle verschwindet). 'link' teilt den Inode - spätere
+    Schreibzugriffe auf die Quelle ändern das Archiv mit, also nur verwenden,
+    wenn die Quelle danach nicht mehr beschrieben wird.
+    """
+    src, dst = Path(src), Path(dst)
+
+    if mode == 'move':
+        try:
+            os.rename(src, dst)
+            return 'rename'
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    elif mode == 'link':
+        try:
+            os.link(src, dst)
+            return 'hardlink'
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+
+    method = None
+    if hasattr(os, 'copy_file_range'):
+        try:
+            _copy_file_range(src, dst)
+            shutil.copystat(src, dst)
+            method = 'copy_file_range'
+        except OSError as e:
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+    if method is None:
+        _chunked_copy(src, dst)
+        method = 'chunked_copy'
+
+    if mode == 'move':
+        src.unlink()
+    return method
+
+
+def pack_tarball(session_dir, tarball_path, compression='gz'):
+    """Packt ein Session-Verzeichnis gestreamt in ein einzelnes Tarball"""
+    session_dir = Path(session_dir)
+    with tarfile.open(tarball_path, f'w:{compression}') as tar:
+        for file in sorted(session_dir.iterdir()):
+            if file.is_file():
+                tar.add(file, arcname=file.name)
+    return Path(tarball_path)
+
+
+def archive_session(session_dir, archive_dir, mode='copy', tarball=False, compression='gz'):
+    """
+    Archiviert alle Dateien eines Session-Verzeichnisses.
+    Gibt Statistik zurück: {'path', 'files', 'bytes', 'methods', 'ms'}.
+    """
+    start = time.perf_counter()
+    session_dir, archive_dir = Path(session_dir), Path(archive_dir)
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f"Invalid archive mode: {mode}")
+
+    stats = {'path': None, 'files': 0, 'bytes': 0, 'methods': {}, 'ms': 0.0}
+    files = [file for file in session_dir.iterdir() if file.is_file()]
+
+    if tarball:
+        archive_dir.parent.mkdir(parents=True, exist_ok=True)
+        path = pack_tarball(session_dir, archive_dir.with_name(f"{archive_dir.name}.tar.{compression}"), compression)
+        for file in files:
+            stats['bytes'] += file.stat().st_size
+            if mode == 'move':
+                file.unlink()
+        stats['files'] = len(files)
+        stats['methods'] = {'tarball': len(files)}
+        stats['path'] = str(path)
+    else:
+        archive_dir.mkdir(parents=True, exist_ok=True)
+        for file in files:
+            size = file.stat().st_size
+            method = archive_file(file, archive_dir / file.name, mode)
+            stats['methods'][method] = stats['methods'].get(method, 0) + 1
+            stats['files'] += 1
+            stats['bytes'] += size
+        stats['path'] = str(archive_dir)
+
+    stats['ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return stats
+
+
+def archive_options(config):
+    """Archiv-Einstellungen aus config['archive']"""
+    archive_config = config.get('archive', {})
+    return {
+        'mode': archive_config.get('mode', 'copy'),
+        'tarball': archive_config.get('tarball', False),
+        'compression': archive_config.get('compression', 'gz'),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: session_archive.py SESSION_DIR ARCHIVE_DIR [copy|move|link] [--tarball]")
+        sys.exit(1)
+
+    logging.basicConfig(level=logging.INFO)
+    mode = sys.argv[3] if len(sys.argv) > 3 and not sys.argv[3].startswith('--') else 'copy'
+    print(json.dumps(archive_session(sys.argv[1], sys.argv[2], mode, tarball='--tarball' in sys.argv), indent=2))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Session-Slots - State-Dateien paralleler Sessions
+Jeder Slot führt CURRENT_TODO_ID, TASK_COMPLETED usw. unter paths.slots/<slot>;
+Monitor und Emergency-Handler fragen hier, welche Session ein Todo hält
+"""
+
+import time
+from pathlib import Path
+
+# Pfade, die pro Session-Slot getrennt geführt werden
+SLOT_PATH_KEYS = ('current_todo', 'task_completed', 'specific_mode', 'auto_execute', 'processing_lock')
+
+
+def get_slot_dir(config, slot):
+    """State-Verzeichnis eines Session-Slots"""
+    return Path(config["paths"]["slots"]) / slot
+
+
+def slot_paths(config, slot):
+    """State-Pfade eines Slots - gleiche Dateinamen wie im Single-Slot-Betrieb"""
+    slot_dir = get_slot_dir(config, slot)
+    return {key: str(slot_dir / Path(config["paths"][key]).name)
+            for key in SLOT_PATH_KEYS if key in config["paths"]}
+
+
+def list_slots(config):
+    """Alle Slots mit aktuell geclaimtem Todo: [(slot, todo_id, age_seconds)]"""
+    slots = []
+    slots_root = Path(config["paths"].get("slots", ""))
+    if not config["paths"].get("slots") or not slots_root.exists():
+        return slots
+
+    current_name = Path(config["paths"]["current_todo"]).name
+    for slot_dir in sorted(slots_root.iterdir()):
+        current_file = slot_dir / current_name
+        if not slot_dir.is_dir():
+            continue
+        try:
+            age = time.time() - current_file.stat().st_mtime
+            todo_id = current_file.read_text().strip()
+        except FileNotFoundError:
+            continue  # Slot frei (oder gerade abgeschlossen)
+        slots.append((slot_dir.name, todo_id, int(age)))
+    return slots
+
+
+def find_todo_state(config, todo_id):
+    """
+    State-Pfade der Session, die todo_id gerade hält - globale Session oder Slot.
+    None wenn kein Slot das Todo geclaimt hat.
+    """
+    todo_id = str(todo_id)
+    current_path = Path(config["paths"]["current_todo"])
+    try:
+        if current_path.read_text().strip() == todo_id:
+            return dict(config["paths"])
+    except FileNotFoundError:
+        pass
+
+    for slot, slot_todo, _age in list_slots(config):
+        if slot_todo == todo_id:
+            return dict(config["paths"], **slot_paths(config, slot))
+    return None
+
+
+def active_todo_ids(config):
+    """IDs aller Todos, die gerade von einer Session (global oder Slot) gehalten werden"""
+    active = {slot_todo for _slot, slot_todo, _age in list_slots(config)}
+    try:
+        active.add(Path(config["paths"]["current_todo"]).read_text().strip())
+    except FileNotFoundError:
+        pass
+    active.discard('')
+    return active
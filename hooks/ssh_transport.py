@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+SSH Transport - Persistente Multiplex-Verbindung zum Remote-Server
+Alle Hooks teilen sich einen OpenSSH ControlMaster Kanal statt pro Befehl
+einen neuen TCP+Key-Exchange Handshake zu bezahlen
+"""
+
+import json
+import subprocess
+import threading
+import time
+from pathlib import Path
+
+# Exit-Code von ssh selbst (Verbindungsfehler, nicht Remote-Befehl)
+SSH_CONNECTION_ERROR = 255
+
+
+class SSHTransport:
+    def __init__(self, config):
+        db_config = config['database']
+        transport_config = config.get('transport', {})
+
+        self.host = f"{db_config['user']}@{db_config['host']}"
+        self.remote_path = db_config['remote_path']
+
+        self.control_path = transport_config.get('control_path', '/tmp/todo-ssh-%C')
+        self.control_persist = transport_config.get('control_persist', 600)
+        self.connect_timeout = transport_config.get('connect_timeout', 10)
+        self.health_check_interval = transport_config.get('health_check_interval', 60)
+        self.max_reconnects = transport_config.get('max_reconnects', 1)
+
+        self._lock = threading.Lock()
+        self._last_health_check = 0.0
+        self.stats = {
+            'calls': 0,
+            'failures': 0,
+            'reconnects': 0,
+            'total_ms': 0.0,
+            'min_ms': None,
+            'max_ms': 0.0,
+            'last_ms': 0.0
+        }
+
+    def _ssh_args(self):
+        """Basis-Argumente für alle ssh Aufrufe über den Master-Kanal"""
+        return [
+            "ssh",
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self.control_path}",
+            "-o", f"ControlPersist={self.control_persist}",
+            "-o", f"ConnectTimeout={self.connect_timeout}",
+            "-o", "ServerAliveInterval=15",
+            "-o", "ServerAliveCountMax=3",
+        ]
+
+    def _control(self, operation, timeout=10):
+        """Steuerbefehl an den Master senden (check, exit)"""
+        try:
+            result = subprocess.run(
+                self._ssh_args() + ["-O", operation, self.host],
+                capture_output=True, text=True, timeout=timeout
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+    def is_alive(self):
+        """Prüft ob der Master-Kanal läuft"""
+        return self._control("check")
+
+    def health_check(self, force=False):
+        """Health Check mit Intervall - startet den Master neu wenn er hängt"""
+        now = time.time()
+        if not force and now - self._last_health_check < self.health_check_interval:
+            return True
+
+        self._last_health_check = now
+        if self.is_alive():
+            return True
+
+        # Kein Master aktiv: ein leerer Befehl startet ihn (ControlMaster=auto)
+        try:
+            result = subprocess.run(
+                self._ssh_args() + [self.host, "true"],
+                capture_output=True, text=True, timeout=self.connect_timeout + 5
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+
+    def reconnect(self):
+        """Verwirft den aktuellen Master und baut ihn neu auf"""
+        with self._lock:
+            self.stats['reconnects'] += 1
+        self._control("exit")
+        return self.health_check(force=True)
+
+    def close(self):
+        """Beendet den Master-Kanal"""
+        return self._control("exit")
+
+    def forward(self, local_port, remote_host, remote_port):
+        """Richtet einen lokalen Port-Forward auf dem Master-Kanal ein (z.B. MySQL-Tunnel)"""
+        if not self.health_check(force=True):
+            return False
+        try:
+            result = subprocess.run(
+                self._ssh_args() + ["-O", "forward", "-L", f"{local_port}:{remote_host}:{remote_port}", self.host],
+                capture_output=True, text=True, timeout=10
+            )
+            # Bereits bestehender Forward auf demselben Port ist kein Fehler
+            return result.returncode == 0 or "already" in result.stderr.lower()
+        except Exception:
+            return False
+
+    def _record(self, elapsed_ms, success):
+        with self._lock:
+            stats = self.stats
+            stats['calls'] += 1
+            if not success:
+                stats['failures'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['last_ms'] = elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            if stats['min_ms'] is None or elapsed_ms < stats['min_ms']:
+                stats['min_ms'] = elapsed_ms
+
+    def run(self, cmd, input=None, timeout=30, chdir=True):
+        """
+        Führt Befehl auf dem Remote-Server über den geteilten Kanal aus.
+        Gibt subprocess.CompletedProcess zurück, TimeoutExpired wird durchgereicht.
+        """
+        remote_cmd = f"cd {self.remote_path} && {cmd}" if chdir else cmd
+        args = self._ssh_args() + [self.host, remote_cmd]
+
+        self.health_check()
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = subprocess.run(
+                    args, input=input, capture_output=True, text=True, timeout=timeout
+                )
+            except subprocess.TimeoutExpired:
+                self._record((time.perf_counter() - start) * 1000, False)
+                raise
+
+            self._record((time.perf_counter() - start) * 1000, result.returncode == 0)
+
+            # Nur bei ssh-Verbindungsfehlern neu verbinden, nicht bei Remote-Fehlern
+            if result.returncode != SSH_CONNECTION_ERROR or attempt >= self.max_reconnects:
+                return result
+
+            attempt += 1
+            self.reconnect()
+
+    def get_stats(self):
+        """Latenz-Zähler inklusive Durchschnitt"""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['avg_ms'] = round(stats['total_ms'] / stats['calls'], 2) if stats['calls'] else 0.0
+        return stats
+
+
+# Ein Transport pro Host und Control-Socket
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(config):
+    """Singleton Pattern für SSH Transport"""
+    db_config = config['database']
+    control_path = config.get('transport', {}).get('control_path', '/tmp/todo-ssh-%C')
+    key = (db_config['user'], db_config['host'], control_path)
+
+    with _transports_lock:
+        if key not in _transports:
+            _transports[key] = SSHTransport(config)
+        return _transports[key]
+
+
+if __name__ == "__main__":
+    import sys
+
+    with open(Path(__file__).parent / "config.json") as f:
+        config = json.load(f)
+
+    transport = get_transport(config)
+    command = sys.argv[1] if len(sys.argv) > 1 else "check"
+
+    if command == "check":
+        healthy = transport.health_check(force=True)
+        print(f"SSH transport {'OK' if healthy else 'FAILED'} ({transport.host})")
+        sys.exit(0 if healthy else 1)
+    elif command == "close":
+        transport.close()
+        print("SSH transport closed")
+    elif command == "bench":
+        rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+        for _ in range(rounds):
+            transport.run("true", chdir=False)
+        print(json.dumps(transport.get_stats(), indent=2))
+    else:
+        print("Usage: ssh_transport.py [check|close|bench N]")
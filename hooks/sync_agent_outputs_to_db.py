@@ -4,28 +4,36 @@ Synchronisiert Agent-Outputs aus Dateien in die Datenbank
 Löst das Problem, dass Agent-Outputs nur als Dateien existieren
 """
 
+import json
 import os
-import subprocess
 from pathlib import Path
 import logging
 
+import db_query
+from todo_cache import invalidate_todo
+
 logging.basicConfig(level=logging.INFO)
 
-def sync_todo_outputs(todo_id):
-    """Synchronisiert Agent-Outputs eines Todos in die Datenbank"""
+with open(Path(__file__).parent / "config.json") as f:
+    CONFIG = json.load(f)
+
+OUTPUT_BASE = Path("/home/rodemkay/www/react/mounts/hetzner/forexsignale/staging/wp-content/uploads/agent-outputs")
+
+def collect_todo_outputs(todo_id):
+    """Kombiniert die .md Agent-Outputs eines Todos - (full_output, short_summary, anzahl) oder None"""
     
-    output_dir = Path(f"/home/rodemkay/www/react/mounts/hetzner/forexsignale/staging/wp-content/uploads/agent-outputs/todo-{todo_id}")
+    output_dir = OUTPUT_BASE / f"todo-{todo_id}"
     
     if not output_dir.exists():
         logging.warning(f"Kein Output-Verzeichnis für Todo #{todo_id}")
-        return False
+        return None
     
     # Sammle alle .md Dateien
     md_files = sorted(output_dir.glob("*.md"))
     
     if not md_files:
         logging.warning(f"Keine .md Dateien in {output_dir}")
-        return False
+        return None
     
     # Kombiniere alle Outputs
     full_output = f"# 📁 Agent-Outputs für Todo #{todo_id}\n\n"
@@ -53,30 +61,34 @@ def sync_todo_outputs(todo_id):
     if len(short_summary) > 500:
         short_summary = short_summary[:497] + "..."
     
-    # Escape für SQL
-    full_output_escaped = full_output.replace("'", "\\'").replace('"', '\\"')
-    short_summary_escaped = short_summary.replace("'", "\\'").replace('"', '\\"')
+    return full_output, short_summary, len(md_files)
+
+def sync_todo_outputs(todo_id):
+    """Synchronisiert Agent-Outputs eines Todos in die Datenbank"""
+    collected = collect_todo_outputs(todo_id)
+    if not collected:
+        return False
+    full_output, short_summary, file_count = collected
     
-    # Update Datenbank
+    # Parametrisierte Query statt SQL- und Shell-Escaping
     update_query = f"""
-    UPDATE stage_project_todos 
-    SET claude_html_output = '{full_output_escaped}',
-        claude_notes = '{short_summary_escaped}'
-    WHERE id = {todo_id}
+    UPDATE {CONFIG['database']['table_prefix']}project_todos 
+    SET claude_html_output = %s,
+        claude_notes = %s,
+        updated_at = NOW()
+    WHERE id = %s
     """
     
-    # Führe Query aus
-    cmd = f'ssh rodemkay@159.69.157.54 "cd /var/www/forexsignale/staging && wp db query \\"{update_query}\\""'
-    
     try:
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
+        affected = db_query.execute(CONFIG, update_query, (full_output, short_summary, int(todo_id)), timeout=10)
+        invalidate_todo(CONFIG, todo_id)
+        if affected is not None:
             logging.info(f"✅ Todo #{todo_id} Outputs in DB synchronisiert")
-            logging.info(f"   - {len(md_files)} Dateien kombiniert")
+            logging.info(f"   - {file_count} Dateien kombiniert")
             logging.info(f"   - {len(full_output)} Zeichen gespeichert")
             return True
         else:
-            logging.error(f"❌ Fehler beim Update: {result.stderr}")
+            logging.error(f"❌ Fehler beim Update von Todo #{todo_id}")
             return False
     except Exception as e:
         logging.error(f"❌ Exception: {e}")
@@ -89,10 +101,23 @@ if __name__ == "__main__":
         todo_id = sys.argv[1]
         sync_todo_outputs(todo_id)
     else:
-        # Synchronisiere alle Todos mit Output-Verzeichnissen
-        output_base = Path("/home/rodemkay/www/react/mounts/hetzner/forexsignale/staging/wp-content/uploads/agent-outputs")
-        for todo_dir in output_base.glob("todo-*"):
+        # Synchronisiere alle Todos mit Output-Verzeichnissen - ein Batch-Write statt n SSH-Aufrufen
+        from todo_manager import batch_update_todos
+        
+        updates = []
+        for todo_dir in OUTPUT_BASE.glob("todo-*"):
             if todo_dir.is_dir():
                 todo_id = todo_dir.name.replace("todo-", "")
-                logging.info(f"Synchronisiere Todo #{todo_id}...")
-                sync_todo_outputs(todo_id)
\ No newline at end of file
+                if not todo_id.isdigit():
+                    continue
+                logging.info(f"Sammle Outputs für Todo #{todo_id}...")
+                collected = collect_todo_outputs(todo_id)
+                if collected:
+                    updates.append({'id': todo_id, 'html_output': collected[0], 'notes': collected[1]})
+        
+        results = batch_update_todos(updates)
+        for todo_id, success in sorted(results.items()):
+            if success:
+                logging.info(f"✅ Todo #{todo_id} Outputs in DB synchronisiert")
+            else:
+                logging.error(f"❌ Todo #{todo_id} nicht synchronisiert")
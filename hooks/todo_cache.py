@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Todo Cache - Lokaler SQLite Read-Through Cache für project_todos Zeilen
+Wiederholte Lesezugriffe innerhalb eines Completion-Zyklus gehen auf die
+lokale Platte statt per SSH auf die Remote-Datenbank
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class TodoCache:
+    def __init__(self, config):
+        cache_config = config.get('cache', {})
+        self.enabled = cache_config.get('enabled', True)
+        self.ttl = cache_config.get('ttl_seconds', 120)
+        self.db_path = config.get('paths', {}).get('cache', '/tmp/claude_todo_cache.db')
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS todo_rows (
+                    id INTEGER PRIMARY KEY,
+                    updated_at TEXT,
+                    fetched_at REAL,
+                    header TEXT,
+                    heavy TEXT DEFAULT '{}'
+                )
+            ''')
+            self._conn.commit()
+        return self._conn
+
+    def _execute(self, query, params=()):
+        """Cache-Fehler dürfen den Todo-Flow nie blockieren"""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                conn = self._connection()
+                cursor = conn.execute(query, params)
+                rows = cursor.fetchall()
+                conn.commit()
+                return rows
+        except sqlite3.Error:
+            return None
+
+    def get(self, todo_id):
+        """Header-Felder plus bereits gecachte Heavy-Spalten, None bei Miss/Ablauf"""
+        rows = self._execute(
+            'SELECT header, heavy FROM todo_rows WHERE id = ? AND fetched_at > ?',
+            (int(todo_id), time.time() - self.ttl)
+        )
+        if not rows:
+            return None
+
+        row = json.loads(rows[0][0])
+        row.update(json.loads(rows[0][1] or '{}'))
+        return row
+
+    def put(self, todo_id, header):
+        """Speichert Header-Felder; neues updated_at verwirft gecachte Heavy-Spalten"""
+        self._execute('''
+            INSERT INTO todo_rows (id, updated_at, fetched_at, header, heavy)
+            VALUES (?, ?, ?, ?, '{}')
+            ON CONFLICT(id) DO UPDATE SET
+                heavy = CASE WHEN todo_rows.updated_at = excluded.updated_at THEN todo_rows.heavy ELSE '{}' END,
+                updated_at = excluded.updated_at,
+                fetched_at = excluded.fetched_at,
+                header = excluded.header
+        ''', (int(todo_id), header.get('updated_at'), time.time(), json.dumps(header)))
+
+    def get_heavy(self, todo_id, updated_at):
+        """Gecachte Heavy-Spalten für exakt diesen Stand (id, updated_at), gleiche TTL wie der Header"""
+        rows = self._execute(
+            'SELECT heavy FROM todo_rows WHERE id = ? AND updated_at = ? AND fetched_at > ?',
+            (int(todo_id), updated_at, time.time() - self.ttl)
+        )
+        return json.loads(rows[0][0] or '{}') if rows else {}
+
+    def put_heavy(self, todo_id, updated_at, fields):
+        """Ergänzt Heavy-Spalten, sofern der Header-Stand noch passt"""
+        cached = self.get_heavy(todo_id, updated_at)
+        cached.update(fields)
+        self._execute(
+            'UPDATE todo_rows SET heavy = ? WHERE id = ? AND updated_at = ?',
+            (json.dumps(cached), int(todo_id), updated_at)
+        )
+
+    def invalidate(self, todo_id):
+        """Explizite Invalidierung nach jedem Schreibzugriff"""
+        self._execute('DELETE FROM todo_rows WHERE id = ?', (int(todo_id),))
+
+    def invalidate_all(self):
+        self._execute('DELETE FROM todo_rows')
+
+
+# Global Cache Instance
+_todo_cache = None
+
+
+def get_todo_cache(config):
+    """Singleton Pattern für Todo Cache"""
+    global _todo_cache
+    if _todo_cache is None:
+        _todo_cache = TodoCache(config)
+    return _todo_cache
+
+
+def invalidate_todo(config, todo_id):
+    """Public API - Cache-Eintrag nach Schreibzugriff verwerfen"""
+    try:
+        get_todo_cache(config).invalidate(todo_id)
+    except (TypeError, ValueError):
+        pass
+
+
+if __name__ == "__main__":
+    import sys
+
+    with open(Path(__file__).parent / "config.json") as f:
+        config = json.load(f)
+
+    cache = get_todo_cache(config)
+    if len(sys.argv) > 1 and sys.argv[1] == "clear":
+        cache.invalidate_all()
+        print("Todo cache cleared")
+    elif len(sys.argv) > 1:
+        print(json.dumps(cache.get(sys.argv[1]), indent=2, ensure_ascii=False))
+    else:
+        print("Usage: todo_cache.py [clear|<todo_id>]")
@@ -6,18 +6,33 @@ Ersetzt das problematische offizielle Hook-System
 
 import json
 import os
+import re
 import sys
 import subprocess
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
 from project_filter import get_active_project, add_project_filter, get_project_info
+from ssh_transport import get_transport
+from db_pool import get_pool, disable_pool
+from todo_record import HEADER_FIELDS, TodoRecord, decode_first
+from todo_cache import get_todo_cache, invalidate_todo
+import db_query
+import session_slots
 
 # Konfiguration laden
 CONFIG_PATH = Path(__file__).parent / "config.json"
 with open(CONFIG_PATH) as f:
     CONFIG = json.load(f)
 
+# Ablage für Agent-Outputs (pro Todo ein Unterordner)
+AGENT_OUTPUT_BASE = Path("/home/rodemkay/www/react/mounts/hetzner/forexsignale/staging/wp-content/uploads/agent-outputs")
+
+# Heavy-Spalten, die load_todo immer braucht
+LOAD_HEAVY_FIELDS = ('claude_prompt', 'subagent_instructions', 'claude_notes')
+
+
 def log(level, message):
     """Einfaches Logging"""
     if CONFIG["logging"]["enabled"]:
@@ -28,15 +43,9 @@ def log(level, message):
         print(f"[{level}] {message}")
 
 def ssh_command(cmd):
-    """Führe Befehl auf Remote-Server aus"""
-    ssh_host = f"{CONFIG['database']['user']}@{CONFIG['database']['host']}"
-    remote_path = CONFIG['database']['remote_path']
-    
-    # Use list form for better escaping
-    ssh_cmd = ["ssh", ssh_host, f"cd {remote_path} && {cmd}"]
-    
+    """Führe Befehl auf Remote-Server aus (über geteilten SSH-Kanal)"""
     try:
-        result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=30)
+        result = get_transport(CONFIG).run(cmd, timeout=30)
         return result.stdout.strip(), result.returncode
     except subprocess.TimeoutExpired:
         log("ERROR", f"Command timed out: {cmd}")
@@ -45,98 +54,119 @@ def ssh_command(cmd):
         log("ERROR", f"SSH command failed: {e}")
         return "", 1
 
-def get_next_todo():
+def _pool_call(method, query, params=()):
+    """Führt Query über den nativen Pool aus - None-Ergebnis bedeutet wp-cli Fallback"""
+    pool = get_pool(CONFIG)
+    if not pool:
+        return None, False
+    try:
+        return getattr(pool, method)(query, params), True
+    except Exception as e:
+        log("WARNING", f"MySQL pool query failed, falling back to wp-cli: {e}")
+        disable_pool()
+        return None, False
+
+# Cache für nachgeladene Heavy-Spalten: (id, updated_at) -> {feld: wert}
+_heavy_cache = {}
+
+def fetch_heavy_columns(todo_id, fields, updated_at=None):
     """
-    Hole nächstes Todo mit ALLEN Feldern (V3.0 Feature)
+    Phase 2 der Datenladung: holt große Text-Spalten (plan_html, claude_prompt, ...)
+    nur bei Bedarf und cached sie pro (id, updated_at)
+    """
+    cache_key = (str(todo_id), updated_at)
+    cached = _heavy_cache.setdefault(cache_key, {})
+    missing = [field for field in fields if field not in cached]
+    
+    # Lokaler SQLite-Cache (prozessübergreifend) vor dem Remote-Zugriff
+    if missing and updated_at:
+        cached.update(get_todo_cache(CONFIG).get_heavy(todo_id, updated_at))
+        missing = [field for field in fields if field not in cached]
+    
+    if missing:
+        table = f"{CONFIG['database']['table_prefix']}project_todos"
+        row, pooled = _pool_call('fetch_one', f"SELECT id, {', '.join(missing)} FROM {table} WHERE id=%s", (int(todo_id),))
+        if pooled:
+            record = TodoRecord.from_mapping(row) if row else None
+        else:
+            output, code = ssh_command(f'wp db query "SELECT id, {", ".join(missing)} FROM {table} WHERE id={todo_id}"')
+            record = decode_first(output) if code == 0 and output else None
+        
+        if record is None:
+            log("WARNING", f"Could not fetch heavy columns {missing} for todo #{todo_id}")
+            return {field: cached.get(field) for field in fields}
+        
+        for field in missing:
+            cached[field] = record[field]
+        if updated_at:
+            get_todo_cache(CONFIG).put_heavy(todo_id, updated_at, {field: cached[field] for field in missing})
+        log("INFO", f"Fetched heavy columns for todo #{todo_id}: {', '.join(missing)}")
+    
+    return {field: cached[field] for field in fields}
+
+def _bind_heavy_loader(todo, cache=True):
+    """Bindet den Nachlade-Mechanismus für Heavy-Spalten an einen Header-Record"""
+    updated_at = todo['updated_at']
+    if cache:
+        get_todo_cache(CONFIG).put(todo['id'], {field: todo[field] for field in HEADER_FIELDS})
+    return todo.bind_loader(lambda todo_id, fields: fetch_heavy_columns(todo_id, fields, updated_at))
+
+def get_next_todo(exclude_ids=()):
+    """
+    Hole nächstes Todo (V3.0 Feature) - Phase 1 lädt nur die Header-Felder,
+    große Text-Spalten werden beim ersten Zugriff nachgeladen
     
     ⚠️ KRITISCHE REGEL: NUR TODOs mit status='offen' UND bearbeiten=1!
     Diese Regel ist ABSOLUT und darf NIEMALS geändert werden!
     """
-    # V3.0: Erweiterte Datenladung - ALLE 30+ Felder laden
-    fields = [
-        'id', 'title', 'description', 'status', 'bearbeiten', 'mode', 'plan_approved',
-        'version', 'priority', 'scope', 'working_directory', 'development_area',
-        'agent_count', 'subagent_instructions', 'execution_mode', 'playwright_check', 'mcp_servers',
-        'assigned_to', 'due_date', 'completed_date', 'is_recurring', 'recurring_type',
-        'claude_notes', 'claude_prompt', 'bemerkungen', 'continuation_notes',
-        'plan_html', 'report_url', 'related_files', 'dependencies', 'parent_todo_id',
-        'created_at', 'updated_at', 'save_agent_outputs'
-    ]
+    # Ausschluss z.B. des gerade abschließenden Todos (Status ist dann noch 'offen')
+    exclude = ''.join(f" AND id != {int(excluded)}" for excluded in exclude_ids)
     
     # KRITISCH: NUR status='offen' UND bearbeiten=1 - BEIDE Bedingungen MÜSSEN erfüllt sein!
-    base_query = f"SELECT {', '.join(fields)} FROM {CONFIG['database']['table_prefix']}project_todos WHERE status='offen' AND bearbeiten=1 ORDER BY priority DESC, id ASC LIMIT 1"
+    base_query = f"SELECT {', '.join(HEADER_FIELDS)} FROM {CONFIG['database']['table_prefix']}project_todos WHERE status='offen' AND bearbeiten=1{exclude} ORDER BY priority DESC, id ASC LIMIT 1"
     
     # Projekt-Filter hinzufügen falls aktives Projekt existiert
     query = add_project_filter(base_query)
     
+    # Nativer Pool (falls aktiviert) - spart SSH + wp-cli komplett
+    row, pooled = _pool_call('fetch_one', query)
+    if pooled:
+        if not row:
+            return None
+        todo_data = _bind_heavy_loader(TodoRecord.from_mapping(row))
+        log("INFO", f"V3.0: Loaded {len(HEADER_FIELDS)} header fields for next todo (pool)")
+        return todo_data
+    
     cmd = f'wp db query "{query}"'
     output, code = ssh_command(cmd)
     
     if code == 0 and output:
-        lines = output.strip().split('\n')
-        # Prüfe ob wir Header + mindestens eine Datenzeile haben
-        if len(lines) > 1 and lines[0].startswith('id'):
-            parts = lines[1].split('\t')
-            if len(parts) >= 3:
-                # V3.0: Erweiterte Datenladung - Alle Felder zurückgeben
-                todo_data = {
-                    'id': parts[0],
-                    'title': parts[1],
-                    'description': parts[2] if len(parts) > 2 else '',
-                    'status': parts[3] if len(parts) > 3 else 'offen',
-                    'bearbeiten': parts[4] if len(parts) > 4 else '1',
-                    'mode': parts[5] if len(parts) > 5 else 'execute',
-                    'plan_approved': parts[6] if len(parts) > 6 else '0',
-                    # Erweiterte Felder (V3.0)
-                    'version': parts[7] if len(parts) > 7 else '1.00',
-                    'priority': parts[8] if len(parts) > 8 else 'mittel',
-                    'scope': parts[9] if len(parts) > 9 else 'todo-plugin',
-                    'working_directory': parts[10] if len(parts) > 10 else '/home/rodemkay/www/react/plugin-todo/',
-                    'development_area': parts[11] if len(parts) > 11 else 'fullstack',
-                    'agent_count': parts[12] if len(parts) > 12 else '0',
-                    'subagent_instructions': parts[13] if len(parts) > 13 else '',
-                    'execution_mode': parts[14] if len(parts) > 14 else 'default',
-                    'playwright_check': parts[15] if len(parts) > 15 else '0',
-                    'mcp_servers': parts[16] if len(parts) > 16 else '',
-                    'assigned_to': parts[17] if len(parts) > 17 else 'claude',
-                    'due_date': parts[18] if len(parts) > 18 else None,
-                    'completed_date': parts[19] if len(parts) > 19 else None,
-                    'is_recurring': parts[20] if len(parts) > 20 else '0',
-                    'recurring_type': parts[21] if len(parts) > 21 else None,
-                    'claude_notes': parts[22] if len(parts) > 22 else '',
-                    'claude_prompt': parts[23] if len(parts) > 23 else '',
-                    'bemerkungen': parts[24] if len(parts) > 24 else '',
-                    'continuation_notes': parts[25] if len(parts) > 25 else '',
-                    'plan_html': parts[26] if len(parts) > 26 else '',
-                    'report_url': parts[27] if len(parts) > 27 else '',
-                    'related_files': parts[28] if len(parts) > 28 else '',
-                    'dependencies': parts[29] if len(parts) > 29 else '',
-                    'parent_todo_id': parts[30] if len(parts) > 30 else None,
-                    'created_at': parts[31] if len(parts) > 31 else '',
-                    'updated_at': parts[32] if len(parts) > 32 else '',
-                    'save_agent_outputs': parts[33] if len(parts) > 33 else '0',
-                }
-                
-                # Log erweiterte Datenladung
-                log("INFO", f"V3.0: Loaded {len(todo_data)} fields for next todo")
-                
-                return todo_data
+        # V3.0: Schema-basierter Decoder (escaped Tabs/Newlines werden korrekt dekodiert)
+        todo_data = decode_first(output)
+        if todo_data and todo_data['id']:
+            log("INFO", f"V3.0: Loaded {len(HEADER_FIELDS)} header fields for next todo")
+            return _bind_heavy_loader(todo_data)
     return None
 
 def get_todo_by_id(todo_id):
-    """Hole spezifisches Todo mit ALLEN Feldern (V3.0 Feature)"""
-    # V3.0: Erweiterte Datenladung - ALLE 30+ Felder laden
-    fields = [
-        'id', 'title', 'description', 'status', 'bearbeiten', 'mode', 'plan_approved',
-        'version', 'priority', 'scope', 'working_directory', 'development_area',
-        'agent_count', 'subagent_instructions', 'execution_mode', 'playwright_check', 'mcp_servers',
-        'assigned_to', 'due_date', 'completed_date', 'is_recurring', 'recurring_type',
-        'claude_notes', 'claude_prompt', 'bemerkungen', 'continuation_notes',
-        'plan_html', 'report_url', 'related_files', 'dependencies', 'parent_todo_id',
-        'created_at', 'updated_at', 'save_agent_outputs'
-    ]
-    
-    query = f"SELECT {', '.join(fields)} FROM {CONFIG['database']['table_prefix']}project_todos WHERE id={todo_id}"
+    """Hole spezifisches Todo (V3.0 Feature) - Header sofort, Heavy-Spalten bei Bedarf"""
+    # Read-Through: lokaler Cache (TTL) vor SSH/Pool
+    cached = get_todo_cache(CONFIG).get(todo_id) if str(todo_id).isdigit() else None
+    if cached:
+        log("INFO", f"Todo #{todo_id} served from local cache")
+        return _bind_heavy_loader(TodoRecord.from_mapping(cached), cache=False)
+    
+    # Nativer Pool mit Prepared Statement
+    row, pooled = _pool_call('fetch_one', f"SELECT {', '.join(HEADER_FIELDS)} FROM {CONFIG['database']['table_prefix']}project_todos WHERE id=%s", (int(todo_id),))
+    if pooled:
+        if not row:
+            print(f"Debug: Todo #{todo_id} not found")
+            return None
+        todo_data = _bind_heavy_loader(TodoRecord.from_mapping(row))
+        log("INFO", f"V3.0: Loaded {len(HEADER_FIELDS)} header fields for todo #{todo_id} (pool)")
+        return todo_data
+    
+    query = f"SELECT {', '.join(HEADER_FIELDS)} FROM {CONFIG['database']['table_prefix']}project_todos WHERE id={todo_id}"
     
     cmd = f'wp db query "{query}"'
     output, code = ssh_command(cmd)
@@ -154,70 +184,91 @@ def get_todo_by_id(todo_id):
         print(f"Debug: Got success message instead of data: {output[:50]}")
         return None
     
-    # Verarbeite alle Zeilen als einen Block wegen möglicher Newlines in description
-    all_text = output.strip()
-    
-    # Finde die Position des Headers und überspringe ihn
-    if '\n' in all_text:
-        header_end = all_text.index('\n')
-        data_text = all_text[header_end+1:]
-        
-        # Versuche Tab-getrennte Felder zu parsen
-        # Bei multiline descriptions müssen wir vorsichtig sein
-        parts = data_text.split('\t')
-        
-        if len(parts) >= 5:  # Mindestens die wichtigsten Felder
-            # Bereinige description von Newlines
-            desc = parts[2] if len(parts) > 2 else ''
-            desc = desc.replace('\\n', ' ').replace('\n', ' ').replace('\\r', ' ')
-            
-            # V3.0: Erweiterte Datenladung - Alle Felder zurückgeben
-            todo_data = {
-                'id': parts[0],
-                'title': parts[1],
-                'description': desc,
-                'status': parts[3] if len(parts) > 3 else '',
-                'bearbeiten': parts[4] if len(parts) > 4 else '',
-                'mode': parts[5] if len(parts) > 5 else 'execute',
-                'plan_approved': parts[6] if len(parts) > 6 else '0',
-                # Erweiterte Felder (V3.0)
-                'version': parts[7] if len(parts) > 7 else '1.00',
-                'priority': parts[8] if len(parts) > 8 else 'mittel',
-                'scope': parts[9] if len(parts) > 9 else 'todo-plugin',
-                'working_directory': parts[10] if len(parts) > 10 else '/home/rodemkay/www/react/plugin-todo/',
-                'development_area': parts[11] if len(parts) > 11 else 'fullstack',
-                'agent_count': parts[12] if len(parts) > 12 else '0',
-                'subagent_instructions': parts[13] if len(parts) > 13 else '',
-                'execution_mode': parts[14] if len(parts) > 14 else 'default',
-                'playwright_check': parts[15] if len(parts) > 15 else '0',
-                'mcp_servers': parts[16] if len(parts) > 16 else '',
-                'assigned_to': parts[17] if len(parts) > 17 else 'claude',
-                'due_date': parts[18] if len(parts) > 18 else None,
-                'completed_date': parts[19] if len(parts) > 19 else None,
-                'is_recurring': parts[20] if len(parts) > 20 else '0',
-                'recurring_type': parts[21] if len(parts) > 21 else None,
-                'claude_notes': parts[22] if len(parts) > 22 else '',
-                'claude_prompt': parts[23] if len(parts) > 23 else '',
-                'bemerkungen': parts[24] if len(parts) > 24 else '',
-                'continuation_notes': parts[25] if len(parts) > 25 else '',
-                'plan_html': parts[26] if len(parts) > 26 else '',
-                'report_url': parts[27] if len(parts) > 27 else '',
-                'related_files': parts[28] if len(parts) > 28 else '',
-                'dependencies': parts[29] if len(parts) > 29 else '',
-                'parent_todo_id': parts[30] if len(parts) > 30 else None,
-                'created_at': parts[31] if len(parts) > 31 else '',
-                'updated_at': parts[32] if len(parts) > 32 else '',
-                'save_agent_outputs': parts[33] if len(parts) > 33 else '0',
-            }
-            
-            # Log erweiterte Datenladung
-            log("INFO", f"V3.0: Loaded {len(todo_data)} fields for todo #{todo_id}")
-            
-            return todo_data
+    # V3.0: Schema-basierter Decoder - Multiline-Descriptions sind im Batch-Output escaped
+    todo_data = decode_first(output)
+    if todo_data and todo_data['id']:
+        log("INFO", f"V3.0: Loaded {len(HEADER_FIELDS)} header fields for todo #{todo_id}")
+        return _bind_heavy_loader(todo_data)
     
     print(f"Debug: Could not parse output. First 100 chars: {output[:100]}")
     return None
 
+def _claim_with_pool(pool, claimed_status):
+    """Claim über SELECT ... FOR UPDATE SKIP LOCKED in einer Transaktion"""
+    table = f"{CONFIG['database']['table_prefix']}project_todos"
+    select_query = add_project_filter(f"SELECT {', '.join(HEADER_FIELDS)} FROM {table} WHERE status='offen' AND bearbeiten=1 ORDER BY priority DESC, id ASC LIMIT 1 FOR UPDATE SKIP LOCKED")
+    
+    with pool.transaction() as conn:
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(select_query)
+            row = cursor.fetchone()
+            if not row:
+                return None
+            cursor.execute(
+                f"UPDATE {table} SET status=%s, execution_started_at=IFNULL(execution_started_at, NOW()), updated_at=NOW() WHERE id=%s",
+                (claimed_status, row['id'])
+            )
+        finally:
+            cursor.close()
+    
+    row['status'] = claimed_status
+    return row
+
+def claim_next_todo(claimed_status='in_progress'):
+    """
+    Atomarer Claim des nächsten Todos (status='offen' UND bearbeiten=1) in EINEM Round-Trip.
+    Mehrere Sessions können parallel claimen, ohne dasselbe Todo zu bekommen.
+    """
+    pool = get_pool(CONFIG)
+    if pool:
+        try:
+            row = _claim_with_pool(pool, claimed_status)
+            if not row:
+                return None
+            invalidate_todo(CONFIG, row['id'])
+            todo = _bind_heavy_loader(TodoRecord.from_mapping(row), cache=False)
+            log("INFO", f"Claimed todo #{todo['id']} (pool)")
+            return todo
+        except Exception as e:
+            log("WARNING", f"MySQL pool claim failed, falling back to wp-cli: {e}")
+            disable_pool()
+    
+    table = f"{CONFIG['database']['table_prefix']}project_todos"
+    
+    # Bedingtes UPDATE mit ORDER BY/LIMIT merkt sich die ID über LAST_INSERT_ID(id);
+    # ROW_COUNT() entscheidet, ob dieser Aufruf den Claim gewonnen hat
+    claim_query = add_project_filter(
+        f"UPDATE {table} SET status='{claimed_status}', execution_started_at=IFNULL(execution_started_at, NOW()), "
+        f"updated_at=NOW(), id=LAST_INSERT_ID(id) WHERE status='offen' AND bearbeiten=1 ORDER BY priority DESC, id ASC LIMIT 1"
+    )
+    query = (
+        f"{claim_query}; SET @claimed = ROW_COUNT(); "
+        f"SELECT {', '.join(HEADER_FIELDS)} FROM {table} WHERE @claimed > 0 AND id = LAST_INSERT_ID()"
+    )
+    
+    output, code = ssh_command(f'wp db query "{query}"')
+    if code != 0:
+        log("ERROR", f"Claim query failed: {output}")
+        return None
+    
+    todo = decode_first(output) if output else None
+    if not todo or not todo['id']:
+        return None
+    
+    invalidate_todo(CONFIG, todo['id'])
+    log("INFO", f"Claimed todo #{todo['id']}")
+    return _bind_heavy_loader(todo)
+
+def release_claim(todo_id, claimed_status='in_progress'):
+    """Gibt einen Claim zurück (nur wenn das Todo noch im Claim-Status ist)"""
+    table = f"{CONFIG['database']['table_prefix']}project_todos"
+    _, pooled = _pool_call('execute', f"UPDATE {table} SET status='offen', updated_at=NOW() WHERE id=%s AND status=%s", (int(todo_id), claimed_status))
+    if not pooled:
+        ssh_command(f'wp db query "UPDATE {table} SET status=\'offen\', updated_at=NOW() WHERE id={int(todo_id)} AND status=\'{claimed_status}\'"')
+    invalidate_todo(CONFIG, todo_id)
+    log("INFO", f"Released claim on todo #{todo_id}")
+
 def set_todo_status(todo_id, status):
     """Setze Todo-Status mit Zeitstempel"""
     # Base query
@@ -231,10 +282,20 @@ def set_todo_status(todo_id, status):
     if status == 'completed':
         updates.append("completed_at=NOW()")
     
+    # Nativer Pool: Status als Parameter statt String-Literal
+    pool_updates = ["status=%s"] + updates[1:]
+    _, pooled = _pool_call('execute', f"UPDATE {CONFIG['database']['table_prefix']}project_todos SET {', '.join(pool_updates)} WHERE id=%s", (status, int(todo_id)))
+    if pooled:
+        # Cache erst nach dem Write verwerfen - sonst lädt ein paralleler Leser den alten Stand nach
+        invalidate_todo(CONFIG, todo_id)
+        log("INFO", f"Todo #{todo_id} status set to {status}")
+        return True
+    
     query = f"UPDATE {CONFIG['database']['table_prefix']}project_todos SET {', '.join(updates)} WHERE id={todo_id}"
     
     cmd = f'wp db query "{query}"'
     output, code = ssh_command(cmd)
+    invalidate_todo(CONFIG, todo_id)
     
     if code == 0:
         log("INFO", f"Todo #{todo_id} status set to {status}")
@@ -244,39 +305,201 @@ def set_todo_status(todo_id, status):
 def complete_todo(todo_id, html_output="", text_output="", summary=""):
     """Schließe Todo ab mit Outputs"""
     # Release Claude lock when completing
-    lock_file = Path("/tmp/claude_processing.lock")
+    lock_file = Path(CONFIG["paths"]["processing_lock"])
     if lock_file.exists():
         lock_file.unlink()
     
-    # Escape for MySQL - use backslash for quotes
-    html_output = html_output.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-    text_output = text_output.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-    summary = summary.replace("\\", "\\\\").replace("'", "\\'").replace('"', '\\"')
-    
-    # Use single quotes for the query to avoid shell escaping issues
-    query = f"""UPDATE {CONFIG['database']['table_prefix']}project_todos 
+    # Outputs als gebundene Parameter (Pool) bzw. per stdin-Skript - kein Shell-Escaping;
+    # Status + updated_at kommen als Bestätigung im selben Round-Trip zurück
+    table = f"{CONFIG['database']['table_prefix']}project_todos"
+    saved_before = db_query.get_stats()['saved_bytes']
+    ack = db_query.execute_ack(CONFIG, f"""UPDATE {table} 
 SET status='completed',
     completed_at=NOW(),
-    claude_html_output='{html_output}',
-    claude_text_output='{text_output}',
-    claude_summary='{summary}',
+    claude_html_output=%s,
+    claude_text_output=%s,
+    claude_summary=%s,
     updated_at=NOW()
-WHERE id={todo_id}"""
+WHERE id=%s""", (html_output, text_output, summary, int(todo_id)),
+        f"SELECT status, updated_at FROM {table} WHERE id=%s", (int(todo_id),))
+    invalidate_todo(CONFIG, todo_id)
     
-    # Escape the entire query for shell
-    query_escaped = query.replace("'", "'\\''")
-    cmd = f"wp db query '{query_escaped}'"
-    output, code = ssh_command(cmd)
-    
-    if code == 0:
-        log("INFO", f"Todo #{todo_id} completed with outputs")
+    if ack and ack.get('status') == 'completed':
+        # Zähler sind kumulativ - Differenz = Ersparnis dieses Aufrufs
+        saved = db_query.get_stats()['saved_bytes'] - saved_before
+        log("INFO", f"Todo #{todo_id} completed with outputs at {ack.get('updated_at')} ({len(html_output) + len(text_output)} chars, {saved} bytes saved by compression)")
         return True
     else:
-        log("ERROR", f"Failed to complete todo #{todo_id}: {output}")
+        log("ERROR", f"Failed to complete todo #{todo_id}")
         return False
 
-def load_todo(todo_id=None):
-    """Lade ein Todo (nächstes oder spezifisches)"""
+# Batch-Schlüssel -> Spalte (gleiche Namen wie die complete_todo Parameter)
+BATCH_OUTPUT_COLUMNS = {
+    'html_output': 'claude_html_output',
+    'text_output': 'claude_text_output',
+    'summary': 'claude_summary',
+    'notes': 'claude_notes',
+}
+
+def _batch_assignments(update):
+    """SET-Klauseln + Parameter eines Batch-Eintrags (Status-Regeln wie set_todo_status)"""
+    assignments, params = [], []
+    status = update.get('status')
+    if status:
+        assignments.append("status=%s")
+        params.append(status)
+        if status == 'in_progress':
+            assignments.append("execution_started_at=IFNULL(execution_started_at, NOW())")
+        if status == 'completed':
+            assignments.append("completed_at=NOW()")
+    for key, column in BATCH_OUTPUT_COLUMNS.items():
+        if key in update:
+            assignments.append(f"{column}=%s")
+            params.append(update[key])
+    assignments.append("updated_at=NOW()")
+    return assignments, params
+
+def _invalidate_todos(todo_ids):
+    """Cache-Einträge nach einem Batch-Write verwerfen (nie davor)"""
+    for todo_id in todo_ids:
+        invalidate_todo(CONFIG, todo_id)
+
+def batch_update_todos(updates):
+    """
+    Schreibt viele Status-/Output-Updates in EINER Transaktion und EINEM Round-Trip.
+    updates: Liste von Dicts mit 'id' plus optional 'status', 'html_output',
+    'text_output', 'summary', 'notes'.
+    Gibt {todo_id: True/False} zurück (False = Zeile nicht gefunden/unverändert
+    oder Transaktion fehlgeschlagen).
+    """
+    table = f"{CONFIG['database']['table_prefix']}project_todos"
+    statements = []
+    for update in updates:
+        todo_id = int(update['id'])
+        assignments, params = _batch_assignments(update)
+        statements.append((todo_id, f"UPDATE {table} SET {', '.join(assignments)} WHERE id=%s", params + [todo_id]))
+
+    results = {todo_id: False for todo_id, _, _ in statements}
+    if not statements:
+        return results
+
+    pool = get_pool(CONFIG)
+    if pool:
+        try:
+            with pool.transaction() as conn:
+                cursor = pool.cursor(conn)
+                try:
+                    for todo_id, query, params in statements:
+                        cursor.execute(query, params)
+                        results[todo_id] = cursor.rowcount > 0
+                finally:
+                    cursor.close()
+            _invalidate_todos(results)
+            log("INFO", f"Batch update: {sum(results.values())}/{len(statements)} todos written (pool)")
+            return results
+        except Exception as e:
+            log("WARNING", f"MySQL pool batch update failed, falling back to wp-cli: {e}")
+            disable_pool()
+            results = {todo_id: False for todo_id in results}
+
+    # Ein SQL-Skript per stdin: Transaktion + ROW_COUNT() pro Zeile als Ergebnis
+    script = ["START TRANSACTION;"]
+    for todo_id, query, params in statements:
+        script.append(db_query.render_for(CONFIG, query, params) + ";")
+        script.append(f"SELECT {todo_id} AS todo_id, ROW_COUNT() AS affected;")
+    script.append("COMMIT;")
+
+    output, code, error = db_query.run_script(CONFIG, "\n".join(script))
+    _invalidate_todos(results)
+    if code != 0:
+        # Skript bricht beim ersten Fehler ab, ohne COMMIT wird alles zurückgerollt
+        log("ERROR", f"Batch update failed, transaction rolled back: {error}")
+        return results
+    
+    for row in db_query.parse_rows(output):
+        results[int(row['todo_id'])] = int(row['affected']) > 0
+
+    log("INFO", f"Batch update: {sum(results.values())}/{len(statements)} todos written")
+    return results
+
+def start_next_todo_prefetch(exclude_id):
+    """
+    Lädt spekulativ (OHNE Claim) den nächsten Kandidaten samt Heavy-Spalten und
+    legt seinen Agent-Output-Ordner an, während das aktuelle Todo noch abschließt.
+    Gibt (thread, result) zurück - result['todo'] ist nach join() gesetzt.
+    """
+    result = {}
+    
+    def worker():
+        try:
+            todo = get_next_todo(exclude_ids=(exclude_id,))
+            if not todo:
+                return
+            todo.prefetch(*LOAD_HEAVY_FIELDS)
+            (AGENT_OUTPUT_BASE / f"todo-{todo['id']}").mkdir(parents=True, exist_ok=True)
+            result['todo'] = todo
+            log("INFO", f"Prefetched next candidate todo #{todo['id']}")
+        except Exception as e:
+            log("WARNING", f"Prefetch of next todo failed: {e}")
+    
+    thread = threading.Thread(target=worker, name="next-todo-prefetch", daemon=True)
+    thread.start()
+    return thread, result
+
+def get_slot_dir(slot):
+    """State-Verzeichnis eines Session-Slots"""
+    return session_slots.get_slot_dir(CONFIG, slot)
+
+def apply_slot(slot):
+    """
+    Schaltet CONFIG auf die State-Dateien eines Session-Slots um.
+    Jede tmux/Agent-Session besitzt so ihr eigenes geclaimtes Todo;
+    Slots erzwingen den atomaren Claim, damit keine Doppelvergabe entsteht.
+    """
+    if not re.fullmatch(r'[A-Za-z0-9_.-]+', slot):
+        raise ValueError(f"Invalid slot name: {slot}")
+    
+    slot_dir = get_slot_dir(slot)
+    slot_dir.mkdir(parents=True, exist_ok=True)
+    
+    CONFIG["paths"].update(session_slots.slot_paths(CONFIG, slot))
+    CONFIG["behavior"]["atomic_claim"] = True
+    CONFIG["active_slot"] = slot
+    return slot_dir
+
+def list_slots():
+    """Alle Slots mit aktuell geclaimtem Todo: [(slot, todo_id, age_seconds)]"""
+    return session_slots.list_slots(CONFIG)
+
+def get_tmux_target():
+    """
+    tmux-Pane, in dem die Session arbeitet: im Slot-Modus tmux.slot_targets[slot]
+    oder der eigene Pane ($TMUX_PANE), sonst tmux.target. None wenn ein Slot
+    keinen eigenen Pane hat - dann nicht den Pane einer anderen Session kapern.
+    """
+    tmux_config = CONFIG.get("tmux", {})
+    slot = CONFIG.get("active_slot")
+    if slot:
+        return tmux_config.get("slot_targets", {}).get(slot) or os.environ.get("TMUX_PANE")
+    return tmux_config.get("target", "plugin-todo:0.0")
+
+def load_todo(todo_id=None, prefetched=None):
+    """Lade ein Todo (nächstes oder spezifisches) - prefetched: spekulativ vorgeladener Kandidat"""
+    todo = _load_todo(todo_id, prefetched)
+    if todo:
+        # Terminal-Output ab jetzt inkrementell in die Session mitschreiben
+        try:
+            from output_collector import start_terminal_stream
+            target = get_tmux_target()
+            if target is None:
+                log("WARNING", f"No tmux pane for slot {CONFIG['active_slot']}, terminal stream disabled")
+            elif not start_terminal_stream(todo['id'], target):
+                log("WARNING", f"Could not start terminal stream for todo #{todo['id']} ({target})")
+        except ImportError:
+            pass
+    return todo
+
+def _load_todo(todo_id=None, prefetched=None):
     # Import planning mode handler
     try:
         import sys
@@ -305,6 +528,15 @@ def load_todo(todo_id=None):
         # Das neue Todo bleibt auf 'offen' und wird beim nächsten Mal geladen
         return None
     
+    # Slot-Modus: Gesamtzahl paralleler Sessions begrenzen
+    if CONFIG.get("active_slot"):
+        max_slots = CONFIG.get('behavior', {}).get('max_slots', 4)
+        active_slots = list_slots()
+        if len(active_slots) >= max_slots:
+            log("WARNING", f"All {max_slots} slots busy, slot {CONFIG['active_slot']} waits")
+            print(f"● All {max_slots} session slots are busy. Please try again.")
+            return None
+    
     if todo_id:
         # Validiere Todo-ID
         if not str(todo_id).isdigit():
@@ -329,7 +561,7 @@ def load_todo(todo_id=None):
             print(f"Current Status: {todo['status']}")
             
             # IMMER Agent-Output-Ordner erstellen für Uploads und Dokumentation (VOR prompt_output check!)
-            agent_output_dir = Path(f"/home/rodemkay/www/react/mounts/hetzner/forexsignale/staging/wp-content/uploads/agent-outputs/todo-{todo.get('id')}")
+            agent_output_dir = AGENT_OUTPUT_BASE / f"todo-{todo.get('id')}"
             
             # AUTOMATISCH ORDNER ERSTELLEN (für JEDES TODO!)
             try:
@@ -341,6 +573,9 @@ def load_todo(todo_id=None):
                 print(f"⚠️ Konnte Agent-Output-Ordner nicht erstellen: {e}")
                 log("WARNING", f"Failed to create agent-output directory: {e}")
             
+            # Phase 2: Nur die benötigten Heavy-Spalten in einem Rutsch nachladen
+            todo.prefetch(*LOAD_HEAVY_FIELDS)
+            
             # PROMPT LOGIK - Verwende nur noch claude_prompt
             prompt_content = todo.get('claude_prompt', '')
             
@@ -352,7 +587,7 @@ def load_todo(todo_id=None):
                 print("✅ Prompt Output aus Datenbank geladen!")
                 
                 # AUTO-EXECUTE für claude_prompt erstellen!
-                auto_execute_file = Path("/tmp/CLAUDE_AUTO_EXECUTE")
+                auto_execute_file = Path(CONFIG["paths"]["auto_execute"])
                 with open(auto_execute_file, 'w') as f:
                     f.write(f"# TODO #{todo['id']}: {todo['title']}\n\n")
                     f.write(prompt_content)
@@ -454,7 +689,7 @@ if (\\$success) {{
                 
                 # NEU: Automatisch claude_prompt als Eingabe bereitstellen
                 # Speichere den Prompt in eine Datei, die Claude automatisch ausführen soll
-                auto_execute_file = Path("/tmp/CLAUDE_AUTO_EXECUTE")
+                auto_execute_file = Path(CONFIG["paths"]["auto_execute"])
                 with open(auto_execute_file, 'w') as f:
                     f.write(f"# TODO #{todo['id']}: {todo['title']}\n\n")
                     f.write(final_prompt)
@@ -476,7 +711,7 @@ if (\\$success) {{
                 return None
             
             # Prüfe ob Claude verfügbar ist BEVOR Status geändert wird
-            lock_file = Path("/tmp/claude_processing.lock")
+            lock_file = Path(CONFIG["paths"]["processing_lock"])
             if lock_file.exists():
                 # Check if lock is stale (older than 5 minutes)
                 lock_age = time.time() - lock_file.stat().st_mtime
@@ -503,8 +738,9 @@ if (\\$success) {{
             print(f"❌ Todo #{todo_id} not found")
             return None
     else:
-        # Nächstes Todo laden
-        todo = get_next_todo()
+        # Nächstes Todo laden - optional als atomarer Claim (parallele Sessions)
+        atomic_claim = CONFIG.get('behavior', {}).get('atomic_claim', False)
+        todo = claim_next_todo() if atomic_claim else get_next_todo()
         if todo:
             # AUTOMATISCHES SESSION-SWITCHING basierend auf TODO-Projekt
             # DEAKTIVIERT - funktioniert nicht richtig
@@ -519,6 +755,11 @@ if (\\$success) {{
             print(f"Description: {todo['description'][:200]}...")
             print(f"Current Status: {todo.get('status', 'offen')}")
             
+            # Phase 2: Nur die benötigten Heavy-Spalten in einem Rutsch nachladen
+            # (beim Prefetch-Treffer bereits vorhanden, kein weiterer Round-Trip)
+            todo.adopt_heavy(prefetched)
+            todo.prefetch(*LOAD_HEAVY_FIELDS)
+            
             # PROMPT LOGIK - Verwende nur noch claude_prompt
             prompt_content = todo.get('claude_prompt', '')
             
@@ -530,7 +771,7 @@ if (\\$success) {{
                 print("✅ Prompt Output aus Datenbank geladen!")
                 
                 # AUTO-EXECUTE für claude_prompt erstellen!
-                auto_execute_file = Path("/tmp/CLAUDE_AUTO_EXECUTE")
+                auto_execute_file = Path(CONFIG["paths"]["auto_execute"])
                 with open(auto_execute_file, 'w') as f:
                     f.write(f"# TODO #{todo['id']}: {todo['title']}\n\n")
                     f.write(prompt_content)
@@ -548,6 +789,8 @@ if (\\$success) {{
                 if saved_id != str(todo['id']):
                     log("ERROR", f"ID mismatch: saved {saved_id} vs expected {todo['id']}")
                     Path(CONFIG["paths"]["current_todo"]).unlink()
+                    if atomic_claim:
+                        release_claim(todo['id'])
                     return None
                 
                 # Specific mode marker löschen (da nächstes Todo)
@@ -633,7 +876,7 @@ if (\\$success) {{
                 
                 # NEU: Automatisch claude_prompt als Eingabe bereitstellen
                 # Speichere den Prompt in eine Datei, die Claude automatisch ausführen soll
-                auto_execute_file = Path("/tmp/CLAUDE_AUTO_EXECUTE")
+                auto_execute_file = Path(CONFIG["paths"]["auto_execute"])
                 with open(auto_execute_file, 'w') as f:
                     f.write(f"# TODO #{todo['id']}: {todo['title']}\n\n")
                     f.write(final_prompt)
@@ -664,12 +907,14 @@ if (\\$success) {{
                 log("ERROR", f"ID mismatch: saved {saved_id} vs expected {todo['id']}")
                 # Bei Fehler: Abbrechen ohne Status zu ändern
                 Path(CONFIG["paths"]["current_todo"]).unlink()
+                if atomic_claim:
+                    release_claim(todo['id'])
                 return None
             
             # NUR wenn erfolgreich übernommen und status noch 'offen' ist, auf in_progress setzen
             if todo.get('status') == 'offen':
                 # Prüfe ob Claude verfügbar ist BEVOR Status geändert wird
-                lock_file = Path("/tmp/claude_processing.lock")
+                lock_file = Path(CONFIG["paths"]["processing_lock"])
                 if lock_file.exists():
                     # Check if lock is stale (older than 5 minutes)
                     lock_age = time.time() - lock_file.stat().st_mtime
@@ -686,6 +931,9 @@ if (\\$success) {{
                 lock_file.touch()
                 # set_todo_status(todo['id'], 'in_progress')  # DEAKTIVIERT - verursacht Probleme
                 print("✅ Todo successfully loaded (status remains 'offen' for now)")
+            elif atomic_claim:
+                Path(CONFIG["paths"]["processing_lock"]).touch()
+                print(f"✅ Todo atomically claimed (status: {todo.get('status')})")
             else:
                 print(f"Status remains: {todo.get('status')}")
             
@@ -811,6 +1059,11 @@ def handle_completion_legacy(todo_id):
             text_output = f"Todo #{todo_id} erfolgreich bearbeitet."
             summary = f"✅ Todo #{todo_id} - Abgeschlossen"
     
+    # Nächsten Kandidaten parallel zur Completion vorladen (nur bei Auto-Continue)
+    prefetch = None
+    if not Path(CONFIG["paths"]["specific_mode"]).exists():
+        prefetch = start_next_todo_prefetch(todo_id)
+    
     # Todo abschließen
     if complete_todo(todo_id, html_output, text_output, summary):
         print(f"✅ Todo #{todo_id} completed")
@@ -841,15 +1094,50 @@ def handle_completion_legacy(todo_id):
         else:
             # Auto-continue: Nächstes Todo laden
             print("🔄 Loading next todo...")
-            time.sleep(2)
-            next_todo = load_todo()
+            prefetched = None
+            if prefetch:
+                thread, result = prefetch
+                thread.join(timeout=2)
+                prefetched = result.get('todo')
+            else:
+                time.sleep(2)
+            next_todo = load_todo(prefetched=prefetched)
             if not next_todo:
                 print("🎉 All todos completed!")
                 log("INFO", "All todos with bearbeiten=1 completed")
 
+def show_status():
+    """Zeigt aktuellen Status (eigener Slot bzw. alle Slots)"""
+    slot = CONFIG.get("active_slot")
+    prefix = f"[slot {slot}] " if slot else ""
+    
+    if Path(CONFIG["paths"]["current_todo"]).exists():
+        with open(CONFIG["paths"]["current_todo"]) as f:
+            todo_id = f.read().strip()
+        print(f"{prefix}Current todo: #{todo_id}")
+    else:
+        print(f"{prefix}No active todo")
+    
+    if not slot:
+        active_slots = list_slots()
+        if active_slots:
+            print(f"Active slots ({len(active_slots)}):")
+            for slot_name, slot_todo, age in active_slots:
+                print(f"  {slot_name}: #{slot_todo} ({age // 60} min)")
+
 def main():
     """Hauptfunktion"""
     
+    # Session-Slot aus --slot NAME oder TODO_SLOT (parallele Sessions)
+    slot = os.environ.get("TODO_SLOT")
+    if "--slot" in sys.argv:
+        index = sys.argv.index("--slot")
+        if index + 1 < len(sys.argv):
+            slot = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+    if slot:
+        apply_slot(slot)
+    
     # Zeige aktives Projekt falls vorhanden
     project_info = get_project_info()
     if project_info:
@@ -875,19 +1163,14 @@ def main():
         
         elif command == "status":
             # Zeige aktuellen Status
-            if Path(CONFIG["paths"]["current_todo"]).exists():
-                with open(CONFIG["paths"]["current_todo"]) as f:
-                    todo_id = f.read().strip()
-                print(f"Current todo: #{todo_id}")
-            else:
-                print("No active todo")
+            show_status()
         
         else:
             print(f"Unknown command: {command}")
-            print("Usage: todo-manager.py [load|load-id ID|complete|status]")
+            print("Usage: todo-manager.py [--slot NAME] [load|load-id ID|complete|status]")
     else:
         print("Todo Manager - New reliable system")
-        print("Usage: todo-manager.py [load|load-id ID|complete|status]")
+        print("Usage: todo-manager.py [--slot NAME] [load|load-id ID|complete|status]")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
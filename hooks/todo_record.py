@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Todo Record - Kompakter Datensatz für die 34 Felder eines Todos
+Eine Schema-Definition, ein Streaming-Decoder für `wp db query` Ausgaben,
+lazy Dekodierung und Nachladen großer Text-Spalten bei Bedarf
+"""
+
+import re
+from collections import namedtuple
+
+# heavy = große Text-Spalte: nicht im Header-SELECT, lazy dekodiert/nachgeladen
+TodoField = namedtuple('TodoField', 'name default heavy')
+
+# Einzige Schema-Definition (Reihenfolge = SELECT-Reihenfolge)
+TODO_SCHEMA = (
+    TodoField('id', '', False),
+    TodoField('title', '', False),
+    TodoField('description', '', False),
+    TodoField('status', 'offen', False),
+    TodoField('bearbeiten', '1', False),
+    TodoField('mode', 'execute', False),
+    TodoField('plan_approved', '0', False),
+    # Erweiterte Felder (V3.0)
+    TodoField('version', '1.00', False),
+    TodoField('priority', 'mittel', False),
+    TodoField('scope', 'todo-plugin', False),
+    TodoField('working_directory', '/home/rodemkay/www/react/plugin-todo/', False),
+    TodoField('development_area', 'fullstack', False),
+    TodoField('agent_count', '0', False),
+    TodoField('subagent_instructions', '', True),
+    TodoField('execution_mode', 'default', False),
+    TodoField('playwright_check', '0', False),
+    TodoField('mcp_servers', '', False),
+    TodoField('assigned_to', 'claude', False),
+    TodoField('due_date', None, False),
+    TodoField('completed_date', None, False),
+    TodoField('is_recurring', '0', False),
+    TodoField('recurring_type', None, False),
+    TodoField('claude_notes', '', True),
+    TodoField('claude_prompt', '', True),
+    TodoField('bemerkungen', '', True),
+    TodoField('continuation_notes', '', True),
+    TodoField('plan_html', '', True),
+    TodoField('report_url', '', False),
+    TodoField('related_files', '', False),
+    TodoField('dependencies', '', False),
+    TodoField('parent_todo_id', None, False),
+    TodoField('created_at', '', False),
+    TodoField('updated_at', '', False),
+    TodoField('save_agent_outputs', '0', False),
+)
+
+TODO_FIELDS = tuple(field.name for field in TODO_SCHEMA)
+FIELD_INDEX = {field.name: index for index, field in enumerate(TODO_SCHEMA)}
+HEAVY_FIELDS = tuple(field.name for field in TODO_SCHEMA if field.heavy)
+HEADER_FIELDS = tuple(field.name for field in TODO_SCHEMA if not field.heavy)
+
+# mysql Batch-Modus escaped \0, \t, \n und Backslash in Spaltenwerten
+_ESCAPE_RE = re.compile(r'\\(.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', '0': '\0', 'r': '\r', '\\': '\\'}
+
+
+def unescape(value):
+    """Dekodiert eine escaped Spalte aus dem mysql Batch-Output"""
+    if '\\' not in value:
+        return value
+    return _ESCAPE_RE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), value)
+
+
+class _Escaped(str):
+    """Markiert einen noch nicht dekodierten Rohwert einer Heavy-Spalte"""
+    __slots__ = ()
+
+
+# Platzhalter für Heavy-Spalten, die (noch) nicht selektiert wurden
+_NOT_FETCHED = object()
+
+
+def _initial_values():
+    return [_NOT_FETCHED if field.heavy else field.default for field in TODO_SCHEMA]
+
+
+class TodoRecord:
+    """Array-basierter Todo-Datensatz mit Dict-kompatiblem Zugriff"""
+    __slots__ = ('_values', '_loader')
+
+    def __init__(self, values, loader=None):
+        self._values = values
+        self._loader = loader
+
+    @classmethod
+    def from_columns(cls, columns, parts):
+        """Baut Record aus Header-Spaltennamen und escaped Rohwerten"""
+        values = _initial_values()
+        for column, raw in zip(columns, parts):
+            index = FIELD_INDEX.get(column)
+            if index is None:
+                continue
+            if raw == 'NULL':
+                values[index] = TODO_SCHEMA[index].default
+                continue
+            if TODO_SCHEMA[index].heavy:
+                values[index] = _Escaped(raw)
+            else:
+                values[index] = unescape(raw)
+        return cls(values)
+
+    @classmethod
+    def from_mapping(cls, row):
+        """Baut Record aus einer typisierten Row (z.B. mysql.connector Dict)"""
+        values = []
+        for field in TODO_SCHEMA:
+            if field.heavy and field.name not in row:
+                values.append(_NOT_FETCHED)
+                continue
+            value = row.get(field.name)
+            if value is None:
+                values.append(field.default)
+            elif isinstance(value, (bytes, bytearray)):
+                values.append(value.decode('utf-8', errors='replace'))
+            else:
+                values.append(str(value))
+        return cls(values)
+
+    def bind_loader(self, loader):
+        """Loader(todo_id, field_names) -> Dict, holt fehlende Heavy-Spalten nach"""
+        self._loader = loader
+        return self
+
+    def prefetch(self, *names):
+        """Lädt fehlende Heavy-Spalten in einem Rutsch (ohne Namen: alle)"""
+        names = names or HEAVY_FIELDS
+        missing = [name for name in names if self._values[FIELD_INDEX[name]] is _NOT_FETCHED]
+        if not missing:
+            return self
+
+        fetched = self._loader(self._values[0], missing) if self._loader else {}
+        for name in missing:
+            value = fetched.get(name)
+            self._values[FIELD_INDEX[name]] = TODO_SCHEMA[FIELD_INDEX[name]].default if value is None else value
+        return self
+
+    def adopt_heavy(self, other):
+        """Übernimmt bereits geladene Heavy-Spalten eines anderen Records desselben Todos"""
+        if other is None or other._values[0] != self._values[0]:
+            return self
+        for name in HEAVY_FIELDS:
+            index = FIELD_INDEX[name]
+            if self._values[index] is _NOT_FETCHED and other._values[index] is not _NOT_FETCHED:
+                self._values[index] = other._values[index]
+        return self
+
+    def __getitem__(self, name):
+        index = FIELD_INDEX[name]
+        value = self._values[index]
+        if value is _NOT_FETCHED:
+            self.prefetch(name)
+            value = self._values[index]
+        if type(value) is _Escaped:
+            value = unescape(value)
+            self._values[index] = value
+        return value
+
+    def __setitem__(self, name, value):
+        self._values[FIELD_INDEX[name]] = value
+
+    def get(self, name, default=None):
+        if name not in FIELD_INDEX:
+            return default
+        value = self[name]
+        return default if value is None else value
+
+    def __contains__(self, name):
+        return name in FIELD_INDEX
+
+    def __len__(self):
+        return len(TODO_SCHEMA)
+
+    def __iter__(self):
+        return iter(TODO_FIELDS)
+
+    def keys(self):
+        return TODO_FIELDS
+
+    def items(self):
+        return ((name, self[name]) for name in TODO_FIELDS)
+
+    def is_loaded(self, name):
+        """True wenn die Spalte bereits geholt und dekodiert ist"""
+        value = self._values[FIELD_INDEX[name]]
+        return value is not _NOT_FETCHED and type(value) is not _Escaped
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"TodoRecord(id={self._values[0]!r}, title={self._values[1]!r})"
+
+
+def iter_lines(output):
+    """Iteriert Zeilen ohne die gesamte Ausgabe in eine Liste zu kopieren"""
+    if not isinstance(output, str):
+        for line in output:
+            yield line.rstrip('\n')
+        return
+
+    start = 0
+    while True:
+        end = output.find('\n', start)
+        if end == -1:
+            if start < len(output):
+                yield output[start:]
+            return
+        yield output[start:end]
+        start = end + 1
+
+
+def decode_rows(output):
+    """
+    Streaming-Decoder für `wp db query` Ausgaben (Header + tab-getrennte Zeilen).
+    Echte Newlines/Tabs in Spalten sind im Batch-Modus escaped, daher ist jede
+    physische Zeile genau ein Datensatz. Akzeptiert String oder Datei-Objekt.
+    """
+    columns = None
+    for line in iter_lines(output):
+        if columns is None:
+            if not line.strip():
+                continue
+            columns = line.split('\t')
+            continue
+        if not line:
+            continue
+        yield TodoRecord.from_columns(columns, line.split('\t'))
+
+
+def decode_first(output):
+    """Erster Datensatz oder None"""
+    for record in decode_rows(output):
+        return record
+    return None
@@ -22,6 +22,19 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
+import io
+import tempfile
+import importlib.util
+from contextlib import redirect_stdout
+
+DEFAULT_TEST_COMMANDS = [
+    "./todo",
+    "./todo status",
+    "./todo -id 123",
+    "./todo complete",
+    "./todo test",
+    "./todo monitor"
+]
 
 @dataclass
 class LoadTestConfig:
@@ -73,14 +86,7 @@ class WebhookLoadTester:
         
         # Default test commands if none provided
         if not self.config.test_commands:
-            self.config.test_commands = [
-                "./todo",
-                "./todo status",
-                "./todo -id 123",
-                "./todo complete",
-                "./todo test",
-                "./todo monitor"
-            ]
+            self.config.test_commands = list(DEFAULT_TEST_COMMANDS)
         
         self.log("Load tester initialized with config:", "INFO")
         self.log(json.dumps(asdict(self.config), indent=2), "INFO")
@@ -483,12 +489,77 @@ def run_scalability_test():
     
     return results
 
+def load_queue_manager_module():
+    """Import queue-manager.py (hyphenated file name) as a module"""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "queue-manager.py")
+    spec = importlib.util.spec_from_file_location("queue_manager", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def run_queue_throughput_test(task_count: int = 300, batch_sizes=(1, 5), workers: int = 3,
+                              tmux_session: str = "queue-loadtest", coalesce_window: float = 0.0):
+    """
+    Measure WebhookQueueManager dispatch throughput per batch size against a
+    throwaway tmux session whose pane swallows all keys (nothing is executed)
+    """
+    queue_module = load_queue_manager_module()
+    subprocess.run(['tmux', 'new-session', '-d', '-s', tmux_session, 'cat > /dev/null'], check=True)
+    results = {}
+    
+    try:
+        for batch_size in batch_sizes:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                config_path = os.path.join(tmp_dir, "config.json")
+                with open(config_path, 'w') as f:
+                    json.dump({"queue": {
+                        "durability": "memory",
+                        "tmux_target": f"{tmux_session}:0",
+                        "batch_size": batch_size,
+                        "max_concurrent_workers": workers,
+                        "max_queue_size": task_count + 1,
+                        "rate_limit_per_second": 0,
+                        "coalesce_window_seconds": coalesce_window
+                    }}, f)
+                
+                # Queue manager logs every task - keep the report readable
+                with redirect_stdout(io.StringIO()):
+                    manager = queue_module.WebhookQueueManager(config_path=config_path)
+                    manager.log_file = os.path.join(tmp_dir, "queue.log")
+                    for i in range(task_count):
+                        manager.add_task(random.choice(DEFAULT_TEST_COMMANDS))
+                    
+                    start = time.time()
+                    manager.start_workers()
+                    manager.priority_queue.join()
+                    elapsed = time.time() - start
+                    manager.stop_workers()
+                    manager.store.close()
+                
+                stats = manager.stats
+                results[batch_size] = {
+                    'tasks': task_count,
+                    'elapsed_seconds': round(elapsed, 2),
+                    'tasks_per_second': round(task_count / elapsed, 1) if elapsed > 0 else 0,
+                    'deduplicated_on_enqueue': stats.deduplicated,
+                    'batches': stats.batches,
+                    'coalesced_commands': stats.coalesced,
+                    'tmux_calls': stats.tmux_calls,
+                    'failed': stats.failed
+                }
+                print(f"Batch size: {batch_size}, Tasks/s: {results[batch_size]['tasks_per_second']}, "
+                      f"tmux calls: {stats.tmux_calls}, Batches: {stats.batches}")
+    finally:
+        subprocess.run(['tmux', 'kill-session', '-t', tmux_session], capture_output=True)
+    
+    return results
+
 def main():
     """Main entry point"""
     import argparse
     
     parser = argparse.ArgumentParser(description='Webhook System Load Tester')
-    parser.add_argument('--test-type', choices=['baseline', 'stress', 'scalability', 'custom'], 
+    parser.add_argument('--test-type', choices=['baseline', 'stress', 'scalability', 'custom', 'queue'], 
                        default='baseline', help='Type of test to run')
     parser.add_argument('--duration', type=int, default=60, help='Test duration in seconds')
     parser.add_argument('--users', type=int, default=10, help='Number of concurrent users')
@@ -497,6 +568,10 @@ def main():
     parser.add_argument('--output', type=str, help='Output file for results')
     parser.add_argument('--trigger-file', type=str, default='/tmp/claude_todo_trigger.txt',
                        help='Path to trigger file')
+    parser.add_argument('--tasks', type=int, default=300, help='Tasks for the queue throughput test')
+    parser.add_argument('--batch-size', type=int, default=5, help='Batch size compared against 1 in the queue test')
+    parser.add_argument('--coalesce-window', type=float, default=0.0,
+                       help='Duplicate coalescing window (seconds) for the queue test, 0 disables')
     
     args = parser.parse_args()
     
@@ -510,6 +585,12 @@ def main():
             print("\\nScalability Test Results:")
             print(json.dumps(scalability_results, indent=2))
             return
+        elif args.test_type == 'queue':
+            queue_results = run_queue_throughput_test(args.tasks, (1, args.batch_size), args.users,
+                                                      coalesce_window=args.coalesce_window)
+            print("\nQueue Throughput Results:")
+            print(json.dumps(queue_results, indent=2))
+            return
         else:  # custom
             config = LoadTestConfig(
                 test_duration=args.duration,
@@ -24,6 +24,7 @@ from dataclasses import dataclass, asdict
 from queue import Queue, PriorityQueue, Empty
 from collections import defaultdict
 import hashlib
+import math
 import signal
 
 @dataclass
@@ -53,8 +54,255 @@ class QueueStats:
     avg_processing_time: float = 0.0
     peak_queue_size: int = 0
     rate_limited: int = 0
+    batches: int = 0
+    coalesced: int = 0
+    deduplicated: int = 0
+    tmux_calls: int = 0
+
+class RateLimiter:
+    """
+    Per-category GCRA limiter (token bucket without a refill timer): each
+    category only stores its theoretical arrival time, so a check is O(1)
+    and allocation-free. burst requests may pass back to back, after that
+    one request per 1/rate seconds.
+    """
+    
+    # Above this many categories, idle ones (bucket full again) are dropped
+    MAX_IDLE_CATEGORIES = 1024
+    
+    def __init__(self, rate: float = 10, burst: int = None, overrides: Dict = None):
+        self.default = self._limits(rate, burst)
+        self.overrides = {
+            category: self._limits(limits.get('per_second', rate), limits.get('burst'))
+            for category, limits in (overrides or {}).items()
+        }
+        self.arrivals = {}  # category -> theoretical arrival time (monotonic)
+        self.prune_at = self.MAX_IDLE_CATEGORIES
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def _limits(rate: float, burst: Optional[int]) -> Tuple[float, int]:
+        """(rate, burst) with burst defaulting to one second of traffic, never below 1"""
+        rate = float(rate)
+        if burst is None:
+            return rate, max(1, int(math.ceil(rate)))
+        if int(burst) < 1:
+            raise ValueError(f"rate limit burst must be >= 1, got {burst}")
+        return rate, int(burst)
+    
+    def limits(self, category: str) -> Tuple[float, int]:
+        return self.overrides.get(category, self.default)
+    
+    def allow(self, category: str) -> bool:
+        rate, burst = self.limits(category)
+        if rate <= 0:
+            return True  # Unlimited
+        interval = 1.0 / rate
+        tolerance = interval * (burst - 1)
+        now = time.monotonic()
+        
+        with self.lock:
+            arrival = max(self.arrivals.get(category, now), now)
+            if arrival - tolerance > now:
+                return False
+            self.arrivals[category] = arrival + interval
+            if len(self.arrivals) > self.prune_at:
+                self._prune(now)
+            return True
+    
+    def _prune(self, now: float):
+        """Forget categories whose bucket is full again - same state as unknown"""
+        for category in [c for c, arrival in self.arrivals.items() if arrival <= now]:
+            del self.arrivals[category]
+        # Many categories still active: prune again only after the map doubled
+        self.prune_at = max(self.MAX_IDLE_CATEGORIES, 2 * len(self.arrivals))
+    
+    def status(self) -> Dict:
+        """Requests each known category could send right now"""
+        now = time.monotonic()
+        result = {}
+        with self.lock:
+            for category, arrival in self.arrivals.items():
+                rate, burst = self.limits(category)
+                if rate <= 0:
+                    continue
+                interval = 1.0 / rate
+                available = math.floor((now + interval * (burst - 1) - max(arrival, now)) / interval + 1e-9) + 1
+                result[category] = {"available": max(0, min(burst, available)), "per_second": rate, "burst": burst}
+        return result
+
+class QueueStore:
+    """
+    Persistence layer: one long-lived SQLite connection in WAL mode shared by
+    all threads (serialized by a lock) instead of a new connection per write
+    """
+    
+    SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+    
+    def __init__(self, db_path: str, synchronous: str = "NORMAL"):
+        synchronous = str(synchronous).upper()
+        if synchronous not in self.SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous mode: {synchronous}")
+        
+        self.db_path = db_path
+        self.closed = False
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+        # WAL: readers never block the writer, commits append to the log
+        # instead of rewriting the database file. synchronous=NORMAL only
+        # fsyncs at checkpoints - a power loss can drop the last commits but
+        # never corrupts the database.
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA busy_timeout=10000")
+    
+    def execute(self, sql: str, params: Tuple = ()):
+        """Execute a single write and commit it"""
+        with self.lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+    
+    def execute_batch(self, operations: List[Tuple[str, Tuple]]):
+        """Execute several writes in one transaction (single commit)"""
+        with self.lock:
+            try:
+                for sql, params in operations:
+                    self.conn.execute(sql, params)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+    
+    def executescript(self, script: str):
+        with self.lock:
+            self.conn.executescript(script)
+    
+    def query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+    
+    def close(self):
+        with self.lock:
+            if not self.closed:
+                self.closed = True
+                self.conn.close()
+
+class JournalAck:
+    """Completion signal for a journal write: set after its group commit ran"""
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.ok = False
+    
+    def done(self, ok: bool):
+        self.ok = ok
+        self.event.set()
+    
+    def wait(self, timeout: float) -> bool:
+        """True only if the commit finished in time and succeeded"""
+        return self.event.wait(timeout) and self.ok
+
+class QueueJournal:
+    """
+    Write-behind journal: a background thread collects everything that
+    arrives within interval_ms and writes it with a single commit (group
+    commit).
+    
+    Durability contract:
+    - submit() is fire-and-forget. Use it only for writes nobody is
+      acknowledged for (status transitions, metrics, stats). They are
+      lost if the process dies before the next group commit.
+    - commit() blocks until the group commit containing the write has
+      succeeded and returns False on failure or timeout. Anything
+      acknowledged to a caller (e.g. add_task returning a task id) must
+      use commit(). Concurrent callers still share one commit.
+    - flush()/close() wait for everything submitted so far; call them
+      before the process exits.
+    """
+    
+    def __init__(self, store: QueueStore, interval_ms: float = 5.0, max_batch: int = 500, log=None):
+        self.store = store
+        self.interval = interval_ms / 1000.0
+        self.max_batch = max_batch
+        self.log = log or (lambda message, level="INFO": None)
+        self.pending = Queue()
+        self.closed = False
+        self.stats = {"operations": 0, "commits": 0, "max_batch": 0, "failed_batches": 0}
+        self.thread = threading.Thread(target=self._run, name="queue-journal", daemon=True)
+        self.thread.start()
+    
+    def submit(self, sql: str, params: Tuple = ()):
+        """Queue a write without waiting for its commit"""
+        self.pending.put((sql, params, None))
+    
+    def commit(self, sql: str, params: Tuple = (), timeout: float = 5.0) -> bool:
+        """Queue a write and wait until its group commit succeeded"""
+        ack = JournalAck()
+        self.pending.put((sql, params, ack))
+        return ack.wait(timeout)
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Block until everything submitted so far is committed"""
+        ack = JournalAck()
+        self.pending.put(ack)
+        return ack.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Commit everything pending and stop the journal thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.pending.put(None)
+        self.thread.join(timeout)
+    
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            batch, acks, stop = [], [], False
+            deadline = time.monotonic() + self.interval
+            
+            # Collect until the interval expires or the batch is full
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, JournalAck):
+                    acks.append(item)
+                else:
+                    sql, params, ack = item
+                    batch.append((sql, params))
+                    if ack:
+                        acks.append(ack)
+                if stop or len(batch) >= self.max_batch:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.pending.get(timeout=remaining)
+                except Empty:
+                    break
+            
+            ok = True
+            if batch:
+                try:
+                    self.store.execute_batch(batch)
+                    self.stats["operations"] += len(batch)
+                    self.stats["commits"] += 1
+                    self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+                except Exception as e:
+                    ok = False
+                    self.stats["failed_batches"] += 1
+                    self.log(f"Journal commit of {len(batch)} writes failed: {e}", "ERROR")
+            for ack in acks:
+                ack.done(ok)
+            if stop:
+                return
 
 class WebhookQueueManager:
+    DURABILITY_MODES = ("sync", "batched", "memory")
+    PERSIST_TIMEOUT = 5.0  # seconds a coalesced duplicate waits for the original's commit
+    
     def __init__(self, config_path: str = None):
         self.config_path = config_path or "/home/rodemkay/www/react/plugin-todo/hooks/config.json"
         self.db_path = "/tmp/webhook_queue.db"
@@ -64,8 +312,17 @@ class WebhookQueueManager:
         self.max_queue_size = 1000
         self.max_concurrent_workers = 3
         self.rate_limit_per_second = 10
+        self.rate_limit_burst = None  # Defaults to one second of traffic (at least 1)
+        self.rate_limits = {}  # category -> {"per_second": x, "burst": y}
         self.batch_size = 5
         self.processing_timeout = 30.0
+        self.tmux_target = "claude:0"
+        self.coalesce_window = 2.0  # seconds, 0 disables duplicate coalescing
+        self.db_synchronous = "NORMAL"
+        self.durability = "batched"  # sync | batched | memory
+        self.journal_interval_ms = 5.0
+        self.store = None
+        self.journal = None
         
         # Queues
         self.priority_queue = PriorityQueue()
@@ -77,8 +334,10 @@ class WebhookQueueManager:
         self.running = False
         self.worker_threads = []
         
-        # Rate Limiting
-        self.rate_limiter = defaultdict(list)  # category -> timestamps
+        # Idempotency index: (category, command) -> (task_id, enqueued_at, ack) of
+        # pending tasks; ack is set once the task is persisted (ok=False: rejected)
+        self.pending_commands = {}
+        self.pending_lock = threading.Lock()
         
         # Statistics
         self.stats = QueueStats()
@@ -86,6 +345,10 @@ class WebhookQueueManager:
         
         # Load configuration
         self.load_config()
+        
+        # Rate Limiting
+        self.rate_limiter = RateLimiter(self.rate_limit_per_second, self.rate_limit_burst, self.rate_limits)
+        
         self.init_database()
         
         # Signal handlers
@@ -103,8 +366,16 @@ class WebhookQueueManager:
                 self.max_queue_size = queue_config.get('max_queue_size', 1000)
                 self.max_concurrent_workers = queue_config.get('max_concurrent_workers', 3)
                 self.rate_limit_per_second = queue_config.get('rate_limit_per_second', 10)
+                self.rate_limit_burst = queue_config.get('rate_limit_burst')
+                self.rate_limits = queue_config.get('rate_limits', {})
                 self.batch_size = queue_config.get('batch_size', 5)
                 self.processing_timeout = queue_config.get('processing_timeout', 30.0)
+                self.tmux_target = queue_config.get('tmux_target', "claude:0")
+                self.coalesce_window = queue_config.get('coalesce_window_seconds', 2.0)
+                self.db_path = queue_config.get('db_path', self.db_path)
+                self.db_synchronous = queue_config.get('db_synchronous', "NORMAL")
+                self.durability = queue_config.get('durability', "batched")
+                self.journal_interval_ms = queue_config.get('journal_interval_ms', 5.0)
                 
             self.log("Queue configuration loaded", "INFO")
         except Exception as e:
@@ -113,11 +384,18 @@ class WebhookQueueManager:
     def init_database(self):
         """Initialize SQLite database for queue persistence"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            if self.durability not in self.DURABILITY_MODES:
+                self.log(f"Unknown durability mode '{self.durability}', using 'batched'", "WARNING")
+                self.durability = "batched"
+            
+            # memory: nothing touches the disk, queue state is lost on restart
+            db_path = ":memory:" if self.durability == "memory" else self.db_path
+            self.store = QueueStore(db_path, self.db_synchronous)
+            if self.durability == "batched":
+                self.journal = QueueJournal(self.store, self.journal_interval_ms, log=self.log)
             
-            # Queue tasks table
-            cursor.execute('''
+            self.store.executescript('''
+                -- Queue tasks table
                 CREATE TABLE IF NOT EXISTS queue_tasks (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     task_id TEXT UNIQUE,
@@ -132,11 +410,13 @@ class WebhookQueueManager:
                     started_at REAL,
                     completed_at REAL,
                     error_message TEXT
-                )
-            ''')
-            
-            # Queue statistics table
-            cursor.execute('''
+                );
+                
+                -- Restore/dequeue order: WHERE status ... ORDER BY priority, created_at
+                CREATE INDEX IF NOT EXISTS idx_queue_tasks_status_priority
+                    ON queue_tasks (status, priority, created_at);
+                
+                -- Queue statistics table
                 CREATE TABLE IF NOT EXISTS queue_stats (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     timestamp REAL,
@@ -148,11 +428,9 @@ class WebhookQueueManager:
                     avg_processing_time REAL,
                     peak_queue_size INTEGER,
                     rate_limited INTEGER
-                )
-            ''')
-            
-            # Performance metrics table
-            cursor.execute('''
+                );
+                
+                -- Performance metrics table
                 CREATE TABLE IF NOT EXISTS performance_metrics (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     task_id TEXT,
@@ -161,12 +439,9 @@ class WebhookQueueManager:
                     queue_wait_time REAL,
                     worker_id TEXT,
                     timestamp REAL
-                )
+                );
             ''')
             
-            conn.commit()
-            conn.close()
-            
             # Restore queue from database on startup
             self.restore_queue_from_db()
             
@@ -174,6 +449,21 @@ class WebhookQueueManager:
         except Exception as e:
             self.log(f"Database initialization failed: {e}", "ERROR")
     
+    def write(self, sql: str, params: Tuple = (), durable: bool = False) -> bool:
+        """
+        Persist a write according to the durability mode. With durable=True
+        the call only returns True once the write is committed (in batched
+        mode: after its group commit); use it for anything acknowledged to
+        a caller.
+        """
+        if self.journal:
+            if durable:
+                return self.journal.commit(sql, params)
+            self.journal.submit(sql, params)
+            return True
+        self.store.execute(sql, params)
+        return True
+    
     def log(self, message: str, level: str = "INFO"):
         """Thread-safe logging"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
@@ -196,38 +486,67 @@ class WebhookQueueManager:
     
     def add_task(self, command: str, priority: int = 5, category: str = "default", 
                 estimated_duration: float = 2.0, max_retries: int = 3) -> str:
-        """Add task to queue"""
+        """
+        Add task to queue. An identical command of the same category that is
+        still pending and was queued less than coalesce_window seconds ago is
+        not queued again - its task id is returned instead, but only once
+        that task is persisted (None if persisting it fails).
+        """
+        ack = None
         try:
-            # Check queue size limit
-            if self.priority_queue.qsize() >= self.max_queue_size:
-                self.log(f"Queue full, rejecting task: {command[:50]}...", "WARNING")
-                self.stats.rate_limited += 1
-                return None
+            key = (category, command)
+            now = time.monotonic()
+            with self.pending_lock:
+                pending = self.pending_commands.get(key)
+                if pending and now - pending[1] < self.coalesce_window:
+                    self.stats.deduplicated += 1
+                    self.log(f"Coalesced duplicate task: {command[:50]}... -> {pending[0]}", "INFO")
+                else:
+                    pending = None
+                    
+                    # Check queue size limit
+                    if self.priority_queue.qsize() >= self.max_queue_size:
+                        self.log(f"Queue full, rejecting task: {command[:50]}...", "WARNING")
+                        self.stats.rate_limited += 1
+                        return None
+                    
+                    # Rate limiting check
+                    if not self.check_rate_limit(category):
+                        self.log(f"Rate limited task: {command[:50]}...", "WARNING")
+                        self.stats.rate_limited += 1
+                        return None
+                    
+                    # Create task
+                    task_id = self.generate_task_id(command, priority)
+                    task = QueueTask(
+                        task_id=task_id,
+                        command=command,
+                        priority=priority,
+                        created_at=time.time(),
+                        max_retries=max_retries,
+                        estimated_duration=estimated_duration,
+                        category=category
+                    )
+                    if self.coalesce_window > 0:
+                        # Duplicates wait on ack until the task is persisted
+                        ack = JournalAck()
+                        self.pending_commands[key] = (task_id, now, ack)
             
-            # Rate limiting check
-            if not self.check_rate_limit(category):
-                self.log(f"Rate limited task: {command[:50]}...", "WARNING")
-                self.stats.rate_limited += 1
-                return None
+            if pending:
+                # Outside the lock: wait for the original's commit
+                return pending[0] if pending[2].wait(self.PERSIST_TIMEOUT) else None
             
-            # Create task
-            task_id = self.generate_task_id(command, priority)
-            task = QueueTask(
-                task_id=task_id,
-                command=command,
-                priority=priority,
-                created_at=time.time(),
-                max_retries=max_retries,
-                estimated_duration=estimated_duration,
-                category=category
-            )
+            # Persist to database - the task id is only returned once committed
+            if not self.persist_task(task, "queued", durable=True):
+                self.log(f"Task {task_id} not persisted, rejecting: {command[:50]}...", "ERROR")
+                self._discard_pending(key, task_id, ack)
+                return None
+            if ack:
+                ack.done(True)
             
             # Add to queue
             self.priority_queue.put(task)
             
-            # Persist to database
-            self.persist_task(task, "queued")
-            
             # Update statistics
             current_size = self.priority_queue.qsize()
             if current_size > self.stats.peak_queue_size:
@@ -238,33 +557,32 @@ class WebhookQueueManager:
             
         except Exception as e:
             self.log(f"Failed to add task: {e}", "ERROR")
+            if ack and not ack.event.is_set():
+                self._discard_pending(key, task_id, ack)
             return None
     
+    def _discard_pending(self, key: Tuple[str, str], task_id: str, ack: Optional[JournalAck]):
+        """Withdraw a task that was never persisted; waiting duplicates get None"""
+        with self.pending_lock:
+            if self.pending_commands.get(key, (None,))[0] == task_id:
+                del self.pending_commands[key]
+        if ack:
+            ack.done(False)
+    
+    def _prune_pending_commands(self):
+        """Drop index entries older than the window (caller holds pending_lock)"""
+        cutoff = time.monotonic() - self.coalesce_window
+        for key in [key for key, (_, enqueued_at, _) in self.pending_commands.items() if enqueued_at < cutoff]:
+            del self.pending_commands[key]
+    
     def check_rate_limit(self, category: str) -> bool:
         """Check if category is within rate limit"""
-        current_time = time.time()
-        
-        # Clean old timestamps (older than 1 second)
-        self.rate_limiter[category] = [
-            ts for ts in self.rate_limiter[category] 
-            if current_time - ts < 1.0
-        ]
-        
-        # Check current rate
-        if len(self.rate_limiter[category]) >= self.rate_limit_per_second:
-            return False
-        
-        # Add current timestamp
-        self.rate_limiter[category].append(current_time)
-        return True
+        return self.rate_limiter.allow(category)
     
-    def persist_task(self, task: QueueTask, status: str):
-        """Persist task to database"""
+    def persist_task(self, task: QueueTask, status: str, durable: bool = False) -> bool:
+        """Persist task to database (durable=True: wait for the commit)"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            return self.write('''
                 INSERT OR REPLACE INTO queue_tasks 
                 (task_id, command, priority, created_at, max_retries, retry_count,
                  estimated_duration, category, status)
@@ -273,20 +591,15 @@ class WebhookQueueManager:
                 task.task_id, task.command, task.priority, task.created_at,
                 task.max_retries, task.retry_count, task.estimated_duration,
                 task.category, status
-            ))
-            
-            conn.commit()
-            conn.close()
+            ), durable=durable)
         except Exception as e:
             self.log(f"Failed to persist task: {e}", "ERROR")
+            return False
     
     def restore_queue_from_db(self):
         """Restore unfinished tasks from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            rows = self.store.query('''
                 SELECT task_id, command, priority, created_at, max_retries,
                        retry_count, estimated_duration, category
                 FROM queue_tasks 
@@ -295,7 +608,7 @@ class WebhookQueueManager:
             ''')
             
             restored_count = 0
-            for row in cursor.fetchall():
+            for row in rows:
                 task = QueueTask(
                     task_id=row[0],
                     command=row[1],
@@ -310,8 +623,6 @@ class WebhookQueueManager:
                 self.priority_queue.put(task)
                 restored_count += 1
             
-            conn.close()
-            
             if restored_count > 0:
                 self.log(f"Restored {restored_count} tasks from database", "INFO")
                 
@@ -324,40 +635,96 @@ class WebhookQueueManager:
         
         while self.running:
             try:
-                # Get task from queue (timeout to allow shutdown)
-                try:
-                    task = self.priority_queue.get(timeout=1.0)
-                except Empty:
+                # Get up to batch_size tasks (timeout to allow shutdown)
+                tasks = self.dequeue_batch(timeout=1.0)
+                if not tasks:
                     continue
                 
-                # Process task
-                self.process_task(task, worker_id)
-                
-                # Mark task as done
-                self.priority_queue.task_done()
+                # Process tasks
+                try:
+                    self.process_batch(tasks, worker_id)
+                finally:
+                    # Mark tasks as done
+                    for _ in tasks:
+                        self.priority_queue.task_done()
                 
             except Exception as e:
                 self.log(f"Worker {worker_id} error: {e}", "ERROR")
         
         self.log(f"Worker {worker_id} stopped", "INFO")
     
+    def dequeue_batch(self, timeout: float = 1.0) -> List[QueueTask]:
+        """
+        Block for the next task, then drain up to batch_size - 1 further tasks
+        of the same category without waiting. Tasks of other categories are
+        put back for the next batch.
+        """
+        try:
+            first = self.priority_queue.get(timeout=timeout)
+        except Empty:
+            return []
+        
+        batch = [first]
+        deferred = []
+        # Look at no more than 2x batch_size tasks so one worker can't drain the queue
+        while len(batch) < self.batch_size and len(batch) + len(deferred) < 2 * self.batch_size:
+            try:
+                task = self.priority_queue.get_nowait()
+            except Empty:
+                break
+            if task.category == first.category:
+                batch.append(task)
+            else:
+                deferred.append(task)
+        
+        for task in deferred:
+            self.priority_queue.put(task)
+            self.priority_queue.task_done()  # Balances the get() above
+        return batch
+    
     def process_task(self, task: QueueTask, worker_id: str):
         """Process a single task"""
+        self.process_batch([task], worker_id)
+    
+    def process_batch(self, tasks: List[QueueTask], worker_id: str):
+        """Process a batch of tasks with a single tmux dispatch"""
         start_time = time.time()
-        queue_wait_time = start_time - task.created_at
         
-        self.log(f"Processing task {task.task_id}: {task.command[:50]}...", "INFO")
+        # Dispatched tasks no longer absorb duplicates
+        with self.pending_lock:
+            for task in tasks:
+                key = (task.category, task.command)
+                if self.pending_commands.get(key, (None,))[0] == task.task_id:
+                    del self.pending_commands[key]
+            self._prune_pending_commands()
+        
+        # Identical commands in one batch are sent only once
+        commands = list(dict.fromkeys(task.command for task in tasks))
+        self.stats.batches += 1
+        self.stats.coalesced += len(tasks) - len(commands)
+        
+        if len(tasks) == 1:
+            self.log(f"Processing task {tasks[0].task_id}: {tasks[0].command[:50]}...", "INFO")
+        else:
+            self.log(f"Processing batch of {len(tasks)} tasks ({len(commands)} distinct commands)", "INFO")
         
         # Update task status
-        self.persist_task_update(task.task_id, "processing", start_time)
+        for task in tasks:
+            self.persist_task_update(task.task_id, "processing", start_time)
         
+        # Execute commands via tmux
+        result = self.execute_commands(commands)
+        
+        for task in tasks:
+            self.finish_task(task, result, start_time, worker_id)
+    
+    def finish_task(self, task: QueueTask, result: bool, start_time: float, worker_id: str):
+        """Record the outcome of a dispatched task (statistics, retry, persistence)"""
+        queue_wait_time = start_time - task.created_at
         success = False
         error_message = None
         
         try:
-            # Execute command via tmux
-            result = self.execute_command(task.command)
-            
             if result:
                 success = True
                 self.stats.successful += 1
@@ -405,21 +772,29 @@ class WebhookQueueManager:
     
     def execute_command(self, command: str) -> bool:
         """Execute command via tmux"""
+        return self.execute_commands([command])
+    
+    def execute_commands(self, commands: List[str]) -> bool:
+        """Execute commands via tmux - one send-keys call for the whole batch"""
         try:
             # Check if tmux session exists
-            check_result = subprocess.run(['tmux', 'has-session', '-t', 'claude'], 
+            session = self.tmux_target.split(':')[0]
+            check_result = subprocess.run(['tmux', 'has-session', '-t', session], 
                                         capture_output=True, text=True)
+            self.stats.tmux_calls += 1
             
             if check_result.returncode != 0:
-                raise Exception("tmux session 'claude' not found")
+                raise Exception(f"tmux session '{session}' not found")
             
-            # Send command to tmux session
-            subprocess.run(['tmux', 'send-keys', '-t', 'claude:0', command], 
-                         check=True, capture_output=True, text=True)
-            subprocess.run(['tmux', 'send-keys', '-t', 'claude:0', 'Enter'], 
+            # Send all commands, each followed by Enter, in one invocation
+            keys = []
+            for command in commands:
+                keys.extend([command, 'Enter'])
+            subprocess.run(['tmux', 'send-keys', '-t', self.tmux_target] + keys, 
                          check=True, capture_output=True, text=True)
+            self.stats.tmux_calls += 1
             
-            # Small delay to ensure command is sent
+            # Small delay to ensure commands are sent
             time.sleep(0.1)
             
             return True
@@ -432,9 +807,6 @@ class WebhookQueueManager:
                           completed_at: float = None, error_message: str = None):
         """Update task status in database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             update_fields = ["status = ?"]
             values = [status]
             
@@ -452,14 +824,11 @@ class WebhookQueueManager:
             
             values.append(task_id)
             
-            cursor.execute(f'''
+            self.write(f'''
                 UPDATE queue_tasks 
                 SET {", ".join(update_fields)}
                 WHERE task_id = ?
-            ''', values)
-            
-            conn.commit()
-            conn.close()
+            ''', tuple(values))
         except Exception as e:
             self.log(f"Failed to update task status: {e}", "ERROR")
     
@@ -467,10 +836,7 @@ class WebhookQueueManager:
                                 queue_wait_time: float, worker_id: str):
         """Store performance metrics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self.write('''
                 INSERT INTO performance_metrics
                 (task_id, category, processing_time, queue_wait_time, worker_id, timestamp)
                 VALUES (?, ?, ?, ?, ?, ?)
@@ -478,9 +844,6 @@ class WebhookQueueManager:
                 task.task_id, task.category, processing_time, 
                 queue_wait_time, worker_id, time.time()
             ))
-            
-            conn.commit()
-            conn.close()
         except Exception as e:
             self.log(f"Failed to store performance metrics: {e}", "ERROR")
     
@@ -492,10 +855,9 @@ class WebhookQueueManager:
             "dead_letter_queue_size": self.dead_letter_queue.qsize(),
             "active_workers": len([t for t in self.worker_threads if t.is_alive()]),
             "stats": asdict(self.stats),
-            "rate_limiter_status": {
-                category: len(timestamps) 
-                for category, timestamps in self.rate_limiter.items()
-            }
+            "durability": self.durability,
+            "journal": dict(self.journal.stats) if self.journal else None,
+            "rate_limiter_status": self.rate_limiter.status()
         }
     
     def start_workers(self):
@@ -555,10 +917,7 @@ class WebhookQueueManager:
     def store_queue_stats(self):
         """Store queue statistics to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            self.write('''
                 INSERT INTO queue_stats
                 (timestamp, total_processed, successful, failed, retries,
                  current_queue_size, avg_processing_time, peak_queue_size, rate_limited)
@@ -574,9 +933,6 @@ class WebhookQueueManager:
                 self.stats.peak_queue_size,
                 self.stats.rate_limited
             ))
-            
-            conn.commit()
-            conn.close()
         except Exception as e:
             self.log(f"Failed to store queue stats: {e}", "ERROR")
     
@@ -585,6 +941,13 @@ class WebhookQueueManager:
         total = self.stats.successful + self.stats.failed
         return (self.stats.successful / total * 100) if total > 0 else 100.0
     
+    def close(self):
+        """Commit pending journal writes and close the database"""
+        if self.journal:
+            self.journal.close()
+        if self.store:
+            self.store.close()
+    
     def shutdown_handler(self, signum, frame):
         """Handle shutdown signals"""
         self.log(f"Received shutdown signal {signum}", "INFO")
@@ -592,6 +955,9 @@ class WebhookQueueManager:
     
     def shutdown(self):
         """Graceful shutdown"""
+        if self.store and self.store.closed:
+            return  # Already shut down (signal handler + main finally)
+        
         self.log("Starting graceful shutdown...", "INFO")
         
         # Stop accepting new tasks
@@ -611,12 +977,84 @@ class WebhookQueueManager:
             
             # Store final statistics
             self.store_queue_stats()
+            self.close()
             
             self.log("Shutdown complete", "INFO")
             
         except Exception as e:
             self.log(f"Shutdown error: {e}", "ERROR")
 
+def benchmark_persistence(task_count: int = 1000) -> Dict:
+    """Compare connection-per-write persistence with the WAL store and the journal"""
+    import tempfile
+    
+    insert_sql = '''
+        INSERT OR REPLACE INTO queue_tasks 
+        (task_id, command, priority, created_at, max_retries, retry_count,
+         estimated_duration, category, status)
+        VALUES (?, ?, ?, ?, 3, 0, 2.0, 'default', 'queued')
+    '''
+    update_sql = "UPDATE queue_tasks SET status = ?, started_at = ? WHERE task_id = ?"
+    schema = '''
+        CREATE TABLE IF NOT EXISTS queue_tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, task_id TEXT UNIQUE, command TEXT,
+            priority INTEGER, created_at REAL, max_retries INTEGER, retry_count INTEGER,
+            estimated_duration REAL, category TEXT, status TEXT DEFAULT 'queued',
+            started_at REAL, completed_at REAL, error_message TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_queue_tasks_status_priority
+            ON queue_tasks (status, priority, created_at);
+    '''
+    tasks = [(f"task{i:06d}", f"./todo -id {i}", i % 10 + 1, time.time()) for i in range(task_count)]
+    results = {"tasks": task_count}
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Previous pattern: new connection + rollback journal per write
+        legacy_db = os.path.join(tmp_dir, "legacy.db")
+        conn = sqlite3.connect(legacy_db)
+        conn.executescript(schema)
+        conn.close()
+        start = time.perf_counter()
+        for task_id, command, priority, created_at in tasks:
+            for sql, params in ((insert_sql, (task_id, command, priority, created_at)),
+                                (update_sql, ("processing", time.time(), task_id))):
+                conn = sqlite3.connect(legacy_db)
+                conn.execute(sql, params)
+                conn.commit()
+                conn.close()
+        results["connection_per_write_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        
+        store = QueueStore(os.path.join(tmp_dir, "wal.db"))
+        store.executescript(schema)
+        start = time.perf_counter()
+        for task_id, command, priority, created_at in tasks:
+            store.execute(insert_sql, (task_id, command, priority, created_at))
+            store.execute(update_sql, ("processing", time.time(), task_id))
+        results["wal_store_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        store.close()
+        
+        # Write-behind: callers only pay for the enqueue, commits are grouped
+        store = QueueStore(os.path.join(tmp_dir, "batched.db"))
+        store.executescript(schema)
+        journal = QueueJournal(store)
+        start = time.perf_counter()
+        for task_id, command, priority, created_at in tasks:
+            journal.submit(insert_sql, (task_id, command, priority, created_at))
+            journal.submit(update_sql, ("processing", time.time(), task_id))
+        results["batched_enqueue_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        journal.flush(timeout=60)
+        results["batched_until_committed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        results["batched_commits"] = journal.stats["commits"]
+        journal.close()
+        store.close()
+    
+    results["per_task_us"] = {
+        "connection_per_write": round(results["connection_per_write_ms"] * 1000 / task_count, 1),
+        "wal_store": round(results["wal_store_ms"] * 1000 / task_count, 1),
+        "batched_enqueue": round(results["batched_enqueue_ms"] * 1000 / task_count, 1),
+    }
+    return results
+
 def main():
     """Main entry point"""
     import argparse
@@ -628,9 +1066,14 @@ def main():
     parser.add_argument('--priority', type=int, default=5, help='Task priority (1-10)')
     parser.add_argument('--category', type=str, default='default', help='Task category')
     parser.add_argument('--status', action='store_true', help='Show queue status')
+    parser.add_argument('--benchmark', type=int, metavar='TASKS', help='Benchmark task persistence and exit')
     
     args = parser.parse_args()
     
+    if args.benchmark:
+        print(json.dumps(benchmark_persistence(args.benchmark), indent=2))
+        return
+    
     # Create queue manager
     queue_manager = WebhookQueueManager(config_path=args.config)
     queue_manager.max_concurrent_workers = args.workers
@@ -673,6 +1116,9 @@ def main():
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
+    finally:
+        # One-shot paths (--add-task, --status) never run shutdown()
+        queue_manager.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -11,6 +11,16 @@ import re
 import subprocess
 from datetime import datetime
 import html
+from pathlib import Path
+
+# Shared query layer from hooks/ (MySQL pool or wp-cli via stdin)
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+import db_query
+from todo_cache import invalidate_todo
+
+with open(HOOKS_DIR / "config.json") as f:
+    CONFIG = json.load(f)
 
 def strip_html(html_text):
     """Remove HTML tags and convert to plain text"""
@@ -77,38 +87,20 @@ def get_claude_last_output():
 def save_to_database(todo_id, html_output, text_output, summary):
     """Save summaries to database via SSH and WP-CLI"""
     
-    # Escape quotes for SQL
-    html_escaped = html_output.replace('"', '\\"').replace("'", "\\'")
-    text_escaped = text_output.replace('"', '\\"').replace("'", "\\'")
-    summary_escaped = summary.replace('"', '\\"').replace("'", "\\'")
-    
-    # Build WP-CLI command
-    cmd = f'''ssh rodemkay@159.69.157.54 "cd /var/www/forexsignale/staging && wp eval '
-        global \\$wpdb;
-        \\$table = \\$wpdb->prefix . \\"project_todos\\";
-        \\$result = \\$wpdb->update(
-            \\$table,
-            [
-                \\"claude_html_output\\" => \\"{html_escaped}\\",
-                \\"claude_text_output\\" => \\"{text_escaped}\\",
-                \\"claude_summary\\" => \\"{summary_escaped}\\"
-            ],
-            [\\"id\\" => {todo_id}]
-        );
-        if (\\$result !== false) {{
-            echo \\"success\\";
-        }} else {{
-            echo \\"error: \\" . \\$wpdb->last_error;
-        }}
-    '"'''
-    
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
+    # Parameterised query - outputs are passed through without escaping
+    affected = db_query.execute(CONFIG, f"""UPDATE {CONFIG['database']['table_prefix']}project_todos
+SET claude_html_output=%s,
+    claude_text_output=%s,
+    claude_summary=%s,
+    updated_at=NOW()
+WHERE id=%s""", (html_output, text_output, summary, int(todo_id)))
+    invalidate_todo(CONFIG, todo_id)
     
-    if "success" in result.stdout:
+    if affected is not None:
         print(f"✅ Summaries saved for Todo #{todo_id}")
         return True
     else:
-        print(f"❌ Error saving summaries: {result.stdout} {result.stderr}")
+        print(f"❌ Error saving summaries for Todo #{todo_id}")
         return False
 
 def create_version_entry(todo_id):
@@ -0,0 +1,59 @@
+"""
+Gemeinsame Fixtures für die Python-Unit-Tests
+hooks/ wird wie bei den Hook-Skripten selbst über sys.path importiert,
+monitoring/queue-manager.py (Bindestrich im Namen) per importlib
+"""
+
+import importlib.util
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "hooks"))
+
+
+def _load_queue_manager():
+    spec = importlib.util.spec_from_file_location("queue_manager", ROOT / "monitoring" / "queue-manager.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="session")
+def queue_module():
+    return _load_queue_manager()
+
+
+@pytest.fixture
+def manager(queue_module, tmp_path, monkeypatch):
+    """Queue-Manager auf temporärer DB, ohne Rate-Limit, Signal-Handler und Log-Datei"""
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"queue": {
+        "db_path": str(tmp_path / "queue.db"),
+        "batch_size": 3,
+        "rate_limit_per_second": 0,
+        "coalesce_window_seconds": 2.0,
+    }}))
+    monkeypatch.setattr(queue_module.signal, "signal", lambda *args: None)
+    monkeypatch.setattr(queue_module.WebhookQueueManager, "log", lambda self, message, level="INFO": None)
+    manager = queue_module.WebhookQueueManager(str(config))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def tmux(queue_module, monkeypatch):
+    """Zeichnet tmux-Aufrufe auf statt sie auszuführen"""
+    calls = []
+
+    def fake_run(command, **kwargs):
+        calls.append(command)
+        return subprocess.CompletedProcess(command, 0, "", "")
+
+    monkeypatch.setattr(queue_module.subprocess, "run", fake_run)
+    monkeypatch.setattr(queue_module.time, "sleep", lambda seconds: None)
+    return calls
@@ -0,0 +1,120 @@
+"""archive_store: content-adressierte Blobs, Dedup und Restore"""
+
+import builtins
+import io
+
+import pytest
+
+import archive_store
+
+
+@pytest.fixture
+def store(tmp_path):
+    return archive_store.ArchiveStore({"paths": {"archive": str(tmp_path / "archive")}})
+
+
+def test_put_file_stores_once_and_deduplicates(store, tmp_path):
+    source = tmp_path / "output.md"
+    source.write_bytes(b"x" * (archive_store.CHUNK_SIZE + 17))
+
+    digest, size, stored = store.put_file(source)
+    assert (size, stored) == (archive_store.CHUNK_SIZE + 17, True)
+    assert store.put_file(source) == (digest, size, False)
+
+    out = io.BytesIO()
+    store.read_blob(digest, out)
+    assert out.getvalue() == source.read_bytes()
+    assert store.get_stats()["blobs"] == 1
+    assert not list(store.blob_dir.glob(".tmp-*"))
+
+
+def test_put_file_reads_source_once(store, tmp_path, monkeypatch):
+    source = tmp_path / "terminal.log"
+    source.write_bytes(b"line\n" * 1000)
+    opened = []
+    real_open = builtins.open
+
+    def counting_open(file, *args, **kwargs):
+        if str(file) == str(source):
+            opened.append(file)
+        return real_open(file, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "open", counting_open)
+    store.put_file(source)
+    assert len(opened) == 1
+
+
+def test_archive_session_and_restore(store, tmp_path):
+    session_dir = tmp_path / "session"
+    session_dir.mkdir()
+    (session_dir / "a.txt").write_text("alpha")
+    (session_dir / "b.txt").write_text("alpha")
+
+    _entry, stats = store.archive_session(1, session_dir)
+    assert (stats["new_blobs"], stats["deduplicated"]) == (1, 1)
+    assert store.archive_session(1, session_dir)[1]["manifest"] == "unchanged"
+
+    restored = tmp_path / "restored"
+    store.restore(1, restored)
+    assert (restored / "b.txt").read_text() == "alpha"
+
+
+@pytest.fixture
+def zero_copy_store(tmp_path):
+    return archive_store.ArchiveStore({
+        "paths": {"archive": str(tmp_path / "archive")},
+        "archive": {"store_zero_copy": True},
+    })
+
+
+@pytest.mark.parametrize("mode, expected", [("copy", "copy"), ("link", "copy"), ("move", "move")])
+def test_zero_copy_store_goes_through_session_archive(zero_copy_store, tmp_path, monkeypatch, mode, expected):
+    source = tmp_path / "output.md"
+    source.write_bytes(b"y" * 4096)
+    calls = []
+    real_archive_file = archive_store.archive_file
+
+    def recording_archive_file(src, dst, archive_mode="copy"):
+        calls.append(archive_mode)
+        return real_archive_file(src, dst, archive_mode)
+
+    monkeypatch.setattr(archive_store, "archive_file", recording_archive_file)
+    digest, size, stored = zero_copy_store.put_file(source, mode)
+
+    assert (size, stored, calls) == (4096, True, [expected])
+    assert source.exists() == (mode != "move")
+    assert zero_copy_store._find_blob(digest).name.endswith(archive_store.RAW_SUFFIX)
+    out = io.BytesIO()
+    zero_copy_store.read_blob(digest, out)
+    assert out.getvalue() == b"y" * 4096
+
+
+def test_zero_copy_store_deduplicates_against_compressed_blobs(store, tmp_path):
+    source = tmp_path / "output.md"
+    source.write_text("alpha")
+    digest, _size, _stored = store.put_file(source)
+
+    store.zero_copy = True
+    assert store.put_file(source, "move") == (digest, 5, False)
+    assert not source.exists()
+    assert store.get_stats()["blobs"] == 1
+    assert not list(store.blob_dir.glob("*/.tmp-*")) and not list(store.blob_dir.glob(".tmp-*"))
+
+
+def test_zero_copy_move_keeps_source_when_storing_fails(zero_copy_store, tmp_path, monkeypatch):
+    source = tmp_path / "output.md"
+    source.write_text("alpha")
+    monkeypatch.setattr(archive_store.os, "replace", _refuse_blob_replace(archive_store.os.replace))
+
+    with pytest.raises(OSError):
+        zero_copy_store.put_file(source, "move")
+    assert source.read_text() == "alpha"
+
+
+def _refuse_blob_replace(real_replace):
+    """os.replace, das nur den Weg in den Blob-Pfad verweigert"""
+    def replace(src, dst):
+        if "blobs" in str(dst):
+            raise OSError("disk full")
+        return real_replace(src, dst)
+    return replace
@@ -0,0 +1,106 @@
+"""change_feed: Delta-Poll und periodischer Abgleich des Snapshots"""
+
+import pytest
+
+import change_feed
+import todo_cache
+from todo_record import TodoRecord
+
+
+def _row(todo_id, status, updated_at, title="Todo"):
+    return TodoRecord.from_mapping({
+        "id": todo_id, "title": title, "status": status, "bearbeiten": 1, "updated_at": updated_at,
+    })
+
+
+class FakeTable:
+    """project_todos im Speicher: Delta-Seiten und Full-Scan"""
+
+    def __init__(self, rows):
+        self.rows = {row["id"]: row for row in rows}
+
+    def fetch_page(self, updated_at, todo_id):
+        return sorted(
+            (row for row in self.rows.values()
+             if (row["updated_at"], int(row["id"])) > (updated_at, int(todo_id))),
+            key=lambda row: (row["updated_at"], int(row["id"])),
+        )
+
+    def fetch_snapshot(self):
+        return list(self.rows.values())
+
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    table = FakeTable([
+        _row(1, "in_progress", "2026-10-18 10:00:00"),
+        _row(2, "in_progress", "2026-10-18 10:00:01"),
+        _row(3, "offen", "2026-10-18 10:00:02"),
+    ])
+    cache = todo_cache.TodoCache({"paths": {"cache": str(tmp_path / "cache.db")}})
+    monkeypatch.setattr(change_feed, "get_todo_cache", lambda config: cache)
+    monkeypatch.setattr(change_feed.ChangeFeed, "_fetch_page", lambda self, ts, todo_id: table.fetch_page(ts, todo_id))
+    monkeypatch.setattr(change_feed.ChangeFeed, "_fetch_snapshot", lambda self: table.fetch_snapshot())
+    return table
+
+
+@pytest.fixture
+def feed(tmp_path, table):
+    return change_feed.ChangeFeed({
+        "database": {"table_prefix": "stage_"},
+        "paths": {"change_feed": str(tmp_path / "feed.json")},
+        "change_feed": {"reconcile_seconds": 600},
+    })
+
+
+def _ids(rows):
+    return sorted(row["id"] for row in rows)
+
+
+def test_poll_returns_only_changes(feed, table):
+    assert _ids(feed.poll()) == ["1", "2", "3"]
+    assert feed.poll() == []
+
+    table.rows["3"] = _row(3, "in_progress", "2026-10-18 10:05:00")
+    assert _ids(feed.poll()) == ["3"]
+    assert _ids(feed.rows(status="in_progress")) == ["1", "2", "3"]
+
+
+def test_reconcile_drops_deleted_and_out_of_band_rows(feed, table):
+    feed.poll()
+    del table.rows["1"]
+    # Status-Wechsel ohne neues updated_at - für das Delta unsichtbar
+    table.rows["2"] = _row(2, "completed", "2026-10-18 10:00:01")
+
+    feed.poll()
+    assert _ids(feed.rows(status="in_progress")) == ["1", "2"]  # noch nicht abgeglichen
+
+    assert feed.reconcile() == 2
+    assert feed.rows(status="in_progress") == []
+    assert _ids(feed.rows()) == ["2", "3"]
+
+
+def test_poll_reconciles_after_interval(feed, table, monkeypatch):
+    feed.poll()
+    del table.rows["1"]
+
+    monkeypatch.setattr(change_feed.time, "time", lambda: feed.reconciled_at + 601)
+    feed.poll()
+    assert _ids(feed.rows(status="in_progress")) == ["2"]
+
+
+def test_state_survives_restart(feed, table, tmp_path):
+    feed.poll()
+    restarted = change_feed.ChangeFeed(feed.config)
+    assert restarted.watermark == feed.watermark
+    assert restarted.reconciled_at == feed.reconciled_at
+    assert restarted.poll() == []
+
+
+def test_second_write_in_same_second_is_detected(feed, table):
+    feed.poll()
+    # Zweiter Write auf #3 in der Watermark-Sekunde: gleiches updated_at, neuer Status
+    table.rows["3"] = _row(3, "in_progress", "2026-10-18 10:00:02")
+    assert _ids(feed.poll()) == ["3"]
+    assert _ids(feed.rows(status="in_progress")) == ["1", "2", "3"]
+    assert feed.poll() == []
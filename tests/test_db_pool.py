@@ -0,0 +1,138 @@
+"""db_pool: Opt-in, Singleton unter Last, Cursor-Fallback und execute_ack"""
+
+import threading
+import time
+
+import pytest
+
+import db_pool
+
+CONFIG = {"database": {"table_prefix": "stage_", "db_name": "db"}, "db_pool": {"enabled": True}}
+
+
+@pytest.fixture(autouse=True)
+def reset_pool(monkeypatch):
+    monkeypatch.setattr(db_pool, "_db_pool", None)
+    monkeypatch.setattr(db_pool, "_db_pool_failed", False)
+
+
+@pytest.fixture
+def fake_connector(monkeypatch):
+    created = []
+
+    def fake_get_pool(self):
+        time.sleep(0.01)  # Tunnel-Aufbau: genug Zeit für konkurrierende Threads
+        created.append(self)
+
+    monkeypatch.setattr(db_pool, "mysql", object())
+    monkeypatch.setattr(db_pool.DBPool, "_get_pool", fake_get_pool)
+    return created
+
+
+def test_pool_requires_opt_in(fake_connector):
+    assert db_pool.get_pool({"db_pool": {}}) is None
+    assert db_pool.get_pool({"db_pool": {"enabled": False}}) is None
+    assert fake_connector == []
+
+
+def test_concurrent_get_pool_creates_one_pool(fake_connector):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(db_pool.get_pool(CONFIG))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(fake_connector) == 1
+    assert all(result is fake_connector[0] for result in results)
+
+
+def test_missing_connector_falls_back(monkeypatch):
+    monkeypatch.setattr(db_pool, "mysql", None)
+    assert db_pool.get_pool(CONFIG) is None
+    assert db_pool._db_pool_failed
+
+
+class OldConnection:
+    """Connector ohne prepared+dictionary Kombination"""
+
+    def __init__(self):
+        self.calls = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        self.calls.append((prepared, dictionary))
+        if prepared and dictionary:
+            raise ValueError("Cursor not available with given criteria: dictionary, prepared")
+        return (prepared, dictionary)
+
+
+def test_cursor_falls_back_to_plain_dictionary_cursor():
+    pool = db_pool.DBPool(CONFIG)
+    conn = OldConnection()
+    assert pool.cursor(conn, dictionary=True) == (False, True)
+    # Danach direkt ohne erneuten Fehlversuch
+    assert pool.cursor(conn, dictionary=True) == (False, True)
+    assert conn.calls == [(True, True), (False, True), (False, True)]
+
+
+class AckCursor:
+    def __init__(self, rowcount, row):
+        self.rowcount, self.row = rowcount, row
+        self.executed = []
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self.executed.append((query, params))
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        self.closed = True
+
+
+class AckConnection:
+    def __init__(self, cursor):
+        self.ack_cursor = cursor
+        self.closed = False
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        pass
+
+    def cursor(self, prepared=False, dictionary=False):
+        assert dictionary
+        return self.ack_cursor
+
+    def close(self):
+        self.closed = True
+
+
+def _pool_with_connection(conn):
+    pool = db_pool.DBPool(CONFIG)
+    pool._pool = type("MySQLPool", (), {"get_connection": lambda self: conn})()
+    return pool
+
+
+def test_execute_ack_runs_update_and_ack_on_one_connection():
+    cursor = AckCursor(1, {"status": "completed", "updated_at": "2026-10-18 10:00:00"})
+    conn = AckConnection(cursor)
+    pool = _pool_with_connection(conn)
+
+    ack = pool.execute_ack("UPDATE t SET status=%s WHERE id=%s", ("completed", 7), "SELECT status, updated_at FROM t WHERE id=%s", (7,))
+    assert ack == {"status": "completed", "updated_at": "2026-10-18 10:00:00", "affected": 1}
+    assert cursor.executed == [
+        ("UPDATE t SET status=%s WHERE id=%s", ("completed", 7)),
+        ("SELECT status, updated_at FROM t WHERE id=%s", (7,)),
+    ]
+    assert cursor.closed and conn.closed
+
+
+@pytest.mark.parametrize("row, expected", [
+    ({"status": "completed"}, {"status": "completed", "affected": 0}),  # Zeile unverändert
+    (None, {"affected": 0}),                                            # Zeile existiert nicht
+])
+def test_execute_ack_zero_rows(row, expected):
+    cursor = AckCursor(0, row)
+    conn = AckConnection(cursor)
+    assert _pool_with_connection(conn).execute_ack("UPDATE t SET a=1", (), "SELECT status FROM t", ()) == expected
+    assert cursor.closed and conn.closed
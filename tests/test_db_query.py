@@ -0,0 +1,172 @@
+"""db_query: Literal-Escaping, Rendering, Parsing des wp-cli Outputs und execute_ack"""
+
+import base64
+import struct
+import zlib
+
+import pytest
+
+import db_query
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("plain", "plain"),
+    ("O'Reilly", "O\\'Reilly"),
+    ("back\\slash", "back\\\\slash"),
+    ("\\'", "\\\\\\'"),
+    ("nul\0", "nul\\0"),
+    ("ctrl\x1az", "ctrl\\Zz"),
+    ("Umlaute äöü\n", "Umlaute äöü\n"),
+])
+def test_escape(value, expected):
+    assert db_query._escape(value) == expected
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, "NULL"),
+    (True, "1"),
+    (False, "0"),
+    (42, "42"),
+    (1.5, "1.5"),
+    ("x'y", "_utf8mb4'x\\'y'"),
+    (b"\x00\xff", "FROM_BASE64('AP8=')"),
+])
+def test_literal(value, expected):
+    assert db_query.literal(value) == expected
+
+
+def test_render_substitutes_in_order():
+    sql = db_query.render("UPDATE t SET a=%s, b=%s WHERE id=%s", ("it's", None, 7))
+    assert sql == "UPDATE t SET a=_utf8mb4'it\\'s', b=NULL WHERE id=7"
+
+
+def test_render_rejects_missing_parameters():
+    with pytest.raises(ValueError):
+        db_query.render("SELECT %s, %s", (1,))
+
+
+def test_render_compresses_large_strings():
+    text = "ä" * 5000
+    sql = db_query.render("SET x=%s", (text,), compress_threshold=1000)
+    encoded = sql.split("FROM_BASE64('")[1].split("'")[0]
+    payload = base64.b64decode(encoded)
+    length, = struct.unpack("<I", payload[:4])
+    assert zlib.decompress(payload[4:]).decode("utf-8") == text
+    assert length == len(text.encode("utf-8"))
+    assert sql.startswith("SET x=CONVERT(UNCOMPRESS(") and sql.endswith("USING utf8mb4)")
+
+
+def test_parse_rows_handles_null_and_escapes():
+    output = (
+        "id\tnotes\n"
+        "1\tline\\nbreak\n"
+        "2\tNULL\n"
+        "3\ttab\\there\n"
+    )
+    assert db_query.parse_rows(output) == [
+        {"id": "1", "notes": "line\nbreak"},
+        {"id": "2", "notes": None},
+        {"id": "3", "notes": "tab\there"},
+    ]
+
+
+def test_parse_rows_repeated_identical_header_is_skipped():
+    output = "todo_id\taffected\n1\t1\ntodo_id\taffected\n2\t0\n"
+    assert db_query.parse_rows(output) == [
+        {"todo_id": "1", "affected": "1"},
+        {"todo_id": "2", "affected": "0"},
+    ]
+
+
+def test_parse_rows_empty_output():
+    assert db_query.parse_rows("") == []
+
+
+CONFIG = {"database": {"table_prefix": "stage_"}}
+UPDATE = "UPDATE stage_project_todos SET status='completed', claude_summary=%s WHERE id=%s"
+ACK = "SELECT status, updated_at FROM stage_project_todos WHERE id=%s"
+
+
+@pytest.fixture
+def wp_cli(monkeypatch):
+    """execute_ack über wp-cli: zeichnet Skripte auf, antwortet mit output/code"""
+    scripts = []
+    response = {"output": "", "code": 0}
+
+    def fake_run_script(config, script, timeout=60):
+        scripts.append(script)
+        return response["output"], response["code"], "ERROR 2013" if response["code"] else ""
+
+    monkeypatch.setattr(db_query, "get_pool", lambda config: None)
+    monkeypatch.setattr(db_query, "run_script", fake_run_script)
+    return scripts, response
+
+
+def test_execute_ack_reads_affected_rows_and_ack_in_one_script(wp_cli):
+    scripts, response = wp_cli
+    response["output"] = "affected\tstatus\tupdated_at\n1\tcompleted\t2026-10-18 10:00:00\n"
+
+    ack = db_query.execute_ack(CONFIG, UPDATE, ("fertig", 7), ACK, (7,))
+    assert ack == {"affected": 1, "status": "completed", "updated_at": "2026-10-18 10:00:00"}
+    assert scripts == [
+        "UPDATE stage_project_todos SET status='completed', claude_summary=_utf8mb4'fertig' WHERE id=7;\n"
+        "SET @affected = ROW_COUNT();\n"
+        "SELECT @affected AS affected, status, updated_at FROM stage_project_todos WHERE id=7;"
+    ]
+
+
+@pytest.mark.parametrize("output, expected", [
+    # Zeile existiert, UPDATE ändert nichts (Status war schon gesetzt)
+    ("affected\tstatus\tupdated_at\n0\tcompleted\t2026-10-18 10:00:00\n",
+     {"affected": 0, "status": "completed", "updated_at": "2026-10-18 10:00:00"}),
+    # Zeile existiert nicht: Bestätigungs-SELECT liefert keine Zeile
+    ("", {"affected": 0}),
+])
+def test_execute_ack_zero_rows(wp_cli, output, expected):
+    _scripts, response = wp_cli
+    response["output"] = output
+    assert db_query.execute_ack(CONFIG, UPDATE, ("x", 7), ACK, (7,)) == expected
+
+
+def test_execute_ack_failed_script_returns_none(wp_cli):
+    _scripts, response = wp_cli
+    response["code"] = 1
+    assert db_query.execute_ack(CONFIG, UPDATE, ("x", 7), ACK, (7,)) is None
+
+
+def test_execute_ack_requires_select(wp_cli):
+    with pytest.raises(ValueError):
+        db_query.execute_ack(CONFIG, UPDATE, ("x", 7), "DELETE FROM stage_project_todos WHERE id=%s", (7,))
+    assert wp_cli[0] == []
+
+
+class AckPool:
+    def __init__(self, row=None, error=None):
+        self.row, self.error, self.calls = row, error, []
+
+    def execute_ack(self, sql, params, ack_sql, ack_params):
+        self.calls.append((sql, params, ack_sql, ack_params))
+        if self.error:
+            raise self.error
+        return self.row
+
+
+def test_execute_ack_pool_values_become_strings(wp_cli, monkeypatch):
+    pool = AckPool({"status": bytearray(b"completed"), "updated_at": "2026-10-18 10:00:00", "note": None, "affected": 1})
+    monkeypatch.setattr(db_query, "get_pool", lambda config: pool)
+
+    ack = db_query.execute_ack(CONFIG, UPDATE, ("x", 7), ACK, (7,))
+    assert ack == {"status": "completed", "updated_at": "2026-10-18 10:00:00", "note": None, "affected": 1}
+    assert pool.calls == [(UPDATE, ("x", 7), ACK, (7,))]
+    assert wp_cli[0] == []
+
+
+def test_execute_ack_falls_back_to_wp_cli_when_pool_fails(wp_cli, monkeypatch):
+    scripts, response = wp_cli
+    response["output"] = "affected\tstatus\tupdated_at\n1\tcompleted\t2026-10-18 10:00:00\n"
+    disabled = []
+    monkeypatch.setattr(db_query, "get_pool", lambda config: AckPool(error=ConnectionError("gone")))
+    monkeypatch.setattr(db_query, "disable_pool", lambda: disabled.append(True))
+
+    assert db_query.execute_ack(CONFIG, UPDATE, ("x", 7), ACK, (7,))["affected"] == 1
+    assert disabled == [True] and len(scripts) == 1
@@ -0,0 +1,114 @@
+"""event_extractor: Erkenner, Zeilen-/ANSI-Grenzfälle und Parität zur früheren Zeilen-Schleife"""
+
+import pytest
+
+import event_extractor
+from output_collector import ANSI_RE
+
+
+@pytest.fixture
+def extractor():
+    return event_extractor.EventExtractor()
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("  ⎿  File created successfully at: /tmp/example.py", ("file_created", "/tmp/example.py")),
+    ("File created successfully at: /tmp/a b.py  ", ("file_created", "/tmp/a b.py")),
+    ("  ⎿  The file /tmp/other.py has been updated. Here's the result:", ("file_updated", "/tmp/other.py")),
+    ("12 passed, 1 skipped in 0.42s", ("test_result", "12 passed, 1 skipped")),
+    ("==== 3 failed, 10 passed, 2 warnings in 1.2s ====", ("test_result", "3 failed, 10 passed, 2 warnings")),
+    ("Traceback (most recent call last):", ("error", "Traceback (most recent call last):")),
+    ("ValueError: invalid literal for int()", ("error", "ValueError: invalid literal for int()")),
+    ("  raise Exception: boom", ("error", "Exception: boom")),
+    ("❌ Deploy failed", ("error", "❌ Deploy failed")),
+    ("$ pytest -q", ("command", "pytest -q")),
+    ("# apt-get update", ("command", "apt-get update")),
+    ("$", ("command", "")),
+    ("plain output line", None),
+    ("all tests passed", None),
+    ("echo $HOME", None),
+    ("ErrorCode 5 without colon", None),
+])
+def test_classify_recognisers(extractor, line, expected):
+    assert extractor.classify(line) == expected
+
+
+@pytest.mark.parametrize("line, kind", [
+    # Reihenfolge = Priorität: der erste passende Erkenner gewinnt
+    ("$ echo File created successfully at: /tmp/x", "file_created"),
+    ("ValueError: the file /tmp/x has been updated", "file_updated"),
+    ("❌ 2 failed", "test_result"),
+])
+def test_first_recogniser_wins(extractor, line, kind):
+    assert extractor.classify(line)[0] == kind
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", []),
+    ("\n\n", []),
+    # Erste Zeile ohne vorangehendes '\n'
+    ("$ ls", [("command", "ls")]),
+    ("# whoami\n", [("command", "whoami")]),
+    # Letzte Zeile ohne abschließendes '\n'
+    ("output\n$ make", [("command", "make")]),
+    # Direkt aufeinander folgende Befehlszeilen bleiben beide auffindbar
+    ("$ a\n$ b\n# c", [("command", "a"), ("command", "b"), ("command", "c")]),
+    # Leerzeilen zwischen Events
+    ("$ a\n\n\nValueError: x\n", [("command", "a"), ("error", "ValueError: x")]),
+    # Mehrere Trigger in einer Zeile: höchstens ein Event
+    ("ValueError: 3 passed ❌\n", [("test_result", "3 passed")]),
+    # '$' mitten in der Zeile ist kein Befehl
+    ("echo $PATH\ncost: 5 $\n", []),
+    # CRLF: '\r' bleibt an der Zeile, der Wert wird gestrippt
+    ("$ ls\r\nFile created successfully at: /tmp/x\r\n", [("command", "ls"), ("file_created", "/tmp/x")]),
+])
+def test_extract_line_boundaries(extractor, text, expected):
+    assert list(extractor.extract(text)) == expected
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("\x1b[32m$\x1b[0m pytest -q\n", [("command", "pytest -q")]),
+    ("\x1b[1mFile created successfully at: \x1b[4m/tmp/x.py\x1b[0m\n", [("file_created", "/tmp/x.py")]),
+    ("\x1b]0;title\x07$ make\r\n", [("command", "make")]),
+    ("\x1b[31m\x1b[1mKeyError\x1b[0m: 'id'\n", [("error", "KeyError: 'id'")]),
+    # '\r' wird entfernt, nicht zu '\n' - die überschriebene Zeile beginnt nicht mit '$'
+    ("spinner\r\x1b[2K$ done\n", []),
+])
+def test_extract_after_ansi_stripping(extractor, raw, expected):
+    # output_collector entfernt ANSI-Sequenzen, bevor der Extractor den Text sieht
+    assert list(extractor.extract(ANSI_RE.sub('', raw))) == expected
+
+
+SESSION = "\n".join([
+    "● Write(/tmp/example.py)",
+    "  ⎿  File created successfully at: /tmp/example.py",
+    "  ⎿  The file /tmp/other.py has been updated. Here's the result:",
+    "$ pytest -q",
+    "# ls -la",
+    "      plain output that matches nothing",
+    "$ echo File created successfully at: /tmp/echo.txt",
+    "   12 |     result = compute(items)",
+])
+
+
+@pytest.mark.parametrize("text", [SESSION, SESSION + "\n", "\n" + SESSION, SESSION.replace("\n", "\n\n")])
+def test_parity_with_legacy_extractor(extractor, text):
+    assert list(extractor.extract(text)) == event_extractor._legacy_extract(text)
+
+
+def test_new_kinds_are_not_produced_by_legacy_extractor(extractor):
+    # Gewollte Abweichung: test_result und error kannte die alte Schleife nicht
+    text = SESSION + "\n12 passed, 1 skipped in 0.42s\nValueError: bad\n"
+    events = list(extractor.extract(text))
+    assert events[-2:] == [("test_result", "12 passed, 1 skipped"), ("error", "ValueError: bad")]
+    assert events[:-2] == event_extractor._legacy_extract(text)
+
+
+def test_register_inserts_before_existing_kind(extractor):
+    extractor.register('todo_done', ('TODO-DONE',), r'.*?TODO-DONE (?P<value>\d+)', before='command')
+    assert [r.kind for r in extractor.recognisers][-2:] == ['todo_done', 'command']
+    assert list(extractor.extract("$ x\nTODO-DONE 42\n")) == [("command", "x"), ("todo_done", "42")]
+
+
+def test_get_extractor_is_shared():
+    assert event_extractor.get_extractor() is event_extractor.get_extractor()
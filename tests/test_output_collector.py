@@ -0,0 +1,85 @@
+"""output_collector: Pane-Bindung und capture-pane Fallback ohne Stream"""
+
+import subprocess
+
+import pytest
+
+import output_collector
+
+
+class FakeTmux:
+    """Simuliert tmux: pipe-pane schlägt fehl (kein Stream), History wächst"""
+
+    def __init__(self):
+        self.history_size = 100
+        self.cursor_y = 5
+        self.pane_text = "File created successfully at: src/new.py\n"
+        self.calls = []
+
+    def __call__(self, command, **kwargs):
+        self.calls.append(command)
+        if command[1] == "display-message":
+            return subprocess.CompletedProcess(command, 0, f"{self.history_size} {self.cursor_y}\n", "")
+        if command[1] == "capture-pane":
+            return subprocess.CompletedProcess(command, 0, self.pane_text, "")
+        return subprocess.CompletedProcess(command, 1, "", "no server")
+
+    def captures(self):
+        return [c for c in self.calls if c[1] == "capture-pane"]
+
+
+@pytest.fixture
+def tmux(tmp_path, monkeypatch):
+    fake = FakeTmux()
+    monkeypatch.setattr(output_collector.subprocess, "run", fake)
+    monkeypatch.setattr(output_collector, "_session_dir", lambda todo_id: tmp_path / f"session_{todo_id}")
+    return fake
+
+
+def test_stream_binds_todo_to_given_pane(tmux):
+    assert output_collector.start_terminal_stream(42, "slot-b:0.1") is False
+    assert output_collector.session_tmux_target(42) == "slot-b:0.1"
+    assert all("slot-b:0.1" in call for call in tmux.calls)
+
+
+def test_capture_starts_at_line_recorded_on_load(tmux):
+    output_collector.start_terminal_stream(42, "slot-b:0.1")
+    tmux.history_size = 130  # 30 Zeilen seit dem Laden in die History gescrollt
+
+    collector = output_collector.OutputCollector(42)
+    assert collector.collect_from_terminal() == tmux.pane_text
+    capture = tmux.captures()[-1]
+    assert capture[3] == "slot-b:0.1"
+    assert capture[-2:] == ["-S", "-25"]  # Zeile 105 absolut = 130 Zeilen History - 25
+
+    # Zweiter Aufruf beginnt dort, wo der erste aufgehört hat
+    collector.collect_from_terminal()
+    assert tmux.captures()[-1][-2:] == ["-S", "5"]
+
+
+def test_capture_without_recorded_line_reads_visible_screen(tmux):
+    collector = output_collector.OutputCollector(7)
+    collector.collect_from_terminal()
+    assert "-S" not in tmux.captures()[-1]
+    assert tmux.captures()[-1][3] == output_collector.TMUX_TARGET
+
+
+def test_trimmed_history_falls_back_to_start_of_history(tmux):
+    output_collector.start_terminal_stream(42, "p")
+    session_dir = output_collector._session_dir(42)
+    (session_dir / "terminal.pane").write_text('{"target": "p", "line": -500}')
+    output_collector.OutputCollector(42).collect_from_terminal()
+    assert tmux.captures()[-1][-2:] == ["-S", "-"]
+
+
+def test_collect_keeps_event_log_when_stream_never_started(tmux):
+    output_collector.start_terminal_stream(42, "p")
+    collector = output_collector.OutputCollector(42)
+    collector.track_command("npm test")
+    collector.close()
+
+    result = output_collector.collect_outputs_for_todo(42)
+    events = list(output_collector.OutputCollector(42).iter_events())
+    kinds = sorted(event["kind"] for event in events)
+    assert kinds == ["command", "file_created"]
+    assert "session_42" in result["session_dir"]
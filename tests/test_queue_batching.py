@@ -0,0 +1,28 @@
+"""WebhookQueueManager: Batch-Dequeue und ein tmux-Aufruf pro Batch"""
+
+
+def test_dequeue_batch_groups_by_category(manager):
+    for i in range(4):
+        manager.add_task(f"echo {i}", category="a")
+    manager.add_task("echo b", category="b")
+
+    batch = manager.dequeue_batch(timeout=0.1)
+    assert [task.category for task in batch] == ["a", "a", "a"]
+    assert len(batch) == manager.batch_size
+
+    rest = manager.dequeue_batch(timeout=0.1) + manager.dequeue_batch(timeout=0.1)
+    assert sorted(task.command for task in rest) == ["echo 3", "echo b"]
+    assert manager.dequeue_batch(timeout=0.01) == []
+
+
+def test_batch_is_sent_with_one_send_keys_call(manager, tmux):
+    for i in range(3):
+        manager.add_task(f"echo {i}")
+    batch = manager.dequeue_batch(timeout=0.1)
+    manager.process_batch(batch, "worker-1")
+
+    send_keys = [call for call in tmux if call[1] == "send-keys"]
+    assert len(send_keys) == 1
+    assert send_keys[0][-6:] == ["echo 0", "Enter", "echo 1", "Enter", "echo 2", "Enter"]
+    assert manager.stats.successful == 3
+    assert manager.stats.batches == 1
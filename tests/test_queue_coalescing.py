@@ -0,0 +1,76 @@
+"""WebhookQueueManager: Zusammenfassen doppelter Kommandos"""
+
+import threading
+
+import pytest
+
+
+def test_duplicate_pending_command_is_coalesced(manager):
+    first = manager.add_task("./todo status")
+    assert manager.add_task("./todo status") == first
+    assert manager.add_task("./todo status", category="other") != first
+    assert manager.priority_queue.qsize() == 2
+    assert manager.stats.deduplicated == 1
+
+
+def test_dispatched_command_can_be_queued_again(manager, tmux):
+    first = manager.add_task("./todo status")
+    manager.process_batch(manager.dequeue_batch(timeout=0.1), "worker-1")
+    assert manager.add_task("./todo status") not in (None, first)
+
+
+def test_coalescing_disabled_with_zero_window(manager):
+    manager.coalesce_window = 0
+    first = manager.add_task("./todo status")
+    assert manager.add_task("./todo status") != first
+    assert manager.priority_queue.qsize() == 2
+
+
+def test_identical_commands_in_one_batch_are_sent_once(manager, tmux):
+    manager.coalesce_window = 0
+    for _ in range(3):
+        manager.add_task("./todo status")
+    manager.process_batch(manager.dequeue_batch(timeout=0.1), "worker-1")
+
+    send_keys = [call for call in tmux if call[1] == "send-keys"]
+    assert send_keys[0].count("./todo status") == 1
+    assert manager.stats.coalesced == 2
+    assert manager.stats.successful == 3
+
+
+
+@pytest.mark.parametrize("persisted", [True, False])
+def test_duplicate_waits_for_original_to_be_persisted(manager, monkeypatch, persisted):
+    persisting, release = threading.Event(), threading.Event()
+    persist_task = manager.persist_task
+
+    def slow_persist(task, status, durable=False):
+        persisting.set()
+        release.wait(2)
+        return persisted and persist_task(task, status, durable=durable)
+
+    monkeypatch.setattr(manager, "persist_task", slow_persist)
+    result = {}
+    original = threading.Thread(target=lambda: result.setdefault("first", manager.add_task("./todo status")))
+    original.start()
+    assert persisting.wait(2)
+
+    duplicate = threading.Thread(target=lambda: result.setdefault("second", manager.add_task("./todo status")))
+    duplicate.start()
+    duplicate.join(0.1)
+    assert duplicate.is_alive()  # Id erst nach dem Commit des Originals
+
+    release.set()
+    original.join(2)
+    duplicate.join(2)
+    assert result["second"] == result["first"]
+    assert (result["first"] is not None) == persisted
+
+
+def test_unpersisted_task_is_not_coalesced(manager, monkeypatch):
+    monkeypatch.setattr(manager, "persist_task", lambda task, status, durable=False: False)
+    assert manager.add_task("./todo status") is None
+    assert manager.pending_commands == {}
+
+    monkeypatch.delattr(manager, "persist_task")
+    assert manager.add_task("./todo status") is not None
@@ -0,0 +1,79 @@
+"""QueueJournal / Durability-Modi der WebhookQueueManager-Persistenz"""
+
+import json
+import sqlite3
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def _count_tasks(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM queue_tasks").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _write_config(tmp_path, **queue):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"queue": {"db_path": str(tmp_path / "queue.db"), **queue}}))
+    return config
+
+
+def test_commit_waits_for_group_commit(queue_module, tmp_path):
+    store = queue_module.QueueStore(str(tmp_path / "j.db"))
+    store.executescript("CREATE TABLE t (v INTEGER)")
+    journal = queue_module.QueueJournal(store, interval_ms=50)
+    try:
+        assert journal.commit("INSERT INTO t VALUES (?)", (1,))
+        # Nach dem Ack muss die Zeile für eine zweite Verbindung sichtbar sein
+        assert sqlite3.connect(tmp_path / "j.db").execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1
+    finally:
+        journal.close()
+        store.close()
+
+
+def test_commit_reports_failed_batch(queue_module, tmp_path):
+    store = queue_module.QueueStore(str(tmp_path / "j.db"))
+    journal = queue_module.QueueJournal(store)
+    try:
+        assert journal.commit("INSERT INTO missing_table VALUES (?)", (1,)) is False
+        assert journal.stats["failed_batches"] == 1
+    finally:
+        journal.close()
+        store.close()
+
+
+def test_close_commits_submitted_writes(queue_module, tmp_path):
+    store = queue_module.QueueStore(str(tmp_path / "j.db"))
+    store.executescript("CREATE TABLE t (v INTEGER)")
+    journal = queue_module.QueueJournal(store, interval_ms=1000)
+    for value in range(20):
+        journal.submit("INSERT INTO t VALUES (?)", (value,))
+    journal.close()
+    store.close()
+    assert sqlite3.connect(tmp_path / "j.db").execute("SELECT COUNT(*) FROM t").fetchone()[0] == 20
+
+
+def test_cli_add_task_is_persisted_in_batched_mode(tmp_path):
+    config = _write_config(tmp_path, durability="batched")
+    result = subprocess.run(
+        [sys.executable, str(ROOT / "monitoring" / "queue-manager.py"),
+         "--config", str(config), "--add-task", "./todo status"],
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "Task added:" in result.stdout
+    assert _count_tasks(tmp_path / "queue.db") == 1
+
+
+def test_cli_add_task_is_persisted_in_sync_mode(tmp_path):
+    config = _write_config(tmp_path, durability="sync")
+    subprocess.run(
+        [sys.executable, str(ROOT / "monitoring" / "queue-manager.py"),
+         "--config", str(config), "--add-task", "./todo status"],
+        capture_output=True, text=True, timeout=60, check=True
+    )
+    assert _count_tasks(tmp_path / "queue.db") == 1
@@ -0,0 +1,52 @@
+"""QueueStore: eine geteilte WAL-Verbindung, Batch-Writes in einer Transaktion"""
+
+import sqlite3
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def store(queue_module, tmp_path):
+    store = queue_module.QueueStore(str(tmp_path / "queue.db"))
+    store.executescript("CREATE TABLE t (v INTEGER UNIQUE)")
+    yield store
+    store.close()
+
+
+def test_wal_mode_and_synchronous(queue_module, tmp_path):
+    store = queue_module.QueueStore(str(tmp_path / "q.db"), synchronous="full")
+    assert store.query("PRAGMA journal_mode")[0][0] == "wal"
+    assert store.query("PRAGMA synchronous")[0][0] == 2  # FULL
+    store.close()
+
+
+def test_invalid_synchronous_mode_is_rejected(queue_module, tmp_path):
+    with pytest.raises(ValueError):
+        queue_module.QueueStore(str(tmp_path / "q.db"), synchronous="SOMETIMES")
+
+
+def test_batch_rolls_back_as_a_whole(store):
+    store.execute("INSERT INTO t VALUES (?)", (1,))
+    with pytest.raises(sqlite3.IntegrityError):
+        store.execute_batch([("INSERT INTO t VALUES (?)", (2,)), ("INSERT INTO t VALUES (?)", (1,))])
+    assert store.query("SELECT v FROM t") == [(1,)]
+
+
+def test_connection_is_shared_across_threads(store):
+    def writer(offset):
+        for i in range(50):
+            store.execute("INSERT INTO t VALUES (?)", (offset + i,))
+
+    threads = [threading.Thread(target=writer, args=(n * 1000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.query("SELECT COUNT(*) FROM t") == [(200,)]
+
+
+def test_close_is_idempotent(store):
+    store.close()
+    store.close()
+    assert store.closed
@@ -0,0 +1,89 @@
+"""GCRA RateLimiter aus monitoring/queue-manager.py"""
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(queue_module, monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(queue_module.time, "monotonic", fake)
+    return fake
+
+
+def test_burst_then_steady_rate(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=10, burst=3)
+    assert [limiter.allow("a") for _ in range(4)] == [True, True, True, False]
+    clock.now += 0.1
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+
+
+def test_categories_are_independent(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=1, burst=1)
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+    assert limiter.allow("b")
+
+
+def test_sub_one_per_second_rate_still_admits(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=0.5)
+    assert limiter.limits("a") == (0.5, 1)
+    assert limiter.allow("a")
+    assert not limiter.allow("a")
+    clock.now += 1.9
+    assert not limiter.allow("a")
+    clock.now += 0.1
+    assert limiter.allow("a")
+
+
+def test_sub_one_per_second_override(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=10, overrides={"slow": {"per_second": 0.2}})
+    assert limiter.limits("slow") == (0.2, 1)
+    assert limiter.allow("slow")
+    assert not limiter.allow("slow")
+
+
+def test_default_burst_rounds_up(queue_module):
+    assert queue_module.RateLimiter(rate=2.5).limits("x") == (2.5, 3)
+
+
+@pytest.mark.parametrize("burst", [0, -1, 0.5])
+def test_burst_below_one_is_rejected(queue_module, burst):
+    with pytest.raises(ValueError):
+        queue_module.RateLimiter(rate=5, burst=burst)
+    with pytest.raises(ValueError):
+        queue_module.RateLimiter(rate=5, overrides={"a": {"per_second": 1, "burst": burst}})
+
+
+def test_zero_rate_is_unlimited(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=0)
+    assert all(limiter.allow("a") for _ in range(100))
+
+
+def test_status_reports_available_tokens(queue_module, clock):
+    limiter = queue_module.RateLimiter(rate=1, burst=3)
+    limiter.allow("a")
+    assert limiter.status()["a"]["available"] == 2
+    limiter.allow("a")
+    limiter.allow("a")
+    assert limiter.status()["a"]["available"] == 0
+    clock.now += 1
+    assert limiter.status()["a"]["available"] == 1
+
+
+def test_idle_categories_are_pruned(queue_module, clock, monkeypatch):
+    monkeypatch.setattr(queue_module.RateLimiter, "MAX_IDLE_CATEGORIES", 8)
+    limiter = queue_module.RateLimiter(rate=10, burst=1)
+    for i in range(8):
+        limiter.allow(f"c{i}")
+    clock.now += 1
+    limiter.allow("new")
+    assert list(limiter.arrivals) == ["new"]
@@ -0,0 +1,177 @@
+"""report_renderer: Ein-Durchlauf-Rendering gegen die früheren OutputCollector.generate_*-Methoden"""
+
+import html
+from datetime import datetime
+
+import pytest
+
+import report_renderer
+
+SESSION_START = datetime(2026, 10, 18, 10, 0, 0)
+NOW = datetime(2026, 10, 18, 10, 7, 30)
+
+EVENTS = [
+    {'kind': 'action', 'time': '10:00:01', 'action': 'Tests: 3 passed <ok>'},
+    {'kind': 'command', 'time': '10:00:02', 'command': 'pytest -q', 'success': True, 'output': '3 passed'},
+    {'kind': 'file_created', 'time': '10:00:03', 'path': '/tmp/a & b.py'},
+    {'kind': 'file_modified', 'time': '10:00:04', 'path': '/tmp/c.py'},
+    {'kind': 'error', 'time': '10:00:05', 'error': "KeyError: 'x' <in handler>"},
+    {'kind': 'unknown', 'time': '10:00:06'},
+] + [
+    {'kind': 'command', 'time': f'10:01:{n:02d}', 'command': f'ls dir_{n}', 'success': n % 3 != 0, 'output': ''}
+    for n in range(12)
+]
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+def _legacy_reports(events, todo_id, raw_text):
+    """Die generate_*-Methoden des OutputCollectors vor dem Ein-Durchlauf-Renderer (ohne Datei-Ausgabe)"""
+    outputs = {'files_created': [], 'files_modified': [], 'commands_executed': [],
+               'errors_encountered': [], 'key_actions': []}
+    keys = {'file_created': 'files_created', 'file_modified': 'files_modified', 'command': 'commands_executed',
+            'error': 'errors_encountered', 'action': 'key_actions'}
+    for event in events:
+        if event['kind'] in keys:
+            outputs[keys[event['kind']]].append(event)
+    start = SESSION_START.strftime("%Y-%m-%d %H:%M:%S")
+    duration = f"{(NOW - SESSION_START).total_seconds():.0f}"
+
+    md = f"""# 📋 Todo #{todo_id} - Session Report
+
+## 📊 Session Information
+- **Session Start:** {start}
+- **Session Duration:** {duration} Sekunden
+
+"""
+    if outputs['key_actions']:
+        md += "## 🎯 Hauptaktionen\n\n"
+        for action in outputs['key_actions']:
+            md += f"- `[{action['time']}]` {action['action']}\n"
+        md += "\n"
+    if outputs['files_created']:
+        md += f"## 📁 Erstellte Dateien ({len(outputs['files_created'])})\n\n"
+        for file in outputs['files_created']:
+            md += f"- `{file['path']}` [{file['time']}]\n"
+        md += "\n"
+    if outputs['files_modified']:
+        md += f"## ✏️ Geänderte Dateien ({len(outputs['files_modified'])})\n\n"
+        for file in outputs['files_modified']:
+            md += f"- `{file['path']}` [{file['time']}]\n"
+        md += "\n"
+    if outputs['commands_executed']:
+        md += f"## 💻 Ausgeführte Befehle ({len(outputs['commands_executed'])})\n\n"
+        md += "Die letzten 10 Befehle:\n\n"
+        for cmd in outputs['commands_executed'][-10:]:
+            md += f"{'✅' if cmd['success'] else '❌'} `{cmd['command']}` [{cmd['time']}]\n"
+            if cmd.get('output'):
+                md += f"   ```\n   {cmd['output'][:200]}\n   ```\n"
+        md += "\n"
+    if outputs['errors_encountered']:
+        md += f"## ⚠️ Aufgetretene Fehler ({len(outputs['errors_encountered'])})\n\n"
+        for error in outputs['errors_encountered']:
+            md += f"- `[{error['time']}]` {error['error']}\n"
+        md += "\n"
+    if raw_text:
+        md += "## 📝 Terminal Output (Auszug)\n\n```\n" + raw_text[-3000:] + "\n```\n"
+
+    ht = report_renderer.HTML_HEAD(todo_id=todo_id, start=start, duration=duration)
+    for key, title, item in (
+        ('key_actions', "🎯 Hauptaktionen", lambda e: f"""
+            <li><span class="timestamp">[{e['time']}]</span> {html.escape(e['action'])}</li>"""),
+        ('files_created', f"📁 Erstellte Dateien ({len(outputs['files_created'])})", lambda e: f"""
+            <li><span class="file">{html.escape(e['path'])}</span> <span class="timestamp">[{e['time']}]</span></li>"""),
+        ('files_modified', f"✏️ Geänderte Dateien ({len(outputs['files_modified'])})", lambda e: f"""
+            <li><span class="file">{html.escape(e['path'])}</span> <span class="timestamp">[{e['time']}]</span></li>"""),
+        ('commands_executed', None, None),
+        ('errors_encountered', f"⚠️ Aufgetretene Fehler ({len(outputs['errors_encountered'])})", lambda e: f"""
+            <li class="error"><span class="timestamp">[{e['time']}]</span> {html.escape(e['error'])}</li>"""),
+    ):
+        if not outputs[key]:
+            continue
+        if key == 'commands_executed':
+            ht += f"""
+    <h2>💻 Ausgeführte Befehle ({len(outputs['commands_executed'])})</h2>
+    <div class="section">"""
+            for cmd in outputs['commands_executed'][-10:]:
+                ht += f"""
+        <div class="command">
+            <span>{'✅' if cmd['success'] else '❌'}</span> <code>{html.escape(cmd['command'])}</code>
+            <span class="timestamp">[{cmd['time']}]</span>
+        </div>"""
+            ht += """
+    </div>"""
+            continue
+        ht += f"""
+    <h2>{title}</h2>
+    <div class="section">
+        <ul>"""
+        for entry in outputs[key]:
+            ht += item(entry)
+        ht += """
+        </ul>
+    </div>"""
+    ht += """
+</body>
+</html>"""
+
+    lines = [f"Todo #{todo_id} - Session Report", "=" * 50, f"Session Start: {start}",
+             f"Duration: {duration} Sekunden", ""]
+    if outputs['key_actions']:
+        lines.append("HAUPTAKTIONEN:")
+        lines.extend(f"  [{a['time']}] {a['action']}" for a in outputs['key_actions'])
+        lines.append("")
+    if outputs['files_created']:
+        lines.append(f"ERSTELLTE DATEIEN ({len(outputs['files_created'])}):")
+        lines.extend(f"  - {f['path']} [{f['time']}]" for f in outputs['files_created'])
+        lines.append("")
+    if outputs['files_modified']:
+        lines.append(f"GEÄNDERTE DATEIEN ({len(outputs['files_modified'])}):")
+        lines.extend(f"  - {f['path']} [{f['time']}]" for f in outputs['files_modified'])
+        lines.append("")
+    if outputs['commands_executed']:
+        lines.append(f"BEFEHLE ({len(outputs['commands_executed'])}):")
+        lines.extend(f"  {'✓' if c['success'] else '✗'} {c['command']} [{c['time']}]"
+                     for c in outputs['commands_executed'][-5:])
+        lines.append("")
+    if outputs['errors_encountered']:
+        lines.append(f"FEHLER ({len(outputs['errors_encountered'])}):")
+        lines.extend(f"  [{e['time']}] {e['error']}" for e in outputs['errors_encountered'])
+        lines.append("")
+
+    return {'markdown': md, 'html': ht, 'text': "\n".join(lines)}
+
+
+@pytest.fixture(autouse=True)
+def fixed_now(monkeypatch):
+    monkeypatch.setattr(report_renderer, "datetime", FixedDatetime)
+
+
+@pytest.mark.parametrize("events, raw_text", [
+    (EVENTS, "$ pytest -q\n3 passed\n"),
+    (EVENTS[:2], ""),
+    ([], ""),
+])
+def test_reports_match_legacy_renderer(events, raw_text):
+    reports = report_renderer.render_reports(iter(events), 42, SESSION_START, raw_text)
+    legacy = _legacy_reports(events, 42, raw_text)
+    for fmt in report_renderer.REPORT_FORMATS:
+        assert reports[fmt] == legacy[fmt], fmt
+
+
+def test_single_format_matches_full_render():
+    full = report_renderer.render_reports(iter(EVENTS), 42, SESSION_START)
+    for fmt in report_renderer.REPORT_FORMATS:
+        single = report_renderer.render_reports(iter(EVENTS), 42, SESSION_START, formats=(fmt,))
+        assert set(single) == {fmt, 'summary', 'counts'}
+        assert single[fmt] == full[fmt]
+
+
+def test_counts_and_summary():
+    reports = report_renderer.render_reports(iter(EVENTS), 42, SESSION_START)
+    assert reports['counts'] == {'action': 1, 'file_created': 1, 'file_modified': 1, 'command': 13, 'error': 1}
+    assert reports['summary'] == "✅ 1 Dateien erstellt, 1 geändert, 13 Befehle, 1 Fehler"
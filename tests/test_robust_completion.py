@@ -0,0 +1,64 @@
+"""robust_completion: Post-Write-Stages laufen parallel und isoliert"""
+
+import importlib
+import logging
+import sys
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def completion(tmp_path, monkeypatch):
+    # Modul loggt beim Import in das Log-Verzeichnis der Produktionsmaschine
+    monkeypatch.setattr(logging, "FileHandler", lambda *args, **kwargs: logging.NullHandler())
+    sys.modules.pop("robust_completion", None)
+    module = importlib.import_module("robust_completion")
+    config = {
+        "behavior": {"completion_workers": 3},
+        "paths": {"current_todo": str(tmp_path / "CURRENT_TODO_ID"), "task_completed": str(tmp_path / "TASK_COMPLETED")},
+    }
+    return module.RobustCompletion(config)
+
+
+def _stub_stages(monkeypatch, completion, stage):
+    for name in ("_archive_session_data", "_generate_documentation", "_verify_completion_status"):
+        monkeypatch.setattr(completion, name, lambda todo_id, name=name: stage(name, todo_id))
+
+
+def test_post_write_stages_run_concurrently(completion, monkeypatch):
+    barrier = threading.Barrier(3, timeout=5)
+    seen = []
+
+    def stage(name, todo_id):
+        barrier.wait()  # Sequenziell ausgeführt würde das in den Timeout laufen
+        seen.append((name, todo_id))
+
+    _stub_stages(monkeypatch, completion, stage)
+    completion._cleanup_and_verify(42, True)
+
+    assert sorted(seen) == [("_archive_session_data", 42), ("_generate_documentation", 42), ("_verify_completion_status", 42)]
+    assert {"cleanup", "archive", "documentation", "verify"} <= completion.stage_timings.keys()
+
+
+def test_failing_stage_does_not_stop_the_others(completion, monkeypatch):
+    seen = []
+
+    def stage(name, todo_id):
+        if name == "_archive_session_data":
+            raise OSError("disk full")
+        seen.append(name)
+
+    _stub_stages(monkeypatch, completion, stage)
+    completion._cleanup_and_verify(42, True)
+    assert sorted(seen) == ["_generate_documentation", "_verify_completion_status"]
+
+
+def test_failed_write_skips_post_write_stages(completion, monkeypatch, tmp_path):
+    (tmp_path / "CURRENT_TODO_ID").write_text("42")
+    seen = []
+    _stub_stages(monkeypatch, completion, lambda name, todo_id: seen.append(name))
+
+    completion._cleanup_and_verify(42, False)
+    assert seen == []
+    assert not (tmp_path / "CURRENT_TODO_ID").exists()
@@ -0,0 +1,34 @@
+"""session_archive: Default-Modus erzeugt einen unabhängigen Snapshot"""
+
+import session_archive
+
+
+def _session(tmp_path):
+    session_dir = tmp_path / "claude_session_1"
+    session_dir.mkdir()
+    (session_dir / "events.jsonl").write_text('{"kind":"command"}\n')
+    (session_dir / "output.md").write_text("# Report\n")
+    return session_dir
+
+
+def test_default_mode_is_copy():
+    assert session_archive.archive_options({})["mode"] == "copy"
+
+
+def test_default_archive_is_a_snapshot(tmp_path):
+    session_dir = _session(tmp_path)
+    stats = session_archive.archive_session(session_dir, tmp_path / "archive")
+    assert stats["files"] == 2
+    assert "hardlink" not in stats["methods"]
+
+    # Späteres Anhängen an die Session ändert das Archiv nicht
+    with open(session_dir / "events.jsonl", "a") as f:
+        f.write('{"kind":"error"}\n')
+    assert (tmp_path / "archive" / "events.jsonl").read_text() == '{"kind":"command"}\n'
+
+
+def test_move_mode_removes_source(tmp_path):
+    session_dir = _session(tmp_path)
+    session_archive.archive_session(session_dir, tmp_path / "archive", mode="move")
+    assert not any(session_dir.iterdir())
+    assert (tmp_path / "archive" / "output.md").read_text() == "# Report\n"
@@ -0,0 +1,57 @@
+"""session_slots: welche Session (global oder Slot) hält ein Todo"""
+
+import session_slots
+
+
+def _config(tmp_path):
+    return {"paths": {
+        "current_todo": str(tmp_path / "CURRENT_TODO_ID"),
+        "task_completed": str(tmp_path / "TASK_COMPLETED"),
+        "slots": str(tmp_path / "slots"),
+    }}
+
+
+def _claim(config, slot, todo_id):
+    paths = session_slots.slot_paths(config, slot)
+    session_slots.get_slot_dir(config, slot).mkdir(parents=True, exist_ok=True)
+    with open(paths["current_todo"], "w") as f:
+        f.write(f"{todo_id}\n")
+    return paths
+
+
+def test_slot_paths_keep_file_names(tmp_path):
+    config = _config(tmp_path)
+    paths = session_slots.slot_paths(config, "a")
+    assert paths == {
+        "current_todo": str(tmp_path / "slots" / "a" / "CURRENT_TODO_ID"),
+        "task_completed": str(tmp_path / "slots" / "a" / "TASK_COMPLETED"),
+    }
+
+
+def test_active_todo_ids_include_slots(tmp_path):
+    config = _config(tmp_path)
+    (tmp_path / "CURRENT_TODO_ID").write_text("7")
+    _claim(config, "a", 11)
+    _claim(config, "b", 12)
+    (tmp_path / "slots" / "idle").mkdir()
+
+    assert session_slots.active_todo_ids(config) == {"7", "11", "12"}
+    assert [slot for slot, _todo, _age in session_slots.list_slots(config)] == ["a", "b"]
+
+
+def test_find_todo_state_returns_slot_marker_paths(tmp_path):
+    config = _config(tmp_path)
+    (tmp_path / "CURRENT_TODO_ID").write_text("7")
+    paths = _claim(config, "a", 11)
+
+    assert session_slots.find_todo_state(config, 7)["current_todo"] == config["paths"]["current_todo"]
+    state = session_slots.find_todo_state(config, 11)
+    assert state["current_todo"] == paths["current_todo"]
+    assert state["task_completed"] == paths["task_completed"]
+    assert session_slots.find_todo_state(config, 99) is None
+
+
+def test_no_slots_directory(tmp_path):
+    config = _config(tmp_path)
+    assert session_slots.list_slots(config) == []
+    assert session_slots.active_todo_ids(config) == set()
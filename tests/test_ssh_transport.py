@@ -0,0 +1,81 @@
+"""ssh_transport: geteilter ControlMaster-Kanal, Reconnect nur bei Verbindungsfehlern"""
+
+import subprocess
+
+import pytest
+
+import ssh_transport
+
+CONFIG = {
+    "database": {"user": "deploy", "host": "db.example", "remote_path": "/srv/site"},
+    "transport": {"control_path": "/tmp/test-ssh-%C", "max_reconnects": 1, "health_check_interval": 60},
+}
+
+
+class FakeSSH:
+    def __init__(self, exit_codes):
+        self.exit_codes = list(exit_codes)
+        self.calls = []
+
+    def __call__(self, args, input=None, **kwargs):
+        self.calls.append((args, input))
+        if "-O" in args or args[-1] == "true":
+            return subprocess.CompletedProcess(args, 0, "", "")  # check/exit/Master-Start
+        return subprocess.CompletedProcess(args, self.exit_codes.pop(0), "out", "err")
+
+    def commands(self):
+        return [(args, input) for args, input in self.calls if "-O" not in args and args[-1] != "true"]
+
+
+@pytest.fixture
+def fake_ssh(monkeypatch):
+    def install(*exit_codes):
+        fake = FakeSSH(exit_codes)
+        monkeypatch.setattr(ssh_transport.subprocess, "run", fake)
+        return fake
+    return install
+
+
+def test_run_uses_control_master_and_stdin(fake_ssh):
+    fake = fake_ssh(0)
+    transport = ssh_transport.SSHTransport(CONFIG)
+    result = transport.run("wp db query", input="SELECT 1;")
+
+    assert result.returncode == 0
+    (args, stdin), = fake.commands()
+    assert "ControlMaster=auto" in args and "ControlPath=/tmp/test-ssh-%C" in args
+    assert args[-2:] == ["deploy@db.example", "cd /srv/site && wp db query"]
+    assert stdin == "SELECT 1;"
+    assert transport.get_stats()["calls"] == 1
+
+
+def test_remote_failure_is_not_retried(fake_ssh):
+    fake = fake_ssh(1)
+    transport = ssh_transport.SSHTransport(CONFIG)
+    assert transport.run("false").returncode == 1
+    assert len(fake.commands()) == 1
+    assert transport.stats["reconnects"] == 0
+
+
+def test_connection_error_reconnects_once(fake_ssh):
+    fake = fake_ssh(255, 0)
+    transport = ssh_transport.SSHTransport(CONFIG)
+    assert transport.run("ls").returncode == 0
+    assert len(fake.commands()) == 2
+    assert transport.stats["reconnects"] == 1
+    assert transport.stats["failures"] == 1
+
+
+def test_reconnects_are_bounded(fake_ssh):
+    fake = fake_ssh(255, 255, 255)
+    transport = ssh_transport.SSHTransport(CONFIG)
+    assert transport.run("cmd").returncode == ssh_transport.SSH_CONNECTION_ERROR
+    assert len(fake.commands()) == 2
+
+
+def test_get_transport_is_shared_per_host_and_socket(monkeypatch):
+    monkeypatch.setattr(ssh_transport, "_transports", {})
+    first = ssh_transport.get_transport(CONFIG)
+    assert ssh_transport.get_transport(dict(CONFIG)) is first
+    other = dict(CONFIG, transport={"control_path": "/tmp/other-%C"})
+    assert ssh_transport.get_transport(other) is not first
@@ -0,0 +1,57 @@
+"""todo_cache: TTL und Invalidierung für Header- und Heavy-Spalten"""
+
+import pytest
+
+import todo_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(todo_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return todo_cache.TodoCache({"cache": {"ttl_seconds": 60}, "paths": {"cache": str(tmp_path / "cache.db")}})
+
+
+HEADER = {"id": "5", "title": "Test", "updated_at": "2026-10-18 10:00:00"}
+
+
+def test_header_and_heavy_round_trip(cache, clock):
+    cache.put(5, HEADER)
+    cache.put_heavy(5, HEADER["updated_at"], {"claude_notes": "notes"})
+    assert cache.get(5) == dict(HEADER, claude_notes="notes")
+    assert cache.get_heavy(5, HEADER["updated_at"]) == {"claude_notes": "notes"}
+
+
+def test_heavy_columns_expire_with_header_ttl(cache, clock):
+    cache.put(5, HEADER)
+    cache.put_heavy(5, HEADER["updated_at"], {"claude_notes": "notes"})
+    clock[0] += 61
+    assert cache.get(5) is None
+    assert cache.get_heavy(5, HEADER["updated_at"]) == {}
+
+
+def test_new_updated_at_drops_heavy_columns(cache, clock):
+    cache.put(5, HEADER)
+    cache.put_heavy(5, HEADER["updated_at"], {"claude_notes": "old"})
+    cache.put(5, dict(HEADER, updated_at="2026-10-18 10:05:00"))
+    assert cache.get_heavy(5, "2026-10-18 10:05:00") == {}
+    assert cache.get_heavy(5, HEADER["updated_at"]) == {}
+
+
+def test_invalidate_removes_entry(cache, clock):
+    cache.put(5, HEADER)
+    cache.put_heavy(5, HEADER["updated_at"], {"claude_notes": "notes"})
+    cache.invalidate(5)
+    assert cache.get(5) is None
+    assert cache.get_heavy(5, HEADER["updated_at"]) == {}
+
+
+def test_disabled_cache_is_a_no_op(tmp_path):
+    cache = todo_cache.TodoCache({"cache": {"enabled": False}, "paths": {"cache": str(tmp_path / "c.db")}})
+    cache.put(5, HEADER)
+    assert cache.get(5) is None
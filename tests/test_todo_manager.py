@@ -0,0 +1,225 @@
+"""todo_manager: Schreibpfade gegen gefakten wp-cli-Transport und Pool"""
+
+import contextlib
+
+import pytest
+
+import todo_manager
+
+
+@pytest.fixture
+def events(monkeypatch):
+    """Reihenfolge von DB-Writes und Cache-Invalidierungen, ohne SSH und ohne Pool"""
+    events = []
+
+    def fake_ssh(cmd):
+        events.append(("write", cmd))
+        return "", 0
+
+    def fake_execute_ack(config, sql, params=(), ack_sql="", ack_params=(), timeout=60):
+        events.append(("write", sql))
+        return {"affected": 1, "status": "completed", "updated_at": "2026-10-18 10:00:00"}
+
+    def fake_run_script(config, script, timeout=60):
+        events.append(("write", script))
+        return "todo_id\taffected\n7\t1\n8\t1\n", 0, ""
+
+    monkeypatch.setattr(todo_manager, "log", lambda level, message: None)
+    monkeypatch.setattr(todo_manager, "get_pool", lambda config: None)
+    monkeypatch.setattr(todo_manager, "add_project_filter", lambda query: query)
+    monkeypatch.setattr(todo_manager, "ssh_command", fake_ssh)
+    monkeypatch.setattr(todo_manager.db_query, "execute_ack", fake_execute_ack)
+    monkeypatch.setattr(todo_manager.db_query, "run_script", fake_run_script)
+    monkeypatch.setattr(todo_manager, "invalidate_todo",
+                        lambda config, todo_id: events.append(("invalidate", int(todo_id))))
+    return events
+
+
+def _kinds(events):
+    return [kind for kind, _ in events]
+
+
+@pytest.mark.parametrize("call", [
+    lambda: todo_manager.set_todo_status(7, "completed"),
+    lambda: todo_manager.complete_todo(7, "<p>ok</p>", "ok", "fertig"),
+    lambda: todo_manager.release_claim(7),
+])
+def test_cache_is_invalidated_after_the_write(events, call):
+    assert call() in (True, None)
+    assert _kinds(events) == ["write", "invalidate"]
+    assert events[-1] == ("invalidate", 7)
+
+
+def test_batch_update_invalidates_after_the_transaction(events):
+    results = todo_manager.batch_update_todos([{"id": 7, "status": "completed"}, {"id": 8, "summary": "x"}])
+    assert results == {7: True, 8: True}
+    assert events[0][0] == "write"
+    assert events[1:] == [("invalidate", 7), ("invalidate", 8)]
+
+
+def test_complete_todo_logs_bytes_saved_by_this_call(events, monkeypatch):
+    messages = []
+    monkeypatch.setattr(todo_manager, "log", lambda level, message: messages.append(message))
+    # Frühere Aufrufe stehen schon im kumulativen Zähler
+    stats = dict(todo_manager.db_query._stats, raw_bytes=5000, sent_bytes=1000)
+    monkeypatch.setattr(todo_manager.db_query, "_stats", stats)
+
+    def fake_execute_ack(config, sql, params=(), ack_sql="", ack_params=(), timeout=60):
+        todo_manager.db_query._count(raw_bytes=300, sent_bytes=100)
+        return {"affected": 1, "status": "completed", "updated_at": "2026-10-18 10:00:00"}
+
+    monkeypatch.setattr(todo_manager.db_query, "execute_ack", fake_execute_ack)
+    assert todo_manager.complete_todo(7, "<p>ok</p>", "ok")
+    assert "200 bytes saved by compression" in messages[-1]
+
+
+class FakeCache:
+    def __init__(self):
+        self.rows = {}
+
+    def put(self, todo_id, row):
+        self.rows[str(todo_id)] = row
+
+
+def _claim_output(todo_id, status="in_progress"):
+    """wp db query Batch-Output des Claim-SELECTs mit allen Header-Feldern"""
+    values = {field: "" for field in todo_manager.HEADER_FIELDS}
+    values.update(id=str(todo_id), title="Claim me", status=status, updated_at="2026-10-18 10:00:00")
+    return "\t".join(todo_manager.HEADER_FIELDS) + "\n" + "\t".join(values[f] for f in todo_manager.HEADER_FIELDS) + "\n"
+
+
+@pytest.fixture
+def claim_ssh(events, monkeypatch):
+    """wp-cli Claim: zeichnet Befehle auf und antwortet mit output (leer = kein Todo geclaimt)"""
+    calls = []
+    response = {"output": "", "code": 0}
+
+    def fake_ssh(cmd):
+        calls.append(cmd)
+        return response["output"], response["code"]
+
+    monkeypatch.setattr(todo_manager, "ssh_command", fake_ssh)
+    monkeypatch.setattr(todo_manager, "get_todo_cache", lambda config: FakeCache())
+    return calls, response
+
+
+def test_claim_script_renders_conditional_update_and_select(claim_ssh):
+    calls, response = claim_ssh
+    response["output"] = _claim_output(12)
+
+    todo = todo_manager.claim_next_todo()
+    assert (todo["id"], todo["status"]) == ("12", "in_progress")
+
+    table = f"{todo_manager.CONFIG['database']['table_prefix']}project_todos"
+    assert calls == [
+        f'wp db query "UPDATE {table} SET status=\'in_progress\', execution_started_at=IFNULL(execution_started_at, NOW()), '
+        f"updated_at=NOW(), id=LAST_INSERT_ID(id) WHERE status='offen' AND bearbeiten=1 ORDER BY priority DESC, id ASC LIMIT 1; "
+        f"SET @claimed = ROW_COUNT(); "
+        f"SELECT {', '.join(todo_manager.HEADER_FIELDS)} FROM {table} WHERE @claimed > 0 AND id = LAST_INSERT_ID()\""
+    ]
+
+
+def test_claim_uses_requested_status(claim_ssh):
+    calls, response = claim_ssh
+    response["output"] = _claim_output(12, status="planning")
+    assert todo_manager.claim_next_todo("planning")["status"] == "planning"
+    assert "SET status='planning'" in calls[0]
+
+
+def test_claim_invalidates_claimed_todo_after_the_write(claim_ssh, events):
+    _calls, response = claim_ssh
+    response["output"] = _claim_output(12)
+    todo_manager.claim_next_todo()
+    assert events == [("invalidate", 12)]
+
+
+@pytest.mark.parametrize("output, code", [
+    ("", 0),                                                   # @claimed = 0: SELECT liefert nichts
+    ("\t".join(todo_manager.HEADER_FIELDS) + "\n", 0),          # nur Header
+    ("ERROR 1205: Lock wait timeout exceeded", 1),
+])
+def test_claim_without_claimed_row_returns_none(claim_ssh, events, output, code):
+    _calls, response = claim_ssh
+    response.update(output=output, code=code)
+    assert todo_manager.claim_next_todo() is None
+    assert events == []
+
+
+class FakeClaimCursor:
+    def __init__(self, row):
+        self.row = row
+        self.executed = []
+        self.closed = False
+
+    def execute(self, query, params=()):
+        self.executed.append((query, params))
+
+    def fetchone(self):
+        return self.row
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClaimConnection:
+    def __init__(self, row):
+        self.claim_cursor = FakeClaimCursor(row)
+
+    def cursor(self, dictionary=False):
+        assert dictionary
+        return self.claim_cursor
+
+
+class FakeClaimPool:
+    """Pool-Ersatz für _claim_with_pool: eine Transaktion auf einer Verbindung"""
+
+    def __init__(self, row):
+        self.connection = FakeClaimConnection(row)
+        self.cursor = self.connection.claim_cursor
+
+    @contextlib.contextmanager
+    def transaction(self):
+        yield self.connection
+
+
+def test_claim_with_pool_skips_locked_rows_and_updates_in_one_transaction(events):
+    pool = FakeClaimPool({"id": 5, "title": "x", "status": "offen"})
+    row = todo_manager._claim_with_pool(pool, "in_progress")
+
+    assert row["status"] == "in_progress"
+    table = f"{todo_manager.CONFIG['database']['table_prefix']}project_todos"
+    (select, select_params), (update, update_params) = pool.cursor.executed
+    assert select == (f"SELECT {', '.join(todo_manager.HEADER_FIELDS)} FROM {table} WHERE status='offen' AND bearbeiten=1 "
+                      f"ORDER BY priority DESC, id ASC LIMIT 1 FOR UPDATE SKIP LOCKED")
+    assert update.startswith(f"UPDATE {table} SET status=%s, execution_started_at=IFNULL(execution_started_at, NOW())")
+    assert update_params == ("in_progress", 5)
+    assert pool.cursor.closed
+
+
+def test_claim_with_pool_without_free_row_returns_none(events):
+    pool = FakeClaimPool(None)
+    assert todo_manager._claim_with_pool(pool, "in_progress") is None
+    assert len(pool.cursor.executed) == 1  # kein UPDATE ohne gesperrte Zeile
+    assert pool.cursor.closed
+
+
+def test_claim_next_todo_prefers_pool(events, monkeypatch):
+    monkeypatch.setattr(todo_manager, "get_pool", lambda config: FakeClaimPool({"id": 5, "status": "offen"}))
+    todo = todo_manager.claim_next_todo()
+    assert (todo["id"], todo["status"]) == ("5", "in_progress")
+    assert events == [("invalidate", 5)]  # kein wp-cli Aufruf
+
+
+def test_claim_next_todo_falls_back_to_wp_cli_when_pool_fails(claim_ssh, monkeypatch):
+    calls, response = claim_ssh
+    response["output"] = _claim_output(12)
+    disabled = []
+
+    class BrokenPool:
+        def transaction(self):
+            raise ConnectionError("tunnel down")
+
+    monkeypatch.setattr(todo_manager, "get_pool", lambda config: BrokenPool())
+    monkeypatch.setattr(todo_manager, "disable_pool", lambda: disabled.append(True))
+    assert todo_manager.claim_next_todo()["id"] == "12"
+    assert disabled == [True] and len(calls) == 1
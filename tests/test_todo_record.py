@@ -0,0 +1,101 @@
+"""todo_record: TSV-Decoder des mysql Batch-Outputs und lazy Heavy-Spalten"""
+
+import io
+
+import pytest
+
+from todo_record import HEADER_FIELDS, TodoRecord, decode_first, decode_rows, iter_lines, unescape
+
+
+def _batch_escape(value):
+    """Escaping wie mysql --batch (Gegenstück zu unescape)"""
+    return (value.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t')
+            .replace('\0', '\\0').replace('\r', '\\r'))
+
+
+@pytest.mark.parametrize("output, expected", [
+    ("a\nb\n", ["a", "b"]),
+    ("a\nb", ["a", "b"]),
+    ("a\n\nb\n", ["a", "", "b"]),
+    ("", []),
+    ("\n", [""]),
+])
+def test_iter_lines_string(output, expected):
+    assert list(iter_lines(output)) == expected
+
+
+def test_iter_lines_file_object():
+    assert list(iter_lines(io.StringIO("a\nb\n"))) == ["a", "b"]
+
+
+@pytest.mark.parametrize("value", [
+    "plain",
+    "line1\nline2",
+    "tab\there",
+    "back\\slash",
+    "literal \\n is not a newline",
+    "nul\0byte\r\n",
+    "",
+])
+def test_unescape_round_trip(value):
+    assert unescape(_batch_escape(value)) == value
+
+
+def test_unescape_unknown_escape_keeps_character():
+    assert unescape("\\x") == "x"
+
+
+def test_decode_rows_with_escaped_columns():
+    notes = "Schritt 1\n\tDetail mit \\ Backslash"
+    output = (
+        "id\ttitle\tstatus\tclaude_notes\tdue_date\n"
+        f"7\tErster\\tTitel\tin_progress\t{_batch_escape(notes)}\tNULL\n"
+        "8\tZweiter\toffen\t\t2026-10-18\n"
+    )
+    first, second = decode_rows(output)
+
+    assert first["id"] == "7"
+    assert first["title"] == "Erster\tTitel"
+    assert not first.is_loaded("claude_notes")  # Heavy-Spalten erst beim Zugriff dekodiert
+    assert first["claude_notes"] == notes
+    assert first.is_loaded("claude_notes")
+    assert first["due_date"] is None  # NULL -> Schema-Default
+    assert first["mode"] == "execute"  # nicht selektiert -> Default
+    assert second["due_date"] == "2026-10-18"
+
+
+def test_decode_first_skips_leading_blank_lines():
+    assert decode_first("\n\nid\ttitle\n3\tX\n")["title"] == "X"
+    assert decode_first("") is None
+
+
+def test_missing_heavy_columns_use_loader_once():
+    calls = []
+
+    def loader(todo_id, fields):
+        calls.append((todo_id, tuple(fields)))
+        return {field: f"{field} of {todo_id}" for field in fields}
+
+    record = decode_first("id\ttitle\n9\tHeader\n").bind_loader(loader)
+    record.prefetch("claude_prompt", "plan_html")
+    assert record["claude_prompt"] == "claude_prompt of 9"
+    assert record["plan_html"] == "plan_html of 9"
+    assert calls == [("9", ("claude_prompt", "plan_html"))]
+
+
+def test_from_mapping_converts_values():
+    record = TodoRecord.from_mapping({"id": 4, "title": b"bytes", "due_date": None, "claude_notes": "n"})
+    assert (record["id"], record["title"], record["due_date"]) == ("4", "bytes", None)
+    assert record.is_loaded("claude_notes")
+    assert not record.is_loaded("claude_prompt")
+
+
+def test_adopt_heavy_only_from_same_todo():
+    loaded = TodoRecord.from_mapping({"id": 1, "claude_prompt": "prompt"})
+    assert TodoRecord.from_mapping({"id": 1}).adopt_heavy(loaded).is_loaded("claude_prompt")
+    assert not TodoRecord.from_mapping({"id": 2}).adopt_heavy(loaded).is_loaded("claude_prompt")
+
+
+def test_header_fields_exclude_heavy_columns():
+    assert "claude_notes" not in HEADER_FIELDS
+    assert "updated_at" in HEADER_FIELDS